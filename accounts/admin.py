@@ -1,26 +1,177 @@
+import json
+
+from django.conf import settings
 from django.contrib import admin
-from .models import User, Programme, Jalon, Binome
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils.functional import cached_property
+from .counters import COUNTER_FIELDS, apply_transition
+from .models import (
+	User, Programme, Jalon, Binome, JalonBinome,
+	FeedbackForm, FeedbackQuestion, FeedbackResponse, FeedbackAnswer,
+)
+
+
+class EstimatedCountPaginator(Paginator):
+	"""
+	Paginateur des grosses tables : sous PostgreSQL, le nombre de lignes vient des
+	statistiques du planificateur (pg_class.reltuples sans filtre, EXPLAIN sinon)
+	au lieu d'un COUNT(*) complet. En dessous de ADMIN_EXACT_COUNT_LIMIT lignes
+	estimées, ou sur les autres bases, le comptage reste exact.
+	"""
+
+	@cached_property
+	def count(self):
+		estimate = self.estimate()
+		if estimate is not None and estimate > getattr(settings, 'ADMIN_EXACT_COUNT_LIMIT', 10000):
+			return estimate
+		return super().count
+
+	def estimate(self):
+		queryset = self.object_list
+		connection = connections[queryset.db]
+		if connection.vendor != 'postgresql':
+			return None
+		if not queryset.query.where:
+			with connection.cursor() as cursor:
+				cursor.execute(
+					"SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+					[queryset.model._meta.db_table],
+				)
+				row = cursor.fetchone()
+			# reltuples vaut -1 tant que la table n'a jamais été analysée
+			return row[0] if row and row[0] >= 0 else None
+		plan = json.loads(queryset.explain(format='json'))
+		return int(plan[0]['Plan']['Plan Rows'])
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+	"""Changelist sans COUNT(*) exact : pagination estimée, pas de total non filtré"""
+	paginator = EstimatedCountPaginator
+	show_full_result_count = False
+
+
+class ProgressionMixin:
+	"""Colonnes de progression lues sur les compteurs dénormalisés (aucune requête par ligne)"""
+	readonly_fields = COUNTER_FIELDS
+
+	@admin.display(description='Progression', ordering='jalons_done')
+	def progression_display(self, obj):
+		return f"{obj.jalons_done}/{obj.jalons_total} ({obj.progression} %)"
+
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
 	list_display = ('username', 'email', 'role', 'is_active', 'is_staff')
 	list_filter = ('role', 'is_active', 'is_staff')
 	search_fields = ('username', 'email')
+	ordering = ('username',)
 
 @admin.register(Programme)
-class ProgrammeAdmin(admin.ModelAdmin):
-	list_display = ('nom', 'gestionnaire', 'date_debut', 'date_fin')
+class ProgrammeAdmin(ProgressionMixin, admin.ModelAdmin):
+	list_display = ('nom', 'gestionnaire', 'date_debut', 'date_fin', 'binomes_count',
+	                'progression_display', 'jalons_wait', 'jalons_overdue')
 	search_fields = ('nom', 'description')
 	list_filter = ('date_debut', 'date_fin')
+	list_select_related = ('gestionnaire',)
+	autocomplete_fields = ('gestionnaire',)
+
+	def get_queryset(self, request):
+		return super().get_queryset(request).annotate(binomes_count=Count('binomes'))
+
+	@admin.display(description='Binômes', ordering='binomes_count')
+	def binomes_count(self, obj):
+		return obj.binomes_count
 
 @admin.register(Jalon)
 class JalonAdmin(admin.ModelAdmin):
 	list_display = ('titre', 'programme', 'date_echeance')
 	search_fields = ('titre', 'description')
 	list_filter = ('date_echeance', 'programme')
+	list_select_related = ('programme',)
+	autocomplete_fields = ('programme',)
 
 @admin.register(Binome)
-class BinomeAdmin(admin.ModelAdmin):
-	list_display = ('programme', 'mentor', 'mentore')
+class BinomeAdmin(ProgressionMixin, LargeTableAdmin):
+	list_display = ('programme', 'mentor', 'mentore', 'date_creation',
+	                'progression_display', 'jalons_wait', 'jalons_overdue')
 	list_filter = ('programme',)
-	search_fields = ('mentor__username', 'mentore__username')
+	search_fields = ('=mentor__username', '=mentore__username')
+	list_select_related = ('programme', 'mentor', 'mentore')
+	autocomplete_fields = ('programme', 'mentor', 'mentore')
+
+@admin.register(JalonBinome)
+class JalonBinomeAdmin(LargeTableAdmin):
+	list_display = ('binome', 'jalon', 'statut', 'date_realisation', 'date_validation')
+	list_filter = ('statut',)
+	# Recherche exacte : utilise l'index unique de username au lieu d'un LIKE sur toute la table
+	search_fields = ('=binome__mentor__username', '=binome__mentore__username')
+	list_select_related = ('binome__programme', 'binome__mentor', 'binome__mentore', 'jalon__programme')
+	raw_id_fields = ('binome', 'jalon')
+
+	def get_readonly_fields(self, request, obj=None):
+		# Changer de binôme ou de jalon fausserait les compteurs : seul le statut évolue
+		return ('binome', 'jalon') if obj else ()
+
+	def save_model(self, request, obj, form, change):
+		if not change or 'statut' not in form.changed_data:
+			return super().save_model(request, obj, form, change)
+		with transaction.atomic():
+			super().save_model(request, obj, form, change)
+			apply_transition([obj], form.initial['statut'], obj.statut)
+
+
+class FeedbackQuestionInline(admin.TabularInline):
+	model = FeedbackQuestion
+	extra = 0
+
+
+class FeedbackAnswerInline(admin.TabularInline):
+	model = FeedbackAnswer
+	extra = 0
+	raw_id_fields = ('question',)
+
+	def get_queryset(self, request):
+		return super().get_queryset(request).select_related('question')
+
+
+@admin.register(FeedbackForm)
+class FeedbackFormAdmin(admin.ModelAdmin):
+	list_display = ('titre', 'programme', 'jalon', 'created_by', 'date_creation', 'is_active', 'responses_count')
+	list_filter = ('is_active', 'programme')
+	search_fields = ('titre', 'description')
+	list_select_related = ('programme', 'jalon', 'created_by')
+	autocomplete_fields = ('programme', 'jalon', 'created_by')
+	inlines = (FeedbackQuestionInline,)
+
+	def get_queryset(self, request):
+		return super().get_queryset(request).annotate(responses_count=Count('responses'))
+
+	@admin.display(description='Réponses', ordering='responses_count')
+	def responses_count(self, obj):
+		return obj.responses_count
+
+@admin.register(FeedbackQuestion)
+class FeedbackQuestionAdmin(admin.ModelAdmin):
+	list_display = ('texte', 'form', 'type', 'ordre', 'required')
+	list_filter = ('type',)
+	search_fields = ('texte',)
+	list_select_related = ('form',)
+	autocomplete_fields = ('form',)
+
+@admin.register(FeedbackResponse)
+class FeedbackResponseAdmin(LargeTableAdmin):
+	list_display = ('form', 'user', 'date_reponse')
+	list_filter = ('form__programme',)
+	search_fields = ('=user__username',)
+	list_select_related = ('form', 'user')
+	autocomplete_fields = ('form', 'user')
+	inlines = (FeedbackAnswerInline,)
+
+@admin.register(FeedbackAnswer)
+class FeedbackAnswerAdmin(LargeTableAdmin):
+	list_display = ('question', 'response', 'answer')
+	list_filter = ('question__type',)
+	list_select_related = ('question', 'response__form', 'response__user')
+	raw_id_fields = ('response', 'question')
@@ -0,0 +1,199 @@
+"""
+Moteur d'alertes système.
+
+Les règles (alertes métier) et les sondes (santé technique) sont enregistrées
+par décorateur, évaluées périodiquement par la commande
+``refresh_system_alerts`` et stockées dans le cache sous forme d'un instantané
+horodaté. L'endpoint ``admin_system_alerts`` ne fait que relire cet instantané.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_KEY = 'system_alerts:snapshot'
+LAST_REMINDER_RUN_CACHE_KEY = 'system_alerts:last_reminder_run'
+
+ALERT_RULES = []
+HEALTH_PROBES = []
+
+
+def alert_rule(func):
+    """Enregistre une règle : retourne un dict d'alerte ou None"""
+    ALERT_RULES.append(func)
+    return func
+
+
+def health_probe(func):
+    """Enregistre une sonde : retourne {'name', 'status', 'value', 'message'}"""
+    HEALTH_PROBES.append(func)
+    return func
+
+
+def refresh_interval():
+    return getattr(settings, 'SYSTEM_ALERTS_REFRESH_SECONDS', 300)
+
+
+# --- Règles métier ---
+
+@alert_rule
+def overdue_jalons():
+    from .models import JalonBinome
+    overdue_count = JalonBinome.objects.filter(
+        statut='TODO',
+        jalon__date_echeance__lt=timezone.now().date()
+    ).count()
+    if overdue_count > 0:
+        return {
+            'type': 'warning',
+            'icon': 'exclamation-triangle',
+            'title': 'Jalons en retard',
+            'message': f'{overdue_count} jalon(s) ont dépassé leur échéance'
+        }
+
+
+@alert_rule
+def pending_validations():
+    from .models import JalonBinome
+    pending_count = JalonBinome.objects.filter(statut='WAIT').count()
+    if pending_count > 10:
+        return {
+            'type': 'info',
+            'icon': 'clock',
+            'title': 'Validations en attente',
+            'message': f'{pending_count} jalons attendent une validation'
+        }
+
+
+@alert_rule
+def inactive_users():
+    from .models import User
+    inactive_count = User.objects.filter(
+        is_active=True,
+        last_login__lt=timezone.now() - timedelta(days=30)
+    ).count()
+    if inactive_count > 0:
+        return {
+            'type': 'warning',
+            'icon': 'user-slash',
+            'title': 'Utilisateurs inactifs',
+            'message': f'{inactive_count} utilisateur(s) inactif(s) depuis 30 jours'
+        }
+
+
+# --- Sondes de santé ---
+
+@health_probe
+def database_latency():
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    latency_ms = round((time.perf_counter() - start) * 1000, 2)
+    return {
+        'name': 'database',
+        'status': 'ok' if latency_ms < 100 else 'warning',
+        'value': latency_ms,
+        'message': f'Latence base de données : {latency_ms} ms',
+    }
+
+
+@health_probe
+def last_reminder_run():
+    last_run = cache.get(LAST_REMINDER_RUN_CACHE_KEY)
+    if last_run is None:
+        return {
+            'name': 'reminders',
+            'status': 'warning',
+            'value': None,
+            'message': "Aucun envoi de rappels enregistré",
+        }
+    age = timezone.now() - parse_datetime(last_run)
+    return {
+        'name': 'reminders',
+        'status': 'ok' if age < timedelta(hours=26) else 'warning',
+        'value': last_run,
+        'message': f'Derniers rappels envoyés il y a {int(age.total_seconds() // 3600)} h',
+    }
+
+
+def record_reminder_run():
+    """À appeler à la fin de chaque envoi de rappels"""
+    cache.set(LAST_REMINDER_RUN_CACHE_KEY, timezone.now().isoformat(), None)
+
+
+# --- Instantané ---
+
+def _evaluate(func, default):
+    try:
+        return func()
+    except Exception as e:
+        logger.exception(f"Erreur lors de l'évaluation de {func.__name__}")
+        return default(func, e)
+
+
+def build_snapshot():
+    alerts = []
+    for rule in ALERT_RULES:
+        alert = _evaluate(rule, lambda func, e: {
+            'type': 'danger',
+            'icon': 'bug',
+            'title': f'Règle {func.__name__} en échec',
+            'message': str(e),
+        })
+        if alert:
+            alerts.append(alert)
+
+    health = [
+        _evaluate(probe, lambda func, e: {
+            'name': func.__name__, 'status': 'error', 'value': None, 'message': str(e),
+        })
+        for probe in HEALTH_PROBES
+    ]
+    for probe in health:
+        if probe['status'] != 'ok':
+            alerts.append({
+                'type': 'danger' if probe['status'] == 'error' else 'warning',
+                'icon': 'heartbeat',
+                'title': f"Santé : {probe['name']}",
+                'message': probe['message'],
+            })
+    if all(probe['status'] == 'ok' for probe in health):
+        alerts.append({
+            'type': 'success',
+            'icon': 'check-circle',
+            'title': 'Système opérationnel',
+            'message': 'Toutes les sondes de santé sont au vert'
+        })
+
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'alerts': alerts,
+        'health': health,
+    }
+
+
+def refresh_snapshot():
+    snapshot = build_snapshot()
+    cache.set(SNAPSHOT_CACHE_KEY, snapshot, None)
+    return snapshot
+
+
+def get_snapshot():
+    """
+    Retourne l'instantané en cache. S'il est absent ou plus vieux que deux
+    intervalles (commande de rafraîchissement arrêtée), il est recalculé une fois.
+    """
+    snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+    if snapshot is not None:
+        age = timezone.now() - parse_datetime(snapshot['generated_at'])
+        if age.total_seconds() < 2 * refresh_interval():
+            return snapshot
+    return refresh_snapshot()
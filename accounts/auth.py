@@ -0,0 +1,99 @@
+"""
+Utilisateur courant servi depuis le cache.
+
+Les sessions sont en ``cached_db`` (cache ``sessions``, base en secours) et
+``CachedModelBackend`` garde l'utilisateur authentifié ``USER_CACHE_SECONDS``
+secondes dans ce même cache : une page authentifiée ne lit plus ni
+``django_session`` ni la table des utilisateurs. Toute sauvegarde ou suppression
+d'un utilisateur l'invalide (accounts/signals.py).
+
+``get_scope`` donne le rôle, les binômes et les programmes de l'utilisateur,
+calculés une fois par requête et mis en cache tant que la version de données
+``binomes`` (accounts/versions.py) ne change pas : seules l'écriture d'un binôme
+ou d'un programme l'invalident, pas les transitions de jalons.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Binome, Programme
+from .versions import get_versions
+
+
+def _cache():
+    return caches[getattr(settings, 'SESSION_CACHE_ALIAS', 'default')]
+
+
+def _user_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def forget_user(user_id):
+    """Retire l'utilisateur du cache une fois la transaction validée"""
+    transaction.on_commit(lambda: _cache().delete(_user_key(user_id)))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = _user_key(user_id)
+        user = _cache().get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                _cache().set(key, user, getattr(settings, 'USER_CACHE_SECONDS', 300))
+        return user
+
+    async def aget_user(self, user_id):
+        key = _user_key(user_id)
+        user = await _cache().aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await _cache().aset(key, user, getattr(settings, 'USER_CACHE_SECONDS', 300))
+        return user
+
+
+class UserScope:
+    def __init__(self, role, binome_ids, programme_ids):
+        self.role = role
+        self.binome_ids = binome_ids
+        self.programme_ids = programme_ids
+
+
+def _compute_scope(user):
+    if user.role == 'MENTOR':
+        pairs = Binome.objects.filter(mentor=user).values_list('id', 'programme_id')
+    elif user.role == 'MENTEE':
+        pairs = Binome.objects.filter(mentore=user).values_list('id', 'programme_id')
+    else:
+        pairs = []
+    pairs = list(pairs)
+    binome_ids = [binome_id for binome_id, _ in pairs]
+    if user.role == 'RH':
+        programme_ids = list(Programme.objects.filter(gestionnaire=user).values_list('id', flat=True))
+    else:
+        programme_ids = sorted({programme_id for _, programme_id in pairs})
+    return {'binome_ids': binome_ids, 'programme_ids': programme_ids}
+
+
+def get_scope(request):
+    """Rôle, binômes et programmes de l'utilisateur connecté (mémorisés sur la requête)"""
+    scope = getattr(request, '_user_scope', None)
+    if scope is None:
+        user = request.user
+        key = f"user_scope:{user.pk}:{get_versions()['binomes']}"
+        data = _cache().get(key)
+        if data is None:
+            data = _compute_scope(user)
+            _cache().set(key, data, getattr(settings, 'USER_CACHE_SECONDS', 300))
+        scope = request._user_scope = UserScope(user.role, **data)
+    return scope
+
+
+async def aget_scope(request):
+    scope = getattr(request, '_user_scope', None)
+    if scope is None:
+        scope = await sync_to_async(get_scope)(request)
+    return scope
@@ -0,0 +1,168 @@
+"""
+Compression des réponses dynamiques (gzip, et brotli si le paquet ``brotli`` est
+installé) et allègement du HTML rendu.
+
+WhiteNoise ne compresse que les fichiers statiques : ``CompressionMiddleware``
+(accounts/middleware.py) s'appuie sur ce module pour les pages, les API JSON et
+les exports en streaming, compressés au fil de l'eau. Les corps déjà compressés
+(xlsx, images, Content-Encoding existant) et les flux SSE sont laissés tels quels.
+
+Contre BREACH (jeton CSRF à côté de données reflétées), chaque flux compressé
+commence par 1 à ``MAX_RANDOM_BYTES`` octets aléatoires que le décodeur ignore :
+nom de fichier de l'en-tête gzip, comme ``GZipMiddleware``, ou bloc de
+métadonnées brotli. La taille d'une réponse ne trahit plus le contenu deviné.
+"""
+import re
+import secrets
+import string
+import struct
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/x-ndjson',
+    'image/svg+xml',
+)
+# Flux d'événements : chaque message doit partir immédiatement
+EXCLUDED_TYPES = ('text/event-stream',)
+
+_ACCEPT_TOKEN = re.compile(r'\s*([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?', re.IGNORECASE)
+_VERBATIM = re.compile(rb'(<(pre|textarea|script)\b.*?</\2>)', re.IGNORECASE | re.DOTALL)
+_INDENT = re.compile(rb'[ \t]*\n\s*')
+_SCRIPT_INDENT = re.compile(rb'\n[ \t]+')
+
+MAX_RANDOM_BYTES = 100
+_FILENAME_CHARS = (string.ascii_letters + string.digits).encode()
+
+
+def available_codecs():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding):
+    """Meilleur codage accepté par le client (br puis gzip), None sinon"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        match = _ACCEPT_TOKEN.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        accepted[match.group(1).lower()] = quality
+    for codec in available_codecs():
+        if accepted.get(codec, accepted.get('*', 0)) > 0:
+            return codec
+    return None
+
+
+def is_compressible(content_type):
+    content_type = content_type.split(';')[0].strip().lower()
+    if content_type.startswith(EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _random_length():
+    return 1 + secrets.randbelow(MAX_RANDOM_BYTES)
+
+
+def _gzip_header():
+    # En-tête gzip avec nom de fichier (FNAME) aléatoire, sans octet nul
+    filename = bytes(secrets.choice(_FILENAME_CHARS) for _ in range(_random_length()))
+    return b'\x1f\x8b\x08\x08' + struct.pack('<I', 0) + b'\x00\xff' + filename + b'\x00'
+
+
+def _brotli_padding():
+    """
+    Bloc de métadonnées brotli (RFC 7932, 9.2) de 1 à MAX_RANDOM_BYTES octets aléatoires, ignoré au
+    décodage : ISLAST=0, MNIBBLES=0, MSKIPBYTES=1, puis MSKIPLEN-1 sur 8 bits et bourrage à l'octet
+    """
+    length = _random_length()
+    skip = length - 1
+    return bytes([0x16 | (skip & 3) << 6, skip >> 2]) + secrets.token_bytes(length)
+
+
+class _Compressor:
+    def __init__(self, codec):
+        self.codec = codec
+        if codec == 'br':
+            self._obj = brotli.Compressor(quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5))
+            # flush() émet l'en-tête du flux aligné sur l'octet : le bloc de métadonnées peut suivre
+            self._header = self._obj.flush() + _brotli_padding()
+        else:
+            # Deflate brut entre un en-tête et un pied gzip écrits ici (CRC et taille suivis au fil de l'eau)
+            self._obj = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+            self._header = _gzip_header()
+            self._crc = 0
+            self._size = 0
+
+    def _start(self, data):
+        header, self._header = self._header, b''
+        return header + data
+
+    def compress(self, data):
+        if self.codec == 'br':
+            return self._start(self._obj.process(data))
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        return self._start(self._obj.compress(data))
+
+    def finish(self):
+        if self.codec == 'br':
+            return self._start(self._obj.finish())
+        trailer = struct.pack('<II', self._crc, self._size & 0xFFFFFFFF)
+        return self._start(self._obj.flush() + trailer)
+
+
+def compress(data, codec):
+    compressor = _Compressor(codec)
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_stream(chunks, codec):
+    # Pas de flush par morceau : le compresseur n'émet qu'à bloc plein, ce qui
+    # regroupe les petites lignes d'un export sans tout garder en mémoire
+    compressor = _Compressor(codec)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, codec):
+    compressor = _Compressor(codec)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def minify_html(content):
+    """
+    Retire l'indentation et les lignes vides du HTML. Un saut de ligne est
+    conservé à chaque coupure : le rendu est identique (les blancs se fondent
+    en un seul espace), le contenu de <pre> et <textarea> n'est pas touché.
+    """
+    parts = _VERBATIM.split(content)
+    out = []
+    # split renvoie texte, bloc capturé, nom de balise, texte...
+    for index in range(0, len(parts), 3):
+        out.append(_INDENT.sub(b'\n', parts[index]))
+        if index + 1 < len(parts):
+            block, tag = parts[index + 1], parts[index + 2].lower()
+            out.append(_SCRIPT_INDENT.sub(b'\n', block) if tag == b'script' else block)
+    return b''.join(out)
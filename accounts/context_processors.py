@@ -0,0 +1,10 @@
+from django.conf import settings
+from .versions import DataVersions
+
+
+def data_versions(request):
+    """Versions des données pour les clés des fragments {% cache %} (lues seulement si un fragment s'en sert)"""
+    return {
+        'data_versions': DataVersions(),
+        'fragment_cache_seconds': getattr(settings, 'TEMPLATE_FRAGMENT_CACHE_SECONDS', 600),
+    }
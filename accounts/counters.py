@@ -0,0 +1,182 @@
+"""
+Compteurs de progression dénormalisés sur Binome et Programme.
+
+Les colonnes ``jalons_total/todo/wait/done/overdue`` sont modifiées par des
+expressions ``F()`` dans la transaction même qui change les JalonBinome
+(transitions du modèle, validation en masse, création/suppression) : une
+progression se lit alors en O(1) sur la ligne du binôme ou du programme.
+
+``jalons_overdue`` (TODO dont l'échéance est passée) dépend aussi de la date du
+jour : un jalon dont l'échéance passe sans transition n'y entre qu'au passage
+de la commande ``reconcile_counters``, planifiée chaque nuit, qui corrige aussi
+toute dérive en recalculant depuis JalonBinome. Les totaux de plateforme et de
+mentor le lisent tel quel (valeur de la nuit) ; le dashboard d'un mentoré, qui
+parcourt déjà ses jalons, le compte à la lecture.
+"""
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .events import publish_counters
+from .models import Binome, JalonBinome, Programme
+from .versions import bump as bump_versions
+
+COUNTER_FIELDS = ('jalons_total', 'jalons_todo', 'jalons_wait', 'jalons_done', 'jalons_overdue')
+STATUT_FIELDS = {'TODO': 'jalons_todo', 'WAIT': 'jalons_wait', 'DONE': 'jalons_done'}
+
+
+def est_en_retard(statut, date_echeance, today=None):
+    return statut == 'TODO' and date_echeance < (today or timezone.localdate())
+
+
+def _expressions(deltas):
+    # Un compteur ayant dérivé ne doit jamais passer sous zéro : reconcile_counters le corrigera
+    return {
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items() if delta
+    }
+
+
+def _grouped_updates(model, par_ligne):
+    """Un UPDATE par jeu de variations distinct : les lignes qui changent de la même façon sont groupées"""
+    lignes_par_deltas = defaultdict(list)
+    for pk, deltas in par_ligne.items():
+        cle = frozenset((field, delta) for field, delta in deltas.items() if delta)
+        if cle:
+            lignes_par_deltas[cle].append(pk)
+    for cle, pks in lignes_par_deltas.items():
+        expressions = _expressions(dict(cle))
+        for debut in range(0, len(pks), 500):
+            model.objects.filter(pk__in=pks[debut:debut + 500]).update(**expressions)
+
+
+def apply_deltas(par_binome):
+    """Applique {(binome_id, programme_id): Counter} aux binômes puis à leurs programmes"""
+    par_programme = defaultdict(Counter)
+    for (binome_id, programme_id), deltas in par_binome.items():
+        par_programme[programme_id].update(deltas)
+    _grouped_updates(Binome, {binome_id: deltas for (binome_id, _), deltas in par_binome.items()})
+    _grouped_updates(Programme, par_programme)
+    # Les UPDATE par F() ne déclenchent pas de signal : versions changées ici comme le ferait post_save
+    # de JalonBinome (progression des programmes, activité récente des dashboards)
+    bump_versions('programmes', 'activity')
+
+
+def deltas_transition(ancien, nouveau, echu):
+    """Variations d'un passage ancien -> nouveau ; echu : l'échéance du jalon est passée"""
+    deltas = Counter({STATUT_FIELDS[ancien]: -1})
+    deltas[STATUT_FIELDS[nouveau]] += 1
+    # Un jalon échu est en retard tant qu'il est à faire : il le redevient s'il repasse en TODO
+    if echu:
+        deltas['jalons_overdue'] += (nouveau == 'TODO') - (ancien == 'TODO')
+    return deltas
+
+
+def apply_transition(jalons_binome, ancien, nouveau):
+    """Répercute le passage ancien -> nouveau de plusieurs JalonBinome (binome et jalon chargés)"""
+    if ancien == nouveau:
+        return
+    today = timezone.localdate()
+    par_binome = defaultdict(Counter)
+    n = 0
+    for jb in jalons_binome:
+        echu = jb.jalon.date_echeance < today
+        par_binome[(jb.binome_id, jb.binome.programme_id)].update(deltas_transition(ancien, nouveau, echu))
+        n += 1
+    apply_deltas(par_binome)
+    # Dashboards ouverts (flux SSE) : seules les transitions sont diffusées, pas les autres enregistrements
+    publish_counters(
+        realisations=n if nouveau == 'WAIT' else 0,
+        validations=n if nouveau == 'DONE' else 0,
+        jalons_en_attente=n * ((nouveau == 'WAIT') - (ancien == 'WAIT')),
+    )
+
+
+def apply_presence(jb, sens):
+    """Création (sens=1) ou suppression (sens=-1) d'un JalonBinome"""
+    deltas = Counter({'jalons_total': sens, STATUT_FIELDS[jb.statut]: sens})
+    if est_en_retard(jb.statut, jb.jalon.date_echeance):
+        deltas['jalons_overdue'] = sens
+    apply_deltas({(jb.binome_id, jb.binome.programme_id): deltas})
+
+
+def apply_removal(jalons_binome):
+    """Suppression des JalonBinome d'un QuerySet, avant qu'elle ait lieu : une lecture groupée par binôme"""
+    today = timezone.localdate()
+    par_binome = defaultdict(Counter)
+    lignes = jalons_binome.order_by().values('binome_id', 'binome__programme_id', 'statut').annotate(
+        n=Count('id'), echus=Count('id', filter=Q(jalon__date_echeance__lt=today)),
+    )
+    for ligne in lignes:
+        deltas = par_binome[(ligne['binome_id'], ligne['binome__programme_id'])]
+        deltas['jalons_total'] -= ligne['n']
+        deltas[STATUT_FIELDS[ligne['statut']]] -= ligne['n']
+        if ligne['statut'] == 'TODO':
+            deltas['jalons_overdue'] -= ligne['echus']
+    if par_binome:
+        apply_deltas(par_binome)
+
+
+def _compte(filtre, today):
+    """Sous-requête corrélée : nombre de JalonBinome du binôme/programme courant"""
+    conditions = {
+        'jalons_total': Q(),
+        'jalons_todo': Q(statut='TODO'),
+        'jalons_wait': Q(statut='WAIT'),
+        'jalons_done': Q(statut='DONE'),
+        'jalons_overdue': Q(statut='TODO', jalon__date_echeance__lt=today),
+    }
+    return {
+        field: Coalesce(Subquery(
+            JalonBinome.objects.filter(condition, **{filtre: OuterRef('pk')})
+            .order_by().values(filtre).annotate(n=Count('id')).values('n'),
+            output_field=IntegerField(),
+        ), 0)
+        for field, condition in conditions.items()
+    }
+
+
+def valeurs_attendues(model, today=None):
+    today = today or timezone.localdate()
+    return _compte('binome' if model is Binome else 'binome__programme', today)
+
+
+def reconcile(fix=True, programme_ids=None):
+    """Compare les compteurs stockés à JalonBinome ; corrige les lignes en écart si fix. Renvoie les écarts"""
+    today = timezone.localdate()
+    ecarts = {}
+    for model in (Binome, Programme):
+        queryset = model.objects.all()
+        if programme_ids is not None:
+            queryset = queryset.filter(**{'programme_id__in' if model is Binome else 'pk__in': programme_ids})
+        attendues = valeurs_attendues(model, today)
+        derive = reduce(or_, (~Q(**{field: F(f'attendu_{field}')}) for field in COUNTER_FIELDS))
+        lignes = list(
+            queryset.annotate(**{f'attendu_{field}': expr for field, expr in attendues.items()})
+            .filter(derive).values('pk', *COUNTER_FIELDS, *[f'attendu_{field}' for field in COUNTER_FIELDS])
+        )
+        ecarts[model.__name__] = lignes
+        if fix:
+            for debut in range(0, len(lignes), 500):
+                pks = [ligne['pk'] for ligne in lignes[debut:debut + 500]]
+                model.objects.filter(pk__in=pks).update(**attendues)
+    if fix and any(ecarts.values()):
+        bump_versions('programmes')
+    return ecarts
+
+
+def recompute(programme_ids=None):
+    """Recalcule sans comparaison (après un chargement en masse)"""
+    today = timezone.localdate()
+    binomes, programmes = Binome.objects.all(), Programme.objects.all()
+    if programme_ids is not None:
+        binomes = binomes.filter(programme_id__in=programme_ids)
+        programmes = programmes.filter(pk__in=programme_ids)
+    binomes.update(**valeurs_attendues(Binome, today))
+    programmes.update(**valeurs_attendues(Programme, today))
+    # Après un chargement en masse, qui a aussi pu créer des binômes
+    bump_versions('programmes', 'binomes')
@@ -0,0 +1,31 @@
+"""
+État des connexions à la base : réglages effectifs de chaque alias et, pour un
+pool psycopg, ses métriques (taille, connexions disponibles, attentes...).
+Voir la section « Base de données » de config/settings.py.
+"""
+from django.db import connections
+
+
+def get_pool(connection):
+    """Pool psycopg de la connexion, None sans pool (ou hors PostgreSQL)"""
+    if connection.vendor != 'postgresql' or not connection.settings_dict['OPTIONS'].get('pool'):
+        return None
+    return connection.pool
+
+
+def connection_stats():
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        entry = {
+            'vendor': connection.vendor,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'pool': None,
+        }
+        pool = get_pool(connection)
+        if pool is not None:
+            # pool_min/pool_max/pool_size/pool_available/requests_waiting, puis compteurs cumulés
+            entry['pool'] = pool.get_stats()
+        stats[alias] = entry
+    return stats
@@ -0,0 +1,79 @@
+"""
+Diffusion en mémoire des variations de compteurs du dashboard.
+
+Les signaux publient des deltas (``{'realisations': 1, 'jalons_en_attente': 1}``)
+après commit ; chaque flux SSE ouvert est un abonné qui reçoit ces deltas via
+une file asyncio. Le diffuseur est propre au processus : chaque worker ASGI
+sert les dashboards connectés à lui à partir des écritures qu'il traite.
+"""
+import asyncio
+import json
+import threading
+
+from django.db import transaction
+
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 100
+
+
+class Broadcaster:
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {sub for sub in self._subscribers if sub[1] is not queue}
+
+    def publish(self, deltas):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_put_nowait, queue, deltas)
+            except RuntimeError:
+                # Boucle fermée : l'abonné sera retiré à la fin de son flux
+                pass
+
+
+def _put_nowait(queue, deltas):
+    try:
+        queue.put_nowait(deltas)
+    except asyncio.QueueFull:
+        # Client trop lent : on perd le delta plutôt que de bloquer les écritures
+        pass
+
+
+broadcaster = Broadcaster()
+
+
+def publish_counters(**deltas):
+    """Publie des deltas de compteurs une fois la transaction courante validée"""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas:
+        transaction.on_commit(lambda: broadcaster.publish(deltas))
+
+
+async def counter_stream():
+    """Générateur SSE : regroupe les deltas reçus et envoie un heartbeat régulier"""
+    queue = broadcaster.subscribe()
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                deltas = dict(await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS))
+            except asyncio.TimeoutError:
+                yield ': heartbeat\n\n'
+                continue
+            while not queue.empty():
+                for name, delta in queue.get_nowait().items():
+                    deltas[name] = deltas.get(name, 0) + delta
+            yield f'event: counters\ndata: {json.dumps(deltas)}\n\n'
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,84 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from accounts.compression import available_codecs
+from accounts.models import User
+
+# Débit (kbit/s) et aller-retour (ms) de quelques liaisons lentes
+LINKS = {
+    '3G': (1600, 300),
+    '4G': (9000, 80),
+    'ADSL': (4000, 40),
+}
+
+
+class Command(BaseCommand):
+    help = ("Mesure les octets et le temps gagnés par la compression des réponses dynamiques "
+            "(pages, API JSON, export CSV en streaming) sur des liaisons lentes simulées.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='Utilisateur ADF dont on charge les pages')
+        parser.add_argument('--url', action='append', dest='urls', help='Chemin à mesurer (répétable, défaut : pages lourdes)')
+        parser.add_argument('--requests', type=int, default=20, help='Requêtes par chemin et par codage')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"Utilisateur {options['username']} introuvable")
+        # Hôte 'testserver' autorisé et e-mails en mémoire, comme run_benchmarks
+        setup_test_environment()
+        client = Client()
+        client.force_login(user)
+
+        targets = [('GET', url, None) for url in options['urls'] or [
+            reverse('manage_rh'), reverse('admin_users_data'), reverse('global_stats'),
+        ]]
+        if not options['urls']:
+            targets.append(('POST', reverse('export_data'), {
+                'export_type': 'csv', 'data_types': ['users', 'programmes', 'binomes', 'jalons', 'feedbacks'],
+            }))
+        codecs = ('identity',) + available_codecs()
+        if 'br' not in codecs:
+            self.stdout.write(self.style.WARNING("Paquet brotli absent : seul gzip est mesuré"))
+
+        header = f"{'chemin':<34}{'codage':<10}{'octets':>10}{'ratio':>8}{'serveur ms':>12}"
+        header += ''.join(f"{name + ' ms':>10}" for name in LINKS)
+        self.stdout.write(header)
+        try:
+            for method, url, data in targets:
+                reference = None
+                for codec in codecs:
+                    result = self.measure(client, method, url, data, codec, options['requests'])
+                    if reference is None:
+                        reference = result['bytes']
+                    line = (f"{method + ' ' + url:<34.34}{codec:<10}{result['bytes']:>10}"
+                            f"{result['bytes'] / reference if reference else 1:>8.2f}{result['server']:>12.2f}")
+                    for kbps, rtt in LINKS.values():
+                        # Temps serveur + un aller-retour + transfert du corps
+                        line += f"{result['server'] + rtt + result['bytes'] * 8 / kbps:>10.0f}"
+                    self.stdout.write(line)
+        finally:
+            teardown_test_environment()
+
+    def measure(self, client, method, url, data, codec, requests):
+        durations = []
+        size = 0
+        for _ in range(requests + 1):
+            start = time.perf_counter()
+            if method == 'POST':
+                response = client.post(url, data, HTTP_ACCEPT_ENCODING=codec)
+            else:
+                response = client.get(url, HTTP_ACCEPT_ENCODING=codec)
+            if response.status_code != 200:
+                raise CommandError(f"{url} : réponse HTTP {response.status_code}")
+            if codec != 'identity' and response.get('Content-Encoding') not in (None, codec):
+                raise CommandError(f"{url} : codage {response['Content-Encoding']} au lieu de {codec}")
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            durations.append((time.perf_counter() - start) * 1000)
+            size = len(body)
+        # La première requête chauffe les caches (gabarits, fragments, versions)
+        return {'bytes': size, 'server': statistics.median(durations[1:])}
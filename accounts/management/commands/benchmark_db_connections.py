@@ -0,0 +1,114 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from accounts.db_connections import get_pool
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = ("Mesure le coût des connexions à la base sur une page (dashboard par défaut) : "
+            "nouvelle connexion à chaque requête, connexion persistante, pool psycopg.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='Utilisateur dont on charge la page')
+        parser.add_argument('--url', default=None, help='Chemin à mesurer (défaut : dashboard)')
+        parser.add_argument('--requests', type=int, default=200, help='Requêtes par mode')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"Utilisateur {options['username']} introuvable")
+        url = options['url'] or reverse('dashboard')
+        # Hôte 'testserver' autorisé et e-mails en mémoire, comme run_benchmarks
+        setup_test_environment()
+        client = Client()
+        client.force_login(user)
+
+        connection = connections['default']
+        settings_dict = connection.settings_dict
+        original = (settings_dict['CONN_MAX_AGE'], settings_dict['OPTIONS'].get('pool'))
+        modes = [
+            ('sans persistance', 0, None),
+            ('persistante', 600, None),
+        ]
+        if connection.vendor == 'postgresql' and original[1]:
+            modes.append(('pool psycopg', 0, original[1]))
+        else:
+            self.stdout.write(self.style.WARNING(
+                "Pas de pool configuré (DB_POOL=True, PostgreSQL) : mode pool ignoré"
+            ))
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                "SQLite : ouvrir une connexion ne coûte presque rien, les écarts seront faibles"
+            ))
+
+        self.stdout.write(f"{'mode':<20}{'p50 ms':>10}{'p95 ms':>10}{'moy. ms':>10}{'connexions':>12}")
+        try:
+            for label, conn_max_age, pool_options in modes:
+                result = self.measure(client, url, options['requests'], connection, conn_max_age, pool_options)
+                self.stdout.write(
+                    f"{label:<20}{result['p50']:>10.2f}{result['p95']:>10.2f}"
+                    f"{result['mean']:>10.2f}{result['connexions']:>12}"
+                )
+        finally:
+            connection.close()
+            settings_dict['CONN_MAX_AGE'] = original[0]
+            if original[1]:
+                settings_dict['OPTIONS']['pool'] = original[1]
+            else:
+                settings_dict['OPTIONS'].pop('pool', None)
+            teardown_test_environment()
+
+    def measure(self, client, url, requests, connection, conn_max_age, pool_options):
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        if pool_options:
+            connection.settings_dict['OPTIONS']['pool'] = pool_options
+        else:
+            connection.settings_dict['OPTIONS'].pop('pool', None)
+
+        opened = []
+
+        def count(sender, connection, **kwargs):
+            if connection.alias == 'default':
+                opened.append(1)
+
+        self.get(client, url)  # chauffe (pool ouvert, templates, caches)
+        pool = get_pool(connection)
+        pool_connections = pool.get_stats().get('connections_num', 0) if pool else 0
+        connection_created.connect(count)
+        durations = []
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                self.get(client, url)
+                # Ce que fait request_finished en production (le client de test le débranche)
+                close_old_connections()
+                durations.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection_created.disconnect(count)
+
+        # Avec un pool, connect() emprunte une connexion : seules les ouvertures réelles du pool comptent
+        connexions = pool.get_stats().get('connections_num', 0) - pool_connections if pool else len(opened)
+        durations.sort()
+        return {
+            'p50': statistics.median(durations),
+            'p95': durations[int(len(durations) * 0.95) - 1],
+            'mean': statistics.fmean(durations),
+            'connexions': connexions,
+        }
+
+    def get(self, client, url):
+        response = client.get(url)
+        if response.status_code >= 400:
+            raise CommandError(f"{url} : réponse HTTP {response.status_code}")
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
@@ -0,0 +1,115 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Processus neuf : Django chargé, URLconf résolue, première requête servie (page publique, aucune écriture)
+CHILD = """
+import json, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.test import Client
+from django.test.utils import setup_test_environment
+setup_test_environment()
+if {eager!r}:
+    from accounts.views import load_all
+    load_all()
+    try:
+        import xlsxwriter
+    except ImportError:
+        pass
+response = Client().get({url!r})
+done = time.perf_counter()
+print(json.dumps({{'status': response.status_code, 'setup_ms': (setup - start) * 1000, 'request_ms': (done - setup) * 1000}}))
+"""
+
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+\d+ \| *(\S+)')
+
+
+def run_child(url, eager=False, importtime=False):
+    """Lance un processus Python neuf ; renvoie ses mesures et la sortie -X importtime éventuelle"""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', CHILD.format(url=url, eager=eager)]
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+    start = time.perf_counter()
+    process = subprocess.run(command, capture_output=True, text=True, cwd=settings.BASE_DIR, env=env)
+    elapsed = (time.perf_counter() - start) * 1000
+    if process.returncode != 0:
+        raise CommandError(f"Processus de mesure en échec :\n{process.stderr[-2000:]}")
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    if result['status'] >= 400:
+        raise CommandError(f"{url} : réponse HTTP {result['status']}")
+    result['total_ms'] = elapsed
+    return result, process.stderr
+
+
+def measure_startup(url='/', runs=5, modes=(False,)):
+    """Démarrages à froid de chaque mode (False : vues à la demande, True : toutes importées), alternés"""
+    samples = {eager: [] for eager in modes}
+    for _ in range(runs):
+        # Modes alternés : une dérive de la machine pèse autant sur chacun
+        for eager in modes:
+            samples[eager].append(run_child(url, eager=eager)[0])
+    return samples
+
+
+def medians(samples):
+    return {key: statistics.median(sample[key] for sample in samples) for key in ('setup_ms', 'request_ms', 'total_ms')}
+
+
+def summarize_importtime(stderr, top=15):
+    """Temps d'import propre de chaque module, agrégé par paquet de premier niveau (python -X importtime)"""
+    packages = defaultdict(int)
+    total = 0
+    for line in stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        self_us, name = match.groups()
+        total += int(self_us)
+        packages[name.split('.')[0]] += int(self_us)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return total / 1000, [(name, us / 1000) for name, us in ranked]
+
+
+class Command(BaseCommand):
+    help = ("Temps de démarrage à froid d'un worker : résumé de python -X importtime et délai jusqu'à la "
+            "première réponse, avec les vues chargées à la demande ou toutes importées d'avance.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/', help='Chemin de la première requête (page publique)')
+        parser.add_argument('--runs', type=int, default=5, help='Démarrages mesurés par mode')
+        parser.add_argument('--top', type=int, default=15, help='Paquets affichés dans le résumé importtime')
+        parser.add_argument('--max-ms', type=float, default=None,
+                            help='Échouer si la première réponse (chargement à la demande) dépasse ce délai')
+
+    def handle(self, *args, **options):
+        _, stderr = run_child(options['url'], importtime=True)
+        total_ms, ranked = summarize_importtime(stderr, options['top'])
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Imports jusqu'à la première réponse : {total_ms:.0f} ms"))
+        for name, ms in ranked:
+            self.stdout.write(f"  {name:<32}{ms:>10.1f} ms")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nDémarrage à froid (médianes)"))
+        self.stdout.write(f"{'mode':<22}{'django.setup':>14}{'1re requête':>14}{'processus':>12}")
+        samples = measure_startup(options['url'], options['runs'], modes=(False, True))
+        results = {}
+        for label, eager in [('vues à la demande', False), ('toutes les vues', True)]:
+            result = results[label] = medians(samples[eager])
+            self.stdout.write(
+                f"{label:<22}{result['setup_ms']:>11.1f} ms{result['request_ms']:>11.1f} ms{result['total_ms']:>9.0f} ms"
+            )
+
+        lazy = results['vues à la demande']['total_ms']
+        if options['max_ms'] is not None and lazy > options['max_ms']:
+            raise CommandError(f"Démarrage jusqu'à la première réponse : {lazy:.0f} ms > {options['max_ms']:.0f} ms")
@@ -0,0 +1,217 @@
+import gzip
+import json
+import re
+import time
+from collections import defaultdict
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers import base
+from django.core.serializers.python import Deserializer
+from django.db import connection, transaction
+from accounts import search, text_stats
+from accounts.counters import recompute as recompute_counters
+from accounts.versions import bump as bump_versions
+
+CHUNK_SIZE = 1 << 20
+
+
+def open_dump(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+_LITERALS = ('true', 'false', 'null', 'NaN', 'Infinity', '-Infinity')
+_NUMBER_PART = re.compile(r'[-+.\deE]*\Z')
+
+
+def _cut_at_end(buffer, error):
+    """L'erreur vient-elle d'un objet coupé par la fin du tampon (à compléter) plutôt que d'un JSON invalide ?"""
+    if error.msg.startswith('Unterminated string'):
+        # Aucun guillemet fermant jusqu'à la fin du tampon
+        return True
+    rest = buffer[error.pos:]
+    if error.msg.startswith('Invalid \\uXXXX escape'):
+        return len(rest) < 6
+    # Rien après l'erreur, ou seulement un début de nombre ou de littéral
+    rest = rest.lstrip()
+    return _NUMBER_PART.match(rest) is not None or any(literal.startswith(rest) for literal in _LITERALS)
+
+
+def iter_records(stream):
+    """Lit un dump JSON (tableau dumpdata ou NDJSON) objet par objet, sans le charger en mémoire"""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+    in_array = None
+
+    while True:
+        # Sauter les blancs et séparateurs ; recharger le tampon si besoin
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = stream.read(CHUNK_SIZE), 0
+            eof = not buffer
+
+        if pos >= len(buffer):
+            if in_array:
+                raise CommandError("Dump tronqué : ']' final manquant")
+            return
+        if in_array is None:
+            in_array = buffer[pos] == '['
+            if in_array:
+                pos += 1
+                continue
+        if in_array and buffer[pos] == ']':
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            # Erreur avant la fin du tampon : inutile de lire (et garder en mémoire) le reste du dump
+            if eof or not _cut_at_end(buffer, e):
+                raise CommandError(f"JSON invalide : {e}")
+            # Objet coupé en fin de tampon : compacter et lire la suite
+            chunk = stream.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield record
+        pos = end
+        if pos > CHUNK_SIZE:
+            buffer, pos = buffer[pos:], 0
+
+
+class Command(BaseCommand):
+    help = ("Restaure un dump dumpdata (JSON, NDJSON, éventuellement .gz) par bulk_create : "
+            "lecture en flux, insertion par modèle, aucun signal ni e-mail.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixtures', nargs='+', help='Fichiers de dump à charger')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Objets par bulk_create')
+        parser.add_argument('-i', '--ignorenonexistent', action='store_true',
+                            help='Ignorer les modèles et champs absents du schéma actuel')
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.ignorenonexistent = options['ignorenonexistent']
+        self.buffers = defaultdict(list)
+        self.dependencies = {}
+        self.counts = defaultdict(int)
+
+        start = time.perf_counter()
+        # Contrairement à loaddata, bulk_create ne déclenche ni pre_save/post_save ni m2m_changed :
+        # aucune invitation ni notification n'est envoyée pendant une restauration.
+        with transaction.atomic():
+            with connection.constraint_checks_disabled():
+                for path in options['fixtures']:
+                    with open_dump(path) as stream:
+                        for record in iter_records(stream):
+                            self.add(record)
+                for model in list(self.buffers):
+                    self.flush(model)
+            loaded = [apps.get_model(label) for label in self.counts]
+            connection.check_constraints(table_names=[model._meta.db_table for model in loaded])
+            self.reset_sequences(loaded)
+            # Dumps antérieurs aux compteurs dénormalisés, ou partiels : on les recalcule
+            if self.counts.keys() & {'accounts.Programme', 'accounts.Binome', 'accounts.JalonBinome'}:
+                recompute_counters()
+            if self.counts.keys() & {'accounts.FeedbackAnswer', 'accounts.JalonBinome'}:
+                search.rebuild()
+            if self.counts.keys() & {'accounts.FeedbackAnswer', 'accounts.FeedbackQuestion'}:
+                text_stats.rebuild()
+            # bulk_create n'émet pas de signaux : les fragments des dashboards sont invalidés en bloc
+            bump_versions()
+        elapsed = time.perf_counter() - start
+
+        total = sum(self.counts.values())
+        for label, count in sorted(self.counts.items()):
+            self.stdout.write(f"{label:<32}{count:>12}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} objets chargés en {elapsed:.1f} s ({total / max(elapsed, 1e-9):.0f} objets/s)"
+        ))
+
+    def add(self, record):
+        try:
+            model = apps.get_model(record['model'])
+        except (LookupError, KeyError, TypeError):
+            if self.ignorenonexistent:
+                return
+            raise CommandError(f"Modèle inconnu dans le dump : {record.get('model')!r}")
+        # Les clés naturelles (content types, permissions...) se résolvent en base :
+        # les modèles référencés doivent être insérés avant de désérialiser celui-ci.
+        for dependency in self.get_dependencies(model):
+            self.flush(dependency)
+        buffer = self.buffers[model]
+        buffer.append(record)
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+
+    def get_dependencies(self, model):
+        if model not in self.dependencies:
+            related = {
+                field.related_model._meta.concrete_model
+                for field in [*model._meta.concrete_fields, *model._meta.many_to_many]
+                if field.is_relation
+            }
+            related.discard(model)
+            self.dependencies[model] = related
+        return self.dependencies[model]
+
+    def flush(self, model, seen=None):
+        records = self.buffers.get(model)
+        if not records:
+            return
+        seen = seen or set()
+        seen.add(model)
+        for dependency in self.get_dependencies(model):
+            if dependency not in seen:
+                self.flush(dependency, seen)
+        self.buffers[model] = []
+
+        try:
+            deserialized = list(Deserializer(records, ignorenonexistent=self.ignorenonexistent))
+        except base.DeserializationError as e:
+            raise CommandError(f"Désérialisation impossible ({model._meta.label}) : {e}")
+        instances = [item.object for item in deserialized]
+
+        update_fields = [f.name for f in model._meta.local_concrete_fields if not f.primary_key]
+        # Même sémantique que loaddata : un objet dont la clé existe déjà est écrasé
+        model._base_manager.bulk_create(
+            instances, batch_size=self.batch_size,
+            update_conflicts=bool(update_fields),
+            unique_fields=[model._meta.pk.name] if update_fields else None,
+            update_fields=update_fields or None,
+        )
+        self.save_m2m(model, deserialized)
+        self.counts[model._meta.label] += len(instances)
+
+    def save_m2m(self, model, deserialized):
+        for field in model._meta.local_many_to_many:
+            through = field.remote_field.through
+            if not through._meta.auto_created:
+                continue
+            source = field.m2m_field_name() + '_id'
+            target = field.m2m_reverse_field_name() + '_id'
+            rows, owners = [], []
+            for item in deserialized:
+                if field.name not in item.m2m_data:
+                    continue
+                owners.append(item.object.pk)
+                rows.extend(through(**{source: item.object.pk, target: pk})
+                            for pk in item.m2m_data[field.name])
+            if not owners:
+                continue
+            through._base_manager.filter(**{f"{source}__in": owners}).delete()
+            through._base_manager.bulk_create(rows, batch_size=self.batch_size)
+            if rows:
+                self.counts[through._meta.label] += len(rows)
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
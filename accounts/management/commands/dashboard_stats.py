@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from accounts.models import Programme, Binome, JalonBinome
+from accounts.routers import reads_from_replica
 
 class Command(BaseCommand):
     help = "Affiche les statistiques clés du mentoring."
@@ -7,6 +8,7 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--programme_id', type=int, help='ID du programme à analyser')
 
+    @reads_from_replica
     def handle(self, *args, **options):
         programme_id = options.get('programme_id')
         if not programme_id:
@@ -29,7 +31,7 @@ class Command(BaseCommand):
                     jb = JalonBinome.objects.get(binome=binome, jalon=jalon)
                     if jb.statut == 'DONE':
                         completed += 1
-                    elif jb.statut != 'DONE' and jalon.date_echeance < jb.date_realisation:
+                    elif jb.date_realisation and jalon.date_echeance < jb.date_realisation.date():
                         late += 1
                 except JalonBinome.DoesNotExist:
                     continue
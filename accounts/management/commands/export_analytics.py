@@ -0,0 +1,202 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from accounts.models import JalonBinome, FeedbackAnswer
+from accounts.routers import reads_from_replica
+
+
+def load_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError:
+        raise CommandError("L'export analytique nécessite pyarrow : pip install pyarrow")
+    return pyarrow
+
+
+class Command(BaseCommand):
+    help = ("Exporte des tables de faits dénormalisées au format Parquet "
+            "(une ligne par jalon de binôme, une ligne par réponse de feedback).")
+
+    # Colonnes lues en base, dans l'ordre du values_list
+    JALON_FIELDS = [
+        ('jalon_binome_id', 'id'),
+        ('programme_id', 'binome__programme_id'),
+        ('programme', 'binome__programme__nom'),
+        ('binome_id', 'binome_id'),
+        ('mentor_id', 'binome__mentor_id'),
+        ('mentor', 'binome__mentor__username'),
+        ('mentore_id', 'binome__mentore_id'),
+        ('mentore', 'binome__mentore__username'),
+        ('jalon_id', 'jalon_id'),
+        ('jalon', 'jalon__titre'),
+        ('statut', 'statut'),
+        ('date_echeance', 'jalon__date_echeance'),
+        ('date_realisation', 'date_realisation'),
+        ('date_validation', 'date_validation'),
+    ]
+    # Jours locaux de réalisation et de validation, lus en plus pour calculer le retard
+    JALON_DAYS = [
+        ('jour_realisation', 'jour_realisation'),
+        ('jour_validation', 'jour_validation'),
+    ]
+    FEEDBACK_FIELDS = [
+        ('answer_id', 'id'),
+        ('response_id', 'response_id'),
+        ('form_id', 'response__form_id'),
+        ('formulaire', 'response__form__titre'),
+        ('programme_id', 'response__form__programme_id'),
+        ('programme', 'response__form__programme__nom'),
+        ('jalon_id', 'response__form__jalon_id'),
+        ('user_id', 'response__user_id'),
+        ('username', 'response__user__username'),
+        ('role', 'response__user__role'),
+        ('date_reponse', 'response__date_reponse'),
+        ('question_id', 'question_id'),
+        ('question', 'question__texte'),
+        ('question_type', 'question__type'),
+        ('reponse', 'answer'),
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help='Dossier de destination des fichiers Parquet')
+        parser.add_argument('--tables', nargs='+', choices=['jalons', 'feedback'], default=['jalons', 'feedback'],
+                            help='Tables de faits à exporter')
+        parser.add_argument('--batch-size', type=int, default=50000, help='Lignes par record batch / row group')
+        parser.add_argument('--compression', default='zstd', choices=['zstd', 'snappy', 'gzip', 'none'],
+                            help='Compression Parquet')
+
+    @reads_from_replica
+    def handle(self, *args, **options):
+        self.pa = load_pyarrow()
+        self.batch_size = options['batch_size']
+        self.compression = None if options['compression'] == 'none' else options['compression']
+        os.makedirs(options['output_dir'], exist_ok=True)
+
+        for table in options['tables']:
+            path = os.path.join(options['output_dir'], f"fact_{table}.parquet")
+            start = time.perf_counter()
+            if table == 'jalons':
+                rows = self.write(path, self.jalon_schema(), self.jalon_batches())
+            else:
+                rows = self.write(path, self.feedback_schema(), self.feedback_batches())
+            self.stdout.write(self.style.SUCCESS(
+                f"{path} : {rows} lignes en {time.perf_counter() - start:.1f} s"
+            ))
+
+    def write(self, path, schema, batches):
+        rows = 0
+        with self.pa.parquet.ParquetWriter(path, schema, compression=self.compression) as writer:
+            for batch in batches:
+                writer.write_batch(batch, row_group_size=self.batch_size)
+                rows += batch.num_rows
+        return rows
+
+    def chunks(self, queryset, fields):
+        """Colonnes Python par lot : la mémoire reste bornée à un lot, quelle que soit la taille de la table"""
+        iterator = queryset.values_list(*[lookup for _, lookup in fields]).iterator(chunk_size=self.batch_size)
+        while True:
+            rows = []
+            for row in iterator:
+                rows.append(row)
+                if len(rows) >= self.batch_size:
+                    break
+            if not rows:
+                return
+            yield dict(zip([name for name, _ in fields], zip(*rows)))
+            if len(rows) < self.batch_size:
+                return
+
+    def jalon_schema(self):
+        pa = self.pa
+        timestamp = pa.timestamp('us', tz='UTC')
+        return pa.schema([
+            ('jalon_binome_id', pa.int64()),
+            ('programme_id', pa.int64()),
+            ('programme', pa.string()),
+            ('binome_id', pa.int64()),
+            ('mentor_id', pa.int64()),
+            ('mentor', pa.string()),
+            ('mentore_id', pa.int64()),
+            ('mentore', pa.string()),
+            ('jalon_id', pa.int64()),
+            ('jalon', pa.string()),
+            ('statut', pa.dictionary(pa.int8(), pa.string())),
+            ('date_echeance', pa.date32()),
+            ('date_realisation', timestamp),
+            ('date_validation', timestamp),
+            ('retard_jours', pa.int32()),
+            ('en_retard', pa.bool_()),
+        ])
+
+    def jalon_batches(self):
+        pa, pc = self.pa, self.pa.compute
+        schema = self.jalon_schema()
+        today = pa.scalar(timezone.localdate(), pa.date32())
+        # Jours tronqués dans le fuseau du projet, comme l'échéance : pas de décalage d'un jour autour de minuit UTC
+        tzinfo = timezone.get_current_timezone()
+        queryset = JalonBinome.objects.order_by('id').annotate(
+            jour_realisation=TruncDate('date_realisation', tzinfo=tzinfo),
+            jour_validation=TruncDate('date_validation', tzinfo=tzinfo),
+        )
+        for columns in self.chunks(queryset, self.JALON_FIELDS + self.JALON_DAYS):
+            arrays = {
+                name: pa.array(columns[name], type=schema.field(name).type if name != 'statut' else pa.string())
+                for name, _ in self.JALON_FIELDS
+            }
+            arrays['statut'] = arrays['statut'].dictionary_encode().cast(schema.field('statut').type)
+            # Retard = (réalisation, sinon validation, sinon aujourd'hui) - échéance, calculé en vectoriel
+            realised, validated = (pa.array(columns[name], type=pa.date32()) for name, _ in self.JALON_DAYS)
+            reference = pc.coalesce(realised, validated, today)
+            delay = pc.cast(pc.days_between(arrays['date_echeance'], reference), pa.int32())
+            arrays['retard_jours'] = delay
+            # En retard : échéance dépassée sans réalisation, ou réalisé (validé ou non) après l'échéance
+            arrays['en_retard'] = pc.greater(delay, 0)
+            yield pa.record_batch([arrays[field.name] for field in schema], schema=schema)
+
+    def feedback_schema(self):
+        pa = self.pa
+        return pa.schema([
+            ('answer_id', pa.int64()),
+            ('response_id', pa.int64()),
+            ('form_id', pa.int64()),
+            ('formulaire', pa.string()),
+            ('programme_id', pa.int64()),
+            ('programme', pa.string()),
+            ('jalon_id', pa.int64()),
+            ('user_id', pa.int64()),
+            ('username', pa.string()),
+            ('role', pa.dictionary(pa.int8(), pa.string())),
+            ('date_reponse', pa.timestamp('us', tz='UTC')),
+            ('question_id', pa.int64()),
+            ('question', pa.string()),
+            ('question_type', pa.dictionary(pa.int8(), pa.string())),
+            ('reponse', pa.string()),
+            ('note', pa.int8()),
+            ('choix', pa.dictionary(pa.int32(), pa.string())),
+        ])
+
+    def feedback_batches(self):
+        pa = self.pa
+        schema = self.feedback_schema()
+        queryset = FeedbackAnswer.objects.order_by('id')
+        for columns in self.chunks(queryset, self.FEEDBACK_FIELDS):
+            arrays = {}
+            for name, _ in self.FEEDBACK_FIELDS:
+                field_type = schema.field(name).type
+                if pa.types.is_dictionary(field_type):
+                    arrays[name] = pa.array(columns[name], type=pa.string()).dictionary_encode().cast(field_type)
+                else:
+                    arrays[name] = pa.array(columns[name], type=field_type)
+            # Valeurs typées selon le type de question : note entière (SCALE), modalité (CHOICE)
+            types, answers = columns['question_type'], columns['reponse']
+            arrays['note'] = pa.array(
+                [int(a) if t == 'SCALE' and a.isdigit() else None for t, a in zip(types, answers)], type=pa.int8()
+            )
+            arrays['choix'] = pa.array(
+                [a if t == 'CHOICE' else None for t, a in zip(types, answers)], type=pa.string()
+            ).dictionary_encode().cast(schema.field('choix').type)
+            yield pa.record_batch([arrays[field.name] for field in schema], schema=schema)
@@ -1,6 +1,7 @@
 import csv
 from django.core.management.base import BaseCommand
 from accounts.models import FeedbackForm, FeedbackResponse, FeedbackAnswer
+from accounts.routers import reads_from_replica
 
 class Command(BaseCommand):
     help = "Exporte les réponses aux formulaires de feedback au format CSV."
@@ -8,6 +9,7 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--form_id', type=int, help='ID du formulaire de feedback à exporter')
 
+    @reads_from_replica
     def handle(self, *args, **options):
         form_id = options.get('form_id')
         if not form_id:
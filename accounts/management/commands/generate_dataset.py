@@ -0,0 +1,245 @@
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.utils import timezone
+from accounts import search, text_stats
+from accounts.counters import recompute as recompute_counters
+from accounts.models import (
+    User, Programme, Jalon, Binome, JalonBinome,
+    FeedbackForm, FeedbackQuestion, FeedbackResponse, FeedbackAnswer,
+)
+
+MOTS_COMMENTAIRES = [
+    "objectif atteint", "bonne progression", "réunion hebdomadaire", "présentation du projet",
+    "difficultés rencontrées", "plan d'action", "compétences techniques", "prise de parole",
+    "revue de code", "gestion du temps", "retour très positif", "besoin d'accompagnement",
+    "documentation rédigée", "atelier collectif", "échanges constructifs", "autonomie renforcée",
+]
+CHOIX = ['Très satisfait', 'Satisfait', 'Neutre', 'Insatisfait']
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Génère un jeu de données synthétique à grande échelle (insertions en masse, aléatoire reproductible)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--programmes', type=int, default=10, help='Nombre de programmes')
+        parser.add_argument('--binomes', type=int, default=50, help='Binômes par programme')
+        parser.add_argument('--jalons', type=int, default=10, help='Jalons par programme')
+        parser.add_argument('--mentees-per-mentor', type=int, default=3, help='Mentorés suivis par chaque mentor')
+        parser.add_argument('--forms', type=int, default=2, help='Formulaires de feedback par programme')
+        parser.add_argument('--questions', type=int, default=6, help='Questions par formulaire (SCALE/TEXT/CHOICE en alternance)')
+        parser.add_argument('--response-rate', type=float, default=0.6, help='Part des participants qui répondent à chaque formulaire')
+        parser.add_argument('--status-mix', default='todo=0.5,wait=0.2,done=0.3',
+                            help='Répartition des statuts JalonBinome, ex. todo=0.5,wait=0.2,done=0.3')
+        parser.add_argument('--seed', type=int, default=42, help='Graine du générateur aléatoire')
+        parser.add_argument('--batch-size', type=int, default=5000, help="Taille des lots d'insertion")
+        parser.add_argument('--prefix', default='gen', help='Préfixe des noms d\'utilisateur générés')
+        parser.add_argument('--password', default='password', help='Mot de passe de tous les comptes générés')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        self.statuses, self.weights = self.parse_status_mix(options['status_mix'])
+        self.counts = {}
+
+        if User.objects.filter(username__startswith=f"{self.prefix}_").exists():
+            raise CommandError(f"Des utilisateurs '{self.prefix}_*' existent déjà : choisissez un autre --prefix")
+
+        # Un seul hachage pour tous les comptes : le hachage est de loin l'opération la plus coûteuse
+        self.password = make_password(options['password'])
+        self.today = timezone.now().date()
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            for p in range(options['programmes']):
+                self.generate_programme(p, options)
+            # Réponses et commentaires créés sans signaux : index plein texte et fréquences reconstruits
+            search.rebuild()
+            text_stats.rebuild()
+        elapsed = time.perf_counter() - start
+
+        total = sum(self.counts.values())
+        for model, count in self.counts.items():
+            self.stdout.write(f"{model:<20}{count:>12}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} lignes générées en {elapsed:.1f} s ({total / max(elapsed, 1e-9):.0f} lignes/s)"
+        ))
+
+    def parse_status_mix(self, raw):
+        mix = {}
+        for part in raw.split(','):
+            key, _, value = part.partition('=')
+            key = key.strip().upper()
+            if key not in dict(JalonBinome.STATUS_CHOICES):
+                raise CommandError(f"Statut inconnu dans --status-mix : {key}")
+            mix[key] = float(value)
+        return list(mix), list(mix.values())
+
+    def bulk(self, model, objects):
+        created = []
+        for chunk in batched(objects, self.batch_size):
+            created.extend(model.objects.bulk_create(chunk, batch_size=self.batch_size))
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(created)
+        return created
+
+    def insert(self, model, fields, rows):
+        """INSERT par executemany de tuples déjà prêts : ni instance ni compilation par ligne (tables volumineuses)"""
+        connection = connections[router.db_for_write(model)]
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+        sql = (f"INSERT INTO {quote(model._meta.db_table)} ({columns}) "
+               f"VALUES ({', '.join(['%s'] * len(fields))})")
+        count = 0
+        with connection.cursor() as cursor:
+            for chunk in batched(rows, self.batch_size):
+                cursor.executemany(sql, chunk)
+                count += len(chunk)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + count
+
+    def users(self, role, label, p, count):
+        return self.bulk(User, (
+            User(
+                username=f"{self.prefix}_{label}_{p}_{i}",
+                email=f"{self.prefix}_{label}_{p}_{i}@example.com",
+                first_name=label.capitalize(),
+                last_name=f"{p}-{i}",
+                role=role,
+                password=self.password,
+            )
+            for i in range(count)
+        ))
+
+    def generate_programme(self, p, options):
+        rng = self.rng
+        nb_binomes = options['binomes']
+        nb_mentors = max(1, -(-nb_binomes // options['mentees_per_mentor']))
+
+        gestionnaire = self.users('RH', 'rh', p, 1)[0]
+        mentors = self.users('MENTOR', 'mentor', p, nb_mentors)
+        mentees = self.users('MENTEE', 'mentee', p, nb_binomes)
+
+        date_debut = self.today - timedelta(days=rng.randint(0, 365))
+        date_fin = date_debut + timedelta(days=rng.randint(90, 365))
+        programme = self.bulk(Programme, [Programme(
+            nom=f"Programme {self.prefix} {p}",
+            description=f"Programme de mentoring généré n°{p}",
+            date_debut=date_debut,
+            date_fin=date_fin,
+            gestionnaire=gestionnaire,
+        )])[0]
+
+        duree = (date_fin - date_debut).days
+        jalons = self.bulk(Jalon, (
+            Jalon(
+                programme=programme,
+                titre=f"Jalon {k + 1}",
+                description=f"Étape {k + 1} du programme {p}",
+                date_echeance=date_debut + timedelta(days=duree * (k + 1) // (options['jalons'] + 1)),
+            )
+            for k in range(options['jalons'])
+        ))
+
+        binomes = self.bulk(Binome, (
+            Binome(programme_id=programme.pk, mentor_id=mentors[i % nb_mentors].pk, mentore_id=mentee.pk)
+            for i, mentee in enumerate(mentees)
+        ))
+
+        self.insert(
+            JalonBinome,
+            ('binome', 'jalon', 'statut', 'commentaire', 'date_realisation', 'date_validation'),
+            self.jalons_binome(binomes, jalons),
+        )
+        # Insertions sans signaux : compteurs de progression recalculés en une fois
+        recompute_counters(programme_ids=[programme.pk])
+
+        self.generate_feedback(programme, jalons, mentors + mentees, options)
+
+    def jalons_binome(self, binomes, jalons):
+        rng = self.rng
+        # Tirages groupés et dates d'échéance pré-calculées : c'est la table la plus volumineuse
+        statuts = iter(rng.choices(self.statuses, self.weights, k=len(binomes) * len(jalons)))
+        echeances = [
+            (jalon.pk, timezone.make_aware(timezone.datetime.combine(jalon.date_echeance, timezone.datetime.min.time())))
+            for jalon in jalons
+        ]
+        # Dates écrites telles que l'ORM les écrirait (UTC naïf sous SQLite)
+        adapt = connections[router.db_for_write(JalonBinome)].ops.adapt_datetimefield_value
+        # Un jalon réalisé ou validé l'a été au plus tard maintenant, même si son échéance est à venir
+        now = timezone.now()
+        for binome in binomes:
+            for jalon_id, echeance in echeances:
+                statut = next(statuts)
+                if statut == 'TODO':
+                    yield (binome.pk, jalon_id, statut, '', None, None)
+                    continue
+                date_realisation = min(echeance + timedelta(minutes=rng.randint(-14400, 14400)), now)
+                date_validation = None
+                if statut == 'DONE':
+                    date_validation = adapt(min(date_realisation + timedelta(minutes=rng.randint(0, 10080)), now))
+                yield (
+                    binome.pk, jalon_id, statut, rng.choice(MOTS_COMMENTAIRES).capitalize(),
+                    adapt(date_realisation), date_validation,
+                )
+
+    def generate_feedback(self, programme, jalons, participants, options):
+        rng = self.rng
+        forms = self.bulk(FeedbackForm, (
+            FeedbackForm(
+                programme=programme,
+                jalon=rng.choice(jalons) if jalons and f % 2 == 0 else None,
+                titre=f"Feedback {f + 1} - {programme.nom}",
+                description="Formulaire généré",
+                created_by=programme.gestionnaire,
+            )
+            for f in range(options['forms'])
+        ))
+
+        types = ['SCALE', 'TEXT', 'CHOICE']
+        questions = self.bulk(FeedbackQuestion, (
+            FeedbackQuestion(
+                form=form,
+                texte=f"Question {q + 1} ({types[q % 3]})",
+                type=types[q % 3],
+                choices=','.join(CHOIX) if types[q % 3] == 'CHOICE' else '',
+                ordre=q + 1,
+            )
+            for form in forms
+            for q in range(options['questions'])
+        ))
+        questions_by_form = {}
+        for question in questions:
+            questions_by_form.setdefault(question.form_id, []).append(question)
+
+        date_reponse = connections[router.db_for_write(FeedbackResponse)].ops.adapt_datetimefield_value(timezone.now())
+        self.insert(FeedbackResponse, ('form', 'user', 'date_reponse'), (
+            (form.pk, user.pk, date_reponse)
+            for form in forms
+            for user in participants
+            if rng.random() < options['response_rate']
+        ))
+        # Identifiants relus en une requête plutôt que renvoyés par bulk_create
+        responses = FeedbackResponse.objects.filter(form__in=forms).order_by('pk').values_list('pk', 'form_id')
+
+        self.insert(FeedbackAnswer, ('response', 'question', 'answer'), (
+            (response_id, question.pk, self.answer(question))
+            for response_id, form_id in responses.iterator(chunk_size=self.batch_size)
+            for question in questions_by_form.get(form_id, [])
+        ))
+
+    def answer(self, question):
+        if question.type == 'SCALE':
+            return str(self.rng.randint(1, 5))
+        if question.type == 'CHOICE':
+            return self.rng.choice(CHOIX)
+        return ' '.join(self.rng.sample(MOTS_COMMENTAIRES, self.rng.randint(2, 5))).capitalize() + '.'
@@ -0,0 +1,79 @@
+import http.cookiejar
+import statistics
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ['/dashboard/', '/stats/', '/programmes/', '/superadmin/users-data/', '/superadmin/system-alerts/']
+
+class Command(BaseCommand):
+    help = "Benchmark de charge HTTP : compare le débit de plusieurs déploiements (ex. WSGI vs ASGI) sur les pages de lecture."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', action='append', required=True,
+                            help='URL de base d\'un serveur lancé (répéter pour comparer, ex. WSGI puis ASGI)')
+        parser.add_argument('--path', action='append', help='Chemin à tester (répétable, défaut : pages de lecture)')
+        parser.add_argument('--username', required=True, help='Compte utilisé pour se connecter')
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--requests', type=int, default=200, help='Nombre de requêtes par chemin')
+        parser.add_argument('--concurrency', type=int, default=10, help='Nombre de requêtes simultanées')
+
+    def handle(self, *args, **options):
+        paths = options.get('path') or DEFAULT_PATHS
+        for base_url in options['base_url']:
+            base_url = base_url.rstrip('/')
+            cookie = self.login(base_url, options['username'], options['password'])
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{base_url}"))
+            self.stdout.write(f"{'Chemin':<32}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'erreurs':>10}")
+            for path in paths:
+                result = self.run_path(base_url + path, cookie, options['requests'], options['concurrency'])
+                self.stdout.write(
+                    f"{path:<32}{result['throughput']:>10.1f}{result['p50']:>10.1f}"
+                    f"{result['p95']:>10.1f}{result['p99']:>10.1f}{result['errors']:>10}"
+                )
+
+    def login(self, base_url, username, password):
+        """Se connecte via /login/ et retourne l'en-tête Cookie de session à réutiliser"""
+        jar = http.cookiejar.CookieJar()
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+        opener.open(f'{base_url}/login/')
+        csrf_token = next((c.value for c in jar if c.name == 'csrftoken'), None)
+        if csrf_token is None:
+            raise CommandError(f"Pas de cookie CSRF reçu de {base_url}/login/")
+        data = urllib.parse.urlencode({
+            'username': username, 'password': password, 'csrfmiddlewaretoken': csrf_token,
+        }).encode()
+        request = urllib.request.Request(f'{base_url}/login/', data=data, headers={'Referer': f'{base_url}/login/'})
+        opener.open(request)
+        if not any(c.name == 'sessionid' for c in jar):
+            raise CommandError(f"Échec de connexion sur {base_url}")
+        return '; '.join(f'{c.name}={c.value}' for c in jar)
+
+    def run_path(self, url, cookie, total, concurrency):
+        def fetch(_):
+            request = urllib.request.Request(url, headers={'Cookie': cookie})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                    ok = response.status == 200
+            except Exception:
+                ok = False
+            return time.perf_counter() - start, ok
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(fetch, range(total)))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(duration * 1000 for duration, _ in results)
+        centiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            'throughput': total / elapsed,
+            'p50': centiles[49],
+            'p95': centiles[94],
+            'p99': centiles[98],
+            'errors': sum(1 for _, ok in results if not ok),
+        }
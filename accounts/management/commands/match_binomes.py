@@ -0,0 +1,67 @@
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+from accounts.matching import match_programme, summary
+from accounts.models import Programme, User
+
+class Command(BaseCommand):
+    help = ("Apparie les mentors et mentorés d'un programme (acceptation différée vectorisée) "
+            "et crée les binômes en masse, avec un seul lot d'invitations.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('programme', type=int, help='ID du programme')
+        parser.add_argument('--max-mentees', type=int, default=3, help='Mentorés maximum par mentor (binômes actifs inclus)')
+        parser.add_argument('--preferences', help='CSV mentore,mentor,score : scores de préférence (plus haut = préféré)')
+        parser.add_argument('--exclude', help='CSV mentore,mentor : paires interdites (même ordre que --preferences)')
+        parser.add_argument('--mentors', nargs='+', metavar='USERNAME', help='Restreindre aux mentors listés')
+        parser.add_argument('--mentees', nargs='+', metavar='USERNAME', help='Restreindre aux mentorés listés')
+        parser.add_argument('--seed', type=int, default=None, help='Graine du départage des égalités')
+        parser.add_argument('--dry-run', action='store_true', help="Calculer l'appariement sans rien enregistrer")
+
+    def handle(self, *args, **options):
+        try:
+            programme = Programme.objects.get(pk=options['programme'])
+        except Programme.DoesNotExist:
+            raise CommandError(f"Programme {options['programme']} introuvable")
+
+        preferences = {}
+        for mentee, mentor, score in self.read_csv(options['preferences'], 3):
+            try:
+                preferences[(mentee, mentor)] = float(score)
+            except ValueError:
+                raise CommandError(f"Score invalide dans --preferences : {score!r}")
+        exclusions = [tuple(row) for row in self.read_csv(options['exclude'], 2)]
+
+        start = time.perf_counter()
+        result = match_programme(
+            programme,
+            max_mentees=options['max_mentees'],
+            preferences=preferences,
+            exclusions=exclusions,
+            seed=options['seed'],
+            mentors=options['mentors'],
+            mentees=options['mentees'],
+            commit=not options['dry_run'],
+        )
+        elapsed = time.perf_counter() - start
+
+        stats = summary(result)
+        for key, value in stats.items():
+            self.stdout.write(f"{key:<20}{value:>10}")
+        action = "calculés (--dry-run)" if options['dry_run'] else "créés"
+        self.stdout.write(self.style.SUCCESS(f"{stats['binomes']} binôme(s) {action} en {elapsed:.2f} s"))
+
+    def read_csv(self, path, columns):
+        """Lignes du CSV avec les noms d'utilisateur convertis en IDs (une seule requête)"""
+        if not path:
+            return []
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = [row for row in csv.reader(f) if row and not row[0].startswith('#')]
+        if any(len(row) != columns for row in rows):
+            raise CommandError(f"{path} : {columns} colonnes attendues par ligne")
+        usernames = {value.strip() for row in rows for value in row[:2]}
+        ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+        unknown = usernames - ids.keys()
+        if unknown:
+            raise CommandError(f"{path} : utilisateur(s) inconnu(s) : {', '.join(sorted(unknown)[:10])}")
+        return [[ids[row[0].strip()], ids[row[1].strip()], *row[2:]] for row in rows]
@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from accounts.models import TermFrequency
+from accounts.text_stats import rebuild
+
+class Command(BaseCommand):
+    help = ("Recalcule les fréquences des mots et bigrammes des réponses ouvertes "
+            "(après un loaddata, une modification SQL directe ou pour corriger une dérive).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--question', type=int, action='append', dest='questions',
+                            help='Limiter à une question (répétable)')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rebuild(question_ids=options['questions'])
+        elapsed = time.perf_counter() - start
+        total = TermFrequency.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"{total} termes recalculés en {elapsed:.1f} s"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from accounts.counters import COUNTER_FIELDS, reconcile
+
+class Command(BaseCommand):
+    help = ("Vérifie les compteurs de progression de Binome/Programme contre JalonBinome, "
+            "corrige les écarts et rafraîchit les jalons en retard (à planifier chaque jour).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Signaler les écarts sans les corriger')
+        parser.add_argument('--programme', type=int, action='append', dest='programmes',
+                            help='Limiter à un programme (répétable)')
+
+    def handle(self, *args, **options):
+        fix = not options['dry_run']
+        with transaction.atomic():
+            ecarts = reconcile(fix=fix, programme_ids=options['programmes'])
+
+        for model, lignes in ecarts.items():
+            for ligne in lignes[:20]:
+                details = ', '.join(
+                    f"{field} {ligne[field]} -> {ligne[f'attendu_{field}']}"
+                    for field in COUNTER_FIELDS if ligne[field] != ligne[f'attendu_{field}']
+                )
+                self.stdout.write(f"{model} #{ligne['pk']} : {details}")
+            if len(lignes) > 20:
+                self.stdout.write(f"{model} : ... et {len(lignes) - 20} autre(s)")
+
+        total = sum(len(lignes) for lignes in ecarts.values())
+        if not total:
+            self.stdout.write(self.style.SUCCESS("Compteurs à jour"))
+        elif fix:
+            self.stdout.write(self.style.SUCCESS(f"{total} ligne(s) corrigée(s)"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{total} ligne(s) en écart (--dry-run : rien n'a été modifié)"))
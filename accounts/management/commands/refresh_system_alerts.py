@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from accounts.alerts import refresh_snapshot, refresh_interval
+
+class Command(BaseCommand):
+    help = "Évalue les règles d'alerte et les sondes de santé puis stocke l'instantané dans le cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Rafraîchir en continu au lieu d\'une seule fois')
+        parser.add_argument('--interval', type=int, default=None, help='Intervalle en secondes pour --loop')
+
+    def handle(self, *args, **options):
+        interval = options.get('interval') or refresh_interval()
+        while True:
+            snapshot = refresh_snapshot()
+            self.stdout.write(self.style.SUCCESS(
+                f"Instantané généré à {snapshot['generated_at']} : {len(snapshot['alerts'])} alerte(s)"
+            ))
+            if not options.get('loop'):
+                break
+            time.sleep(interval)
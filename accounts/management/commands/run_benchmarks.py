@@ -0,0 +1,196 @@
+import json
+import statistics
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+from accounts.middleware import track_queries
+from accounts.management.commands.benchmark_startup import measure_startup
+
+SCALES = {
+    'small': {'programmes': 2, 'binomes': 50, 'jalons': 5},
+    'medium': {'programmes': 10, 'binomes': 200, 'jalons': 10},
+    'large': {'programmes': 50, 'binomes': 1000, 'jalons': 10},
+}
+EXPORT_TYPES = ['users', 'programmes', 'binomes', 'jalons', 'feedbacks']
+
+
+class Command(BaseCommand):
+    help = ("Benchmarks des chemins critiques (dashboards, stats, exports, feedback, commandes) sur des jeux "
+            "de données générés, avec comparaison à une référence JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='small,medium', help=f"Échelles à tester parmi {', '.join(SCALES)}")
+        parser.add_argument('--iterations', type=int, default=10, help='Mesures par scénario')
+        parser.add_argument('--baseline', default=str(Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'),
+                            help='Fichier de référence JSON')
+        parser.add_argument('--write-baseline', action='store_true', help='Enregistrer les résultats comme nouvelle référence')
+        parser.add_argument('--threshold', type=float, default=0.25, help='Tolérance de régression sur la latence p50 (0.25 = +25 %%)')
+        parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                            help='Écart de latence minimal (ms) pour signaler une régression, en dessous c\'est du bruit')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Sortir en erreur si une régression est détectée')
+        parser.add_argument('--startup-runs', type=int, default=5,
+                            help='Démarrages à froid mesurés (processus neufs, 0 pour ignorer)')
+
+    def handle(self, *args, **options):
+        scales = [scale.strip() for scale in options['scales'].split(',')]
+        unknown = set(scales) - set(SCALES)
+        if unknown:
+            raise CommandError(f"Échelle(s) inconnue(s) : {', '.join(sorted(unknown))}")
+
+        # Base de test jetable + backend email locmem : rien n'est écrit dans la vraie base ni envoyé
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        results = {}
+        try:
+            for scale in scales:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\nÉchelle '{scale}'"))
+                call_command('flush', interactive=False, verbosity=0)
+                call_command('generate_dataset', prefix=f'bench_{scale}', stdout=StringIO(), **SCALES[scale])
+                for name, scenario in self.scenarios():
+                    key = f'{scale}:{name}'
+                    try:
+                        results[key] = self.measure(scenario, options['iterations'])
+                    except Exception as e:
+                        self.stdout.write(self.style.ERROR(f"{key:<36}ÉCHEC : {e}"))
+                        continue
+                    self.report(key, results[key])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if options['startup_runs']:
+            # Processus neufs sur la base configurée : seule la page d'accueil publique est demandée
+            self.stdout.write(self.style.MIGRATE_HEADING("\nDémarrage à froid"))
+            results['startup:first_response'] = self.startup(options['startup_runs'])
+            self.report('startup:first_response', results['startup:first_response'])
+
+        regressions = self.compare(results, options['baseline'], options['threshold'], options['min_delta_ms'])
+        if options['write_baseline']:
+            path = Path(options['baseline'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(results, indent=2, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f"Référence enregistrée : {path}"))
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{len(regressions)} régression(s) détectée(s)")
+
+    def scenarios(self):
+        from accounts.models import User, Binome, Programme, FeedbackForm
+
+        admin = User.objects.create_user('bench_admin', 'bench_admin@example.com', 'password', role='ADF')
+        rh = User.objects.filter(role='RH').first()
+        mentor = Binome.objects.select_related('mentor').first().mentor
+        mentee = Binome.objects.select_related('mentore').first().mentore
+        programme_id = Programme.objects.values_list('id', flat=True).first()
+        form_id = FeedbackForm.objects.values_list('id', flat=True).first()
+
+        clients = {}
+        for role, user in [('adf', admin), ('rh', rh), ('mentor', mentor), ('mentee', mentee)]:
+            clients[role] = Client()
+            clients[role].force_login(user)
+
+        def get(role, url):
+            return lambda: self.consume(clients[role].get(url))
+
+        def export(export_type):
+            return lambda: self.consume(clients['rh'].post(
+                reverse('export_data'), {'export_type': export_type, 'data_types': EXPORT_TYPES}
+            ))
+
+        scenarios = [(f'dashboard[{role}]', get(role, reverse('dashboard'))) for role in clients]
+        scenarios += [
+            ('global_stats', get('rh', reverse('global_stats'))),
+            ('programmes_list', get('rh', reverse('programmes_list'))),
+            ('export_csv', export('csv')),
+            ('dashboard_stats', lambda: call_command('dashboard_stats', programme_id=programme_id, stdout=StringIO())),
+            ('send_jalon_reminders', lambda: call_command('send_jalon_reminders', stdout=StringIO())),
+        ]
+        if form_id:
+            scenarios.append(('feedback_results', get('rh', reverse('feedback_results', args=[form_id]))))
+        try:
+            import xlsxwriter  # noqa: F401
+            scenarios.append(('export_excel', export('excel')))
+        except ImportError:
+            self.stdout.write(self.style.WARNING("xlsxwriter absent : scénario export_excel ignoré"))
+        return scenarios
+
+    def consume(self, response):
+        if response.status_code >= 400:
+            raise CommandError(f"Réponse HTTP {response.status_code}")
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def measure(self, scenario, iterations):
+        scenario()  # chauffe (caches, templates)
+        durations = []
+        queries = 0
+        for _ in range(iterations):
+            with track_queries() as stats:
+                start = time.perf_counter()
+                scenario()
+                durations.append((time.perf_counter() - start) * 1000)
+            queries = stats.count
+
+        # Mémoire mesurée à part : tracemalloc ralentit fortement l'exécution
+        tracemalloc.start()
+        scenario()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        centiles = statistics.quantiles(durations, n=100) if len(durations) > 1 else durations * 99
+        return {
+            'p50_ms': round(centiles[49], 2),
+            'p95_ms': round(centiles[94], 2),
+            'max_ms': round(max(durations), 2),
+            'queries': queries,
+            'peak_mb': round(peak / 1024 / 1024, 2),
+        }
+
+    def startup(self, runs):
+        durations = sorted(sample['total_ms'] for sample in measure_startup(reverse('home'), runs)[False])
+        centiles = statistics.quantiles(durations, n=100) if len(durations) > 1 else durations * 99
+        return {
+            'p50_ms': round(centiles[49], 2),
+            'p95_ms': round(centiles[94], 2),
+            'max_ms': round(max(durations), 2),
+            'queries': 0,
+            'peak_mb': 0.0,
+        }
+
+    def report(self, key, result):
+        self.stdout.write(
+            f"{key:<36}p50 {result['p50_ms']:>9.1f} ms   p95 {result['p95_ms']:>9.1f} ms   "
+            f"{result['queries']:>5} requêtes   {result['peak_mb']:>8.2f} Mo"
+        )
+
+    def compare(self, results, baseline_path, threshold, min_delta_ms):
+        path = Path(baseline_path)
+        if not path.exists():
+            self.stdout.write(self.style.WARNING(f"\nPas de référence ({path}) : comparaison ignorée"))
+            return []
+        baseline = json.loads(path.read_text())
+        regressions = []
+        self.stdout.write(self.style.MIGRATE_HEADING("\nComparaison avec la référence"))
+        for key, result in results.items():
+            reference = baseline.get(key)
+            if reference is None:
+                continue
+            slower = (result['p50_ms'] > reference['p50_ms'] * (1 + threshold)
+                      and result['p50_ms'] - reference['p50_ms'] > min_delta_ms)
+            more_queries = result['queries'] > reference['queries']
+            ratio = result['p50_ms'] / reference['p50_ms'] if reference['p50_ms'] else 1
+            line = f"{key:<36}x{ratio:.2f} latence   {reference['queries']} -> {result['queries']} requêtes"
+            if slower or more_queries:
+                regressions.append(key)
+                self.stdout.write(self.style.ERROR(f"{line}   RÉGRESSION"))
+            else:
+                self.stdout.write(line)
+        return regressions
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from accounts.models import Jalon, Binome
 from accounts.utils import send_notification_email
+from accounts.alerts import record_reminder_run
 from datetime import timedelta
 
 class Command(BaseCommand):
@@ -19,4 +20,5 @@ class Command(BaseCommand):
                 subject = f"Rappel : Jalon '{jalon.titre}' à venir dans le programme '{jalon.programme.nom}'"
                 message = f"Le jalon '{jalon.titre}' est prévu pour le {jalon.date_echeance}. Merci de préparer vos actions."
                 send_notification_email(subject, message, [mentor_email, mentore_email])
+        record_reminder_run()
         self.stdout.write(self.style.SUCCESS('Rappels envoyés pour les jalons à J-7.'))
@@ -0,0 +1,162 @@
+"""
+Appariement mentors / mentorés à grande échelle.
+
+L'affectation est calculée par acceptation différée (Gale-Shapley) à capacités,
+entièrement vectorisée avec NumPy : à chaque tour, tous les mentorés libres
+proposent en même temps à leur meilleur mentor restant, et chaque mentor garde
+ses ``capacité`` meilleures propositions. Le résultat est stable (aucun couple
+mentor/mentoré ne préférerait se choisir mutuellement) et une cohorte de
+5 000 × 5 000 se traite en quelques secondes.
+
+Les scores de préférence sont optionnels. À préférences égales, les mentors les
+moins chargés (indice de charge, voir accounts/workload.py) sont favorisés, puis
+un bruit pseudo-aléatoire reproductible (``seed``) départage les égalités. Les
+paires exclues ont un score de -inf.
+"""
+from collections import Counter
+
+import numpy as np
+from django.db import transaction
+
+from .counters import recompute as recompute_counters
+from .models import Binome, Jalon, JalonBinome, User
+from .utils import EmailNotificationService
+from .workload import get_workload, invalidate as invalidate_workload
+
+# Poids de la charge dans le score : au-dessus du bruit de départage, sous une préférence explicite
+LOAD_WEIGHT = np.float32(0.01)
+
+
+def build_scores(mentees, mentors, preferences=None, exclusions=(), seed=None, load=None):
+    """
+    Matrice (mentorés × mentors) : préférences - charge + bruit de départage, -inf pour les paires exclues.
+    ``preferences`` {(mentee_id, mentor_id): score} et ``exclusions`` [(mentee_id, mentor_id)] : mentoré en premier.
+    """
+    rng = np.random.default_rng(seed)
+    scores = rng.random((len(mentees), len(mentors)), dtype=np.float32) * np.float32(1e-3)
+    if load is not None:
+        scores -= LOAD_WEIGHT * np.asarray(load, dtype=np.float32)[None, :]
+    mentee_index = {user_id: i for i, user_id in enumerate(mentees)}
+    mentor_index = {user_id: j for j, user_id in enumerate(mentors)}
+
+    for (mentee_id, mentor_id), score in (preferences or {}).items():
+        i, j = mentee_index.get(mentee_id), mentor_index.get(mentor_id)
+        if i is not None and j is not None:
+            scores[i, j] += score
+    for mentee_id, mentor_id in exclusions:
+        i, j = mentee_index.get(mentee_id), mentor_index.get(mentor_id)
+        if i is not None and j is not None:
+            scores[i, j] = -np.inf
+    return scores
+
+
+def deferred_acceptance(scores, capacities):
+    """Indice du mentor affecté à chaque mentoré (-1 si aucun) ; capacities[j] places pour le mentor j"""
+    n_mentees = scores.shape[0]
+    capacities = np.asarray(capacities, dtype=np.int64)
+    # Un mentor sans place restante n'est proposé à personne
+    scores = np.where(capacities > 0, scores, np.float32(-np.inf))
+    # Ordre de préférence de chaque mentoré, et nombre de mentors acceptables
+    order = np.argsort(-scores, axis=1, kind='stable').astype(np.int32)
+    acceptable = np.isfinite(scores).sum(axis=1)
+    next_choice = np.zeros(n_mentees, dtype=np.int64)
+    assignment = np.full(n_mentees, -1, dtype=np.int64)
+
+    free = np.flatnonzero(acceptable > 0)
+    while free.size:
+        targets = order[free, next_choice[free]].astype(np.int64)
+        next_choice[free] += 1
+
+        # Seuls les mentors sollicités à ce tour réexaminent leurs propositions retenues
+        held = np.flatnonzero(assignment >= 0)
+        held = held[np.isin(assignment[held], targets)]
+        proposals = np.concatenate([held, free])
+        proposal_mentors = np.concatenate([assignment[held], targets])
+        proposal_scores = scores[proposals, proposal_mentors]
+
+        # Tri par mentor puis score décroissant ; rang de chaque proposition chez son mentor
+        idx = np.lexsort((-proposal_scores, proposal_mentors))
+        proposals, proposal_mentors = proposals[idx], proposal_mentors[idx]
+        group_starts = np.flatnonzero(np.r_[True, proposal_mentors[1:] != proposal_mentors[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, proposal_mentors.size])
+        rank = np.arange(proposals.size) - np.repeat(group_starts, group_sizes)
+
+        accepted = rank < capacities[proposal_mentors]
+        assignment[proposals] = np.where(accepted, proposal_mentors, -1)
+        rejected = proposals[~accepted]
+        free = rejected[next_choice[rejected] < acceptable[rejected]]
+    return assignment
+
+
+def candidates(programme, mentors=None, mentees=None):
+    """Mentors actifs et mentorés actifs pas encore en binôme dans ce programme"""
+    mentor_qs = User.objects.filter(role='MENTOR', is_active=True)
+    mentee_qs = User.objects.filter(role='MENTEE', is_active=True).exclude(mentores__programme=programme)
+    if mentors is not None:
+        mentor_qs = mentor_qs.filter(username__in=mentors)
+    if mentees is not None:
+        mentee_qs = mentee_qs.filter(username__in=mentees)
+    return (list(mentor_qs.order_by('pk').values_list('pk', flat=True)),
+            list(mentee_qs.order_by('pk').values_list('pk', flat=True)))
+
+
+def mentor_load(mentor_ids):
+    """Binômes actifs de chaque mentor, d'après l'indice de charge recalculé"""
+    charge = {row['pk']: row['binomes_actifs'] for row in get_workload(refresh=True)}
+    return np.array([charge.get(pk, 0) for pk in mentor_ids], dtype=np.int64)
+
+
+def match_programme(programme, max_mentees=3, preferences=None, exclusions=(), seed=None,
+                    mentors=None, mentees=None, capacities=None, commit=True):
+    """
+    Calcule et (si commit) enregistre les binômes d'un programme.
+    Renvoie {'pairs': [(mentor_id, mentee_id)], 'unmatched': [mentee_id], 'binomes': [...]}.
+    """
+    mentor_ids, mentee_ids = candidates(programme, mentors, mentees)
+    load = mentor_load(mentor_ids)
+    if capacities is None:
+        # Places restantes : max_mentees moins les binômes actifs déjà suivis
+        capacities = np.maximum(max_mentees - load, 0)
+    else:
+        capacities = np.array([capacities.get(pk, 0) for pk in mentor_ids], dtype=np.int64)
+
+    pairs, unmatched = [], list(mentee_ids)
+    if mentor_ids and mentee_ids:
+        scores = build_scores(mentee_ids, mentor_ids, preferences, exclusions, seed, load=load)
+        assignment = deferred_acceptance(scores, capacities)
+        pairs = [(mentor_ids[j], mentee_ids[i]) for i, j in enumerate(assignment.tolist()) if j >= 0]
+        unmatched = [mentee_ids[i] for i in np.flatnonzero(assignment < 0).tolist()]
+
+    result = {'pairs': pairs, 'unmatched': unmatched, 'binomes': []}
+    if commit and pairs:
+        result['binomes'] = save_pairs(programme, pairs)
+    return result
+
+
+def save_pairs(programme, pairs):
+    """Un bulk_create des binômes et de leurs jalons ; invitations envoyées en un lot après commit"""
+    with transaction.atomic():
+        # bulk_create ne déclenche pas send_invitation_emails : les invitations partent groupées ci-dessous
+        binomes = Binome.objects.bulk_create(
+            [Binome(programme=programme, mentor_id=mentor_id, mentore_id=mentee_id) for mentor_id, mentee_id in pairs],
+            batch_size=2000,
+        )
+        jalon_ids = list(Jalon.objects.filter(programme=programme).values_list('pk', flat=True))
+        JalonBinome.objects.bulk_create(
+            (JalonBinome(binome_id=binome.pk, jalon_id=jalon_id) for binome in binomes for jalon_id in jalon_ids),
+            batch_size=2000,
+        )
+        recompute_counters(programme_ids=[programme.pk])
+        transaction.on_commit(invalidate_workload)
+        transaction.on_commit(lambda: EmailNotificationService.send_invitations(programme, pairs))
+    return binomes
+
+
+def summary(result):
+    charge = Counter(mentor_id for mentor_id, _ in result['pairs'])
+    return {
+        'binomes': len(result['pairs']),
+        'non_apparies': len(result['unmatched']),
+        'mentors_utilises': len(charge),
+        'charge_max': max(charge.values(), default=0),
+    }
@@ -0,0 +1,273 @@
+"""
+Instrumentation des requêtes SQL par requête HTTP.
+
+Chaque connexion reçoit un ``execute_wrapper`` qui alimente les statistiques de
+la requête en cours (portées par une ContextVar, donc valables aussi pour les
+vues asynchrones dont l'ORM s'exécute dans un thread). Le middleware publie
+ensuite un en-tête ``Server-Timing`` et une ligne de log structurée.
+
+``ReplicaStickinessMiddleware`` porte l'état du routage lecture/écriture
+(voir accounts/routers.py), ``CompressionMiddleware`` compresse les réponses
+dynamiques (voir accounts/compression.py).
+"""
+import contextvars
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.cache import patch_vary_headers
+
+from .compression import acompress_stream, compress, compress_stream, is_compressible, minify_html, negotiate
+from .routers import replica_configured, routing_state
+
+logger = logging.getLogger('accounts.perf')
+
+_current_stats = contextvars.ContextVar('query_stats', default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\bIN \((?:[^()]*)\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+
+def query_signature(sql):
+    """Normalise une requête (littéraux, listes IN) pour repérer les motifs N+1"""
+    sql = _LITERALS.sub('?', sql)
+    sql = _IN_LISTS.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class QueryStats:
+    def __init__(self, parent=None):
+        # Les mesures imbriquées (middleware sous track_queries) remontent au parent
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        self.signatures = Counter()
+
+    def record(self, sql, duration):
+        stats = self
+        signature = query_signature(sql)
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats.signatures[signature] += 1
+            stats = stats.parent
+
+    def duplicates(self, threshold=None):
+        if threshold is None:
+            threshold = getattr(settings, 'PERF_DUPLICATE_THRESHOLD', 3)
+        return {sql: n for sql, n in self.signatures.items() if n >= threshold}
+
+
+def _instrument(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record(sql, time.perf_counter() - start)
+
+
+def _install(connection):
+    if _instrument not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_instrument)
+
+
+@receiver(connection_created)
+def install_query_wrapper(sender, connection, **kwargs):
+    _install(connection)
+
+
+@contextmanager
+def track_queries():
+    """Mesure les requêtes SQL exécutées dans le bloc (hors requête HTTP : commandes, benchmarks)"""
+    for connection in connections.all(initialized_only=True):
+        _install(connection)
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryInstrumentationMiddleware:
+    """Nombre de requêtes SQL, temps SQL, doublons (N+1) et temps total par requête HTTP"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        # Connexions ouvertes avant le chargement du middleware
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = QueryStats(parent=_current_stats.get())
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        stats = QueryStats(parent=_current_stats.get())
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    def finish(self, request, response, stats, elapsed):
+        response.query_stats = stats
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else None
+        duplicates = stats.duplicates()
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+        over_budget = budget is not None and stats.count > budget
+
+        if getattr(settings, 'PERF_SERVER_TIMING', False):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"',
+                f'dup;desc="{len(duplicates)} N+1 signatures"',
+                f'total;dur={elapsed * 1000:.1f}',
+            ])
+
+        logger.log(
+            logging.WARNING if over_budget or duplicates else logging.INFO,
+            json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': view_name,
+                'status': response.status_code,
+                'queries': stats.count,
+                'budget': budget,
+                'db_ms': round(stats.duration * 1000, 1),
+                'total_ms': round(elapsed * 1000, 1),
+                'duplicates': [{'sql': sql[:200], 'count': n} for sql, n in duplicates.items()],
+            }, ensure_ascii=False),
+        )
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """Épingle sur la base principale, quelques secondes, les clients qui viennent d'écrire"""
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'db_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing_state(pinned=self.cookie_name in request.COOKIES) as state:
+            response = self.get_response(request)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        with routing_state(pinned=self.cookie_name in request.COOKIES) as state:
+            response = await self.get_response(request)
+        return self.finish(response, state)
+
+    def finish(self, response, state):
+        if state.wrote and replica_configured():
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compression gzip/brotli des réponses dynamiques au-delà de COMPRESSION_MIN_SIZE
+    octets, streaming compris, et allègement du HTML (HTML_MINIFY). Voir
+    accounts/compression.py.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process(request, await self.get_response(request), asgi=True)
+
+    def process(self, request, response, asgi=False):
+        if response.has_header('Content-Encoding') or not is_compressible(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and getattr(settings, 'HTML_MINIFY', True) \
+                and response['Content-Type'].startswith('text/html'):
+            response.content = minify_html(response.content)
+            response.headers['Content-Length'] = str(len(response.content))
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, codec)
+            elif asgi:
+                # Sinon Django consommerait tout l'itérateur d'un bloc avant d'envoyer quoi que ce soit
+                response.streaming_content = acompress_stream(_iterate_in_thread(response.streaming_content), codec)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, codec)
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024):
+                return response
+            compressed = compress(response.content, codec)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # Corps différent selon le codage : l'ETag fort devient faible (If-None-Match reste comparé)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codec
+        return response
+
+
+async def _iterate_in_thread(iterator):
+    # Un morceau à la fois dans le thread de la requête (thread_sensitive) : curseurs et connexion restent valides
+    iterator = iter(iterator)
+    step = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await step(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:56
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill_counters(apps, schema_editor):
+    JalonBinome = apps.get_model('accounts', 'JalonBinome')
+    today = timezone.localdate()
+    conditions = {
+        'jalons_total': Q(),
+        'jalons_todo': Q(statut='TODO'),
+        'jalons_wait': Q(statut='WAIT'),
+        'jalons_done': Q(statut='DONE'),
+        'jalons_overdue': Q(statut='TODO', jalon__date_echeance__lt=today),
+    }
+    for model_name, filtre in (('Binome', 'binome'), ('Programme', 'binome__programme')):
+        apps.get_model('accounts', model_name).objects.update(**{
+            field: Coalesce(Subquery(
+                JalonBinome.objects.filter(condition, **{filtre: OuterRef('pk')})
+                .order_by().values(filtre).annotate(n=Count('id')).values('n'),
+                output_field=IntegerField(),
+            ), 0)
+            for field, condition in conditions.items()
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_feedbackquestion_options_binome_date_creation_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='binome',
+            name='jalons_done',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='binome',
+            name='jalons_overdue',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='binome',
+            name='jalons_todo',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='binome',
+            name='jalons_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='binome',
+            name='jalons_wait',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='programme',
+            name='jalons_done',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='programme',
+            name='jalons_overdue',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='programme',
+            name='jalons_todo',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='programme',
+            name='jalons_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='programme',
+            name='jalons_wait',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations
+
+# Copie figée de accounts/search.py à la création de la migration : le module vivant peut changer.
+# Mêmes expressions que la recherche : le planificateur n'utilise l'index que si elles correspondent
+SEARCH_CONFIG = 'french'
+INDEXES = [
+    ('FeedbackAnswer', 'feedbackanswer_answer_fts', 'answer'),
+    ('JalonBinome', 'jalonbinome_commentaire_fts', 'commentaire'),
+]
+FTS_TABLES = {
+    'accounts_feedbackanswer_fts': (
+        'answer',
+        "SELECT a.id, a.answer FROM accounts_feedbackanswer a "
+        "JOIN accounts_feedbackquestion q ON q.id = a.question_id "
+        "WHERE q.type = 'TEXT' AND a.answer <> ''",
+    ),
+    'accounts_jalonbinome_fts': (
+        'commentaire',
+        "SELECT id, commentaire FROM accounts_jalonbinome WHERE commentaire <> ''",
+    ),
+}
+
+
+def _gin_indexes():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return [
+        (model_name, GinIndex(SearchVector(field, config=SEARCH_CONFIG), name=name))
+        for model_name, name, field in INDEXES
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for model_name, index in _gin_indexes():
+            schema_editor.add_index(apps.get_model('accounts', model_name), index)
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            for table, (field, rows) in FTS_TABLES.items():
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                    f"USING fts5({field}, tokenize='unicode61 remove_diacritics 2')"
+                )
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.execute(f"INSERT INTO {table} (rowid, {field}) {rows}")
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for model_name, index in _gin_indexes():
+            schema_editor.remove_index(apps.get_model('accounts', model_name), index)
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            for table in FTS_TABLES:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_binome_programme_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:32
+
+import re
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copie figée du découpage de accounts/text_stats.py à la création de la migration :
+# le module vivant peut changer, rebuild_term_frequencies recalcule alors avec la version courante
+STOP_WORDS = frozenset("""
+a à afin ai aie aient aies ait alors as au aucun aucune aupres auquel aura aurai auraient aurais aurait
+auras aurez auriez aurions aurons auront aussi autre autres aux avaient avais avait avant avec avez aviez
+avions avoir avons ayant ayez ayons bah beaucoup bien bon car ce ceci cela celle celles celui cependant
+certain certaine certaines certains ces cet cette ceux chaque chez ci comme comment dans de des desquelles
+desquels dessous dessus deux doit donc dont du duquel durant elle elles en encore entre es est et etaient
+etais etait etant ete etes etiez etions etre eu eue eues eûmes eurent eus eusse eussent eusses eussiez
+eussions eut eût eûtes eux étaient étais était étant été étée étées étés êtes étiez étions être fait faire
+fais faisait font fûmes furent fus fusse fussent fusses fussiez fussions fut fût fûtes hors ici il ils je
+jusqu jusque la là laquelle le lequel les lesquelles lesquels leur leurs lors lorsque lui ma mais me même
+mêmes mes moi moins mon ne ni non nos notre nous on ont ou où par parce pas peu peut plus plutôt pour
+pourquoi quand que quel quelle quelles quels qui quoi sa sans se selon sera serai seraient serais serait
+seras serez seriez serions serons seront ses si sien sienne soi soient sois soit sommes son sont sous
+soyez soyons suis sur ta te tes toi ton tous tout toute toutes très tu un une unes uns vers via voici
+voilà vos votre vous vu ça
+""".split())
+
+MAX_TERM_LENGTH = 40
+_WORD = re.compile(r'[^\W\d_]+')
+_SEGMENT = re.compile(r'[.!?;:,()\n\r\t•-]+')
+
+
+def terms(text):
+    found = set()
+    for segment in _SEGMENT.split(text.lower()):
+        words = [
+            word for word in _WORD.findall(segment)
+            if len(word) > 2 and len(word) <= MAX_TERM_LENGTH and word not in STOP_WORDS
+        ]
+        found.update(words)
+        found.update(f'{first} {second}' for first, second in zip(words, words[1:]))
+    return found
+
+
+def count_terms(rows):
+    deltas = defaultdict(Counter)
+    for question_id, text in rows:
+        deltas[question_id].update(terms(text))
+    return deltas
+
+
+def backfill_term_frequencies(apps, schema_editor):
+    FeedbackAnswer = apps.get_model('accounts', 'FeedbackAnswer')
+    TermFrequency = apps.get_model('accounts', 'TermFrequency')
+    rows = FeedbackAnswer.objects.filter(question__type='TEXT').values_list('question_id', 'answer')
+    deltas = count_terms(rows.iterator(chunk_size=5000))
+    TermFrequency.objects.bulk_create(
+        (
+            TermFrequency(question_id=question_id, term=term, bigram=' ' in term, answers=count)
+            for question_id, counter in deltas.items()
+            for term, count in counter.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermFrequency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=120)),
+                ('bigram', models.BooleanField(default=False)),
+                ('answers', models.PositiveIntegerField(default=0, help_text='Nombre de réponses contenant le terme')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_frequencies', to='accounts.feedbackquestion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'bigram', '-answers'], name='term_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('question', 'term'), name='unique_term_per_question')],
+            },
+        ),
+        migrations.RunPython(backfill_term_frequencies, migrations.RunPython.noop),
+    ]
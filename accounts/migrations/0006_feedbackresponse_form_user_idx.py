@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_term_frequency'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedbackresponse',
+            index=models.Index(fields=['form', 'user'], name='feedbackresponse_form_user_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser, UserManager
+from django.utils import timezone
 
 class User(AbstractUser):
     ROLE_CHOICES = [
@@ -32,8 +33,25 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
 
+# Compteurs de progression dénormalisés (voir accounts/counters.py)
+class CompteursJalons(models.Model):
+    jalons_total = models.PositiveIntegerField(default=0, editable=False)
+    jalons_todo = models.PositiveIntegerField(default=0, editable=False)
+    jalons_wait = models.PositiveIntegerField(default=0, editable=False)
+    jalons_done = models.PositiveIntegerField(default=0, editable=False)
+    jalons_overdue = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def progression(self):
+        if self.jalons_total > 0:
+            return round((self.jalons_done / self.jalons_total) * 100, 1)
+        return 0
+
 # Programme de mentoring
-class Programme(models.Model):
+class Programme(CompteursJalons):
     nom = models.CharField(max_length=100)
     description = models.TextField()
     date_debut = models.DateField()
@@ -54,7 +72,7 @@ class Jalon(models.Model):
         return f"{self.titre} ({self.programme.nom})"
 
 # Binôme mentor/mentoré
-class Binome(models.Model):
+class Binome(CompteursJalons):
     programme = models.ForeignKey(Programme, on_delete=models.CASCADE, related_name='binomes')
     mentor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentors', limit_choices_to={'role': 'MENTOR'})
     mentore = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentores', limit_choices_to={'role': 'MENTEE'})
@@ -103,6 +121,12 @@ class FeedbackResponse(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date_reponse = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # « A déjà répondu ? » pour chaque formulaire (accounts/pending_feedback.py)
+            models.Index(fields=['form', 'user'], name='feedbackresponse_form_user_idx'),
+        ]
+
     def __str__(self):
         return f"Réponse de {self.user.username} à {self.form.titre}"
 
@@ -131,3 +155,39 @@ class JalonBinome(models.Model):
 
     def __str__(self):
         return f"{self.binome} - {self.jalon.titre} [{self.get_statut_display()}]"
+
+    def marquer_realise(self, commentaire=''):
+        """TODO -> WAIT : le mentoré déclare le jalon réalisé"""
+        self._transition('WAIT', commentaire=commentaire, date_realisation=timezone.now())
+
+    def valider(self):
+        """WAIT -> DONE : le mentor valide le jalon"""
+        self._transition('DONE', date_validation=timezone.now())
+
+    def _transition(self, statut, **champs):
+        from .counters import apply_transition
+        ancien = self.statut
+        with transaction.atomic():
+            for nom, valeur in champs.items():
+                setattr(self, nom, valeur)
+            self.statut = statut
+            self.save()
+            apply_transition([self], ancien, statut)
+
+# Fréquences des mots et bigrammes des réponses ouvertes (accounts/text_stats.py)
+class TermFrequency(models.Model):
+    question = models.ForeignKey(FeedbackQuestion, on_delete=models.CASCADE, related_name='term_frequencies')
+    term = models.CharField(max_length=120)
+    bigram = models.BooleanField(default=False)
+    answers = models.PositiveIntegerField(default=0, help_text="Nombre de réponses contenant le terme")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['question', 'term'], name='unique_term_per_question'),
+        ]
+        indexes = [
+            models.Index(fields=['question', 'bigram', '-answers'], name='term_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.answers})"
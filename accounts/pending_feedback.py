@@ -0,0 +1,38 @@
+"""
+Formulaires de feedback qu'un mentor ou un mentoré doit encore remplir.
+
+Un formulaire est en attente pour l'utilisateur s'il est actif, s'il appartient
+au programme d'un de ses binômes (et, s'il est lié à un jalon, si ce jalon est
+validé pour ce binôme) et si l'utilisateur n'y a pas encore répondu. Le tout
+tient en une requête : deux ``Exists`` corrélés pour la pertinence, un
+``NOT EXISTS`` sur FeedbackResponse servi par l'index (form, user).
+
+Les binômes viennent du périmètre de l'utilisateur (accounts/auth.get_scope) :
+aucune jointure sur Binome pour les retrouver.
+"""
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Binome, FeedbackForm, FeedbackResponse, JalonBinome
+
+
+def answered(user_id):
+    """Condition « l'utilisateur a répondu au formulaire » (à utiliser sur FeedbackForm)"""
+    return Exists(FeedbackResponse.objects.filter(form_id=OuterRef('pk'), user_id=user_id))
+
+
+def relevant_forms(binome_ids):
+    """Formulaires actifs des programmes des binômes, jalon validé le cas échéant"""
+    in_programme = Exists(Binome.objects.filter(pk__in=binome_ids, programme_id=OuterRef('programme_id')))
+    jalon_done = Exists(JalonBinome.objects.filter(
+        binome_id__in=binome_ids, jalon_id=OuterRef('jalon_id'), statut='DONE',
+    ))
+    return FeedbackForm.objects.filter(is_active=True).filter(
+        Q(jalon__isnull=True) & in_programme | Q(jalon__isnull=False) & jalon_done
+    )
+
+
+def pending_forms(user_id, binome_ids):
+    """Formulaires pertinents auxquels l'utilisateur n'a pas encore répondu"""
+    if not binome_ids:
+        return FeedbackForm.objects.none()
+    return relevant_forms(binome_ids).filter(~answered(user_id))
@@ -0,0 +1,114 @@
+"""
+Routage des lectures lourdes vers un réplica en lecture.
+
+Si ``REPLICA_DATABASE_URL`` est défini, l'alias ``replica`` existe et les vues
+ou commandes décorées par ``reads_from_replica`` (exports, recherche, commandes
+de statistiques) y lisent ; tout le reste, et toutes les écritures, restent sur
+``default``. Sans réplica, le routeur ne change rien.
+
+Les vues conditionnelles (``accounts.versions.conditional_on``) lisent toujours
+sur ``default`` : leur ETag vient des versions de données, changées au commit
+sur le primaire ; un réplica en retard y associerait un contenu périmé que les
+navigateurs garderaient jusqu'à la prochaine écriture.
+
+Lecture de ses propres écritures : dès qu'une requête écrit, ses lectures
+suivantes repassent sur ``default`` et ``ReplicaStickinessMiddleware`` pose un
+cookie qui épingle le navigateur sur ``default`` pendant
+``REPLICA_STICKY_SECONDS`` secondes, le temps que le réplica rattrape son
+retard.
+"""
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+class RoutingState:
+    # Objet partagé (et non valeur de la ContextVar) : les threads de sync_to_async
+    # et les tâches d'asyncio.gather copient le contexte mais voient les mêmes drapeaux
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = False
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def routing_state(pinned=False):
+    token = _state.set(RoutingState(pinned))
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Lectures du bloc sur le réplica (sauf après une écriture ou si le client est épinglé) ; sur default si not enabled"""
+    state = _state.get()
+    if state is None:
+        with routing_state(), use_replica(enabled):
+            yield
+        return
+    previous = state.replica
+    state.replica = enabled and replica_configured()
+    try:
+        yield
+    finally:
+        state.replica = previous
+
+
+def _reading_from(func, replica):
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def _wrapped(*args, **kwargs):
+            with use_replica(replica):
+                return await func(*args, **kwargs)
+        return _wrapped
+
+    @wraps(func)
+    def _wrapped(*args, **kwargs):
+        with use_replica(replica):
+            return func(*args, **kwargs)
+    return _wrapped
+
+
+def reads_from_replica(func):
+    """Décorateur de vue (sync ou async) ou de ``handle`` de commande"""
+    return _reading_from(func, True)
+
+
+def reads_from_primary(func):
+    """Lectures sur default même sous ``reads_from_replica`` (contenu qui doit suivre les versions de données)"""
+    return _reading_from(func, False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica or state.pinned or state.wrote:
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Même données des deux côtés : les objets lus sur le réplica se relient à ceux de default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Le réplica reçoit le schéma par réplication
+        return db != REPLICA_ALIAS
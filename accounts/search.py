@@ -0,0 +1,272 @@
+"""
+Recherche plein texte dans les réponses ouvertes des feedbacks (questions TEXT)
+et les commentaires de jalons.
+
+- PostgreSQL : index GIN sur ``to_tsvector('french', ...)`` (migration 0004),
+  requêtes ``websearch_to_tsquery`` classées par ``ts_rank``, extraits par
+  ``ts_headline``.
+- SQLite : tables FTS5 fantômes (``rowid`` = id de la ligne indexée) tenues à jour
+  par les signaux (accounts/signals.py) ; les lignes supprimées en cascade en
+  sont retirées d'un coup par ``unindex_rows()``, les réponses d'une question
+  qui entre dans le type TEXT ou en sort sont réindexées par
+  ``reindex_question()``, et les chargements en masse, qui contournent les
+  signaux, appellent ``rebuild()``. Classement bm25.
+
+``search()`` renvoie une séquence paresseuse (``count()`` et tranches) que
+``Paginator`` découpe : seule la page affichée est lue et classée.
+"""
+import re
+from datetime import datetime, time, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import FeedbackAnswer, JalonBinome
+
+SEARCH_CONFIG = 'french'
+# Délimiteurs des termes trouvés dans les extraits, remplacés par <mark> après échappement du texte
+MARK_START, MARK_END = '\x02', '\x03'
+
+KINDS = {
+    'answers': {
+        'model': FeedbackAnswer,
+        'field': 'answer',
+        'fts_table': 'accounts_feedbackanswer_fts',
+        'programme': 'response__form__programme_id',
+        'form': 'response__form_id',
+        'date': 'response__date_reponse',
+        'related': ('question', 'response__user', 'response__form__programme'),
+    },
+    'comments': {
+        'model': JalonBinome,
+        'field': 'commentaire',
+        'fts_table': 'accounts_jalonbinome_fts',
+        'programme': 'binome__programme_id',
+        'form': None,
+        'date': 'date_realisation',
+        'related': ('jalon', 'binome__mentor', 'binome__mentore', 'binome__programme'),
+    },
+}
+
+_TERM = re.compile(r'(\w+)(\*?)')
+
+
+def uses_fts(using=None):
+    return (using or connection).vendor == 'sqlite'
+
+
+# --- Tables FTS5 (SQLite) ---
+
+def create_fts_tables(cursor):
+    for spec in KINDS.values():
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {spec['fts_table']} "
+            f"USING fts5({spec['field']}, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_fts_tables(cursor):
+    for spec in KINDS.values():
+        cursor.execute(f"DROP TABLE IF EXISTS {spec['fts_table']}")
+
+
+def rebuild(using=None):
+    """Réindexe tout (SQLite) : après bulk_create, restauration ou flush"""
+    connection_ = using or connection
+    if not uses_fts(connection_):
+        return
+    answers, comments = KINDS['answers'], KINDS['comments']
+    with connection_.cursor() as cursor:
+        create_fts_tables(cursor)
+        cursor.execute(f"DELETE FROM {answers['fts_table']}")
+        cursor.execute(
+            f"INSERT INTO {answers['fts_table']} (rowid, answer) "
+            "SELECT a.id, a.answer FROM accounts_feedbackanswer a "
+            "JOIN accounts_feedbackquestion q ON q.id = a.question_id "
+            "WHERE q.type = 'TEXT' AND a.answer <> ''"
+        )
+        cursor.execute(f"DELETE FROM {comments['fts_table']}")
+        cursor.execute(
+            f"INSERT INTO {comments['fts_table']} (rowid, commentaire) "
+            "SELECT id, commentaire FROM accounts_jalonbinome WHERE commentaire <> ''"
+        )
+
+
+def _connection_of(obj):
+    return connections[obj._state.db or DEFAULT_DB_ALIAS]
+
+
+def _replace(kind, pk, text, connection_):
+    table, field = KINDS[kind]['fts_table'], KINDS[kind]['field']
+    with connection_.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [pk])
+        if text:
+            cursor.execute(f"INSERT INTO {table} (rowid, {field}) VALUES (%s, %s)", [pk, text])
+
+
+def index_answer(answer):
+    connection_ = _connection_of(answer)
+    if uses_fts(connection_):
+        _replace('answers', answer.pk, answer.answer if answer.question.type == 'TEXT' else '', connection_)
+
+
+def index_comment(jalon_binome):
+    connection_ = _connection_of(jalon_binome)
+    if uses_fts(connection_):
+        _replace('comments', jalon_binome.pk, jalon_binome.commentaire, connection_)
+
+
+def unindex_rows(kind, queryset):
+    """Retire de l'index les lignes d'un QuerySet qui vont être supprimées, en une requête"""
+    connection_ = connections[queryset.db]
+    if not uses_fts(connection_):
+        return
+    sql, params = queryset.values('pk').query.sql_with_params()
+    with connection_.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {KINDS[kind]['fts_table']} WHERE rowid IN ({sql})", params)
+
+
+def reindex_question(question):
+    """Réponses d'une question dont le type a changé : retirées de l'index, puis réindexées si elle est TEXT"""
+    answers = FeedbackAnswer.objects.using(question._state.db or DEFAULT_DB_ALIAS).filter(question_id=question.pk)
+    connection_ = connections[answers.db]
+    if not uses_fts(connection_):
+        return
+    unindex_rows('answers', answers)
+    if question.type == 'TEXT':
+        sql, params = answers.exclude(answer='').values('pk', 'answer').query.sql_with_params()
+        with connection_.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {KINDS['answers']['fts_table']} (rowid, answer) {sql}", params)
+
+
+# --- Recherche ---
+
+class SearchHit:
+    def __init__(self, kind, obj, rank, snippet):
+        self.kind = kind
+        self.object = obj
+        self.rank = rank
+        self.snippet = mark_safe(escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _lookups(kind, programme_id=None, form_id=None, date_from=None, date_to=None):
+    spec = KINDS[kind]
+    lookups = {}
+    if programme_id:
+        lookups[spec['programme']] = programme_id
+    if form_id and spec['form']:
+        lookups[spec['form']] = form_id
+    # Bornes en datetime plutôt que __date : pas de conversion de fuseau ligne à ligne
+    if date_from:
+        lookups[f"{spec['date']}__gte"] = _start_of_day(date_from)
+    if date_to:
+        lookups[f"{spec['date']}__lt"] = _start_of_day(date_to + timedelta(days=1))
+    return lookups
+
+
+def fts_query(text):
+    """Requête MATCH sûre : chaque mot entre guillemets (tous requis), 'mot*' cherche un préfixe"""
+    return ' '.join(f'"{word}"{star}' for word, star in _TERM.findall(text))
+
+
+class _FtsResults:
+    def __init__(self, kind, query, lookups):
+        self.kind = kind
+        self.spec = KINDS[kind]
+        self.match = fts_query(query)
+        # La table FTS ne contient que les textes indexables : seuls les filtres de la page restent à appliquer
+        queryset = self.spec['model'].objects.all()
+        self.filtered = queryset.filter(**lookups) if lookups else None
+        self.connection = connections[queryset.db]
+        self._count = None
+
+    def _where(self):
+        table = self.spec['fts_table']
+        sql, params = f"{table} MATCH %s", [self.match]
+        if self.filtered is not None:
+            # Filtres (programme, formulaire, dates) traduits par l'ORM, vérifiés par clé primaire
+            # pour chaque ligne trouvée : le coût suit le nombre de correspondances, pas la taille de la table
+            matched = self.filtered.filter(pk=RawSQL(f'{table}.rowid', [])).values('pk')
+            sub_sql, sub_params = matched.query.sql_with_params()
+            sql += f" AND EXISTS ({sub_sql})"
+            params += list(sub_params)
+        return sql, params
+
+    def count(self):
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            else:
+                where, params = self._where()
+                with self.connection.cursor() as cursor:
+                    cursor.execute(f"SELECT COUNT(*) FROM {self.spec['fts_table']} WHERE {where}", params)
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        if not self.match:
+            return []
+        table = self.spec['fts_table']
+        where, params = self._where()
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, bm25({table}), snippet({table}, 0, %s, %s, '…', 24) FROM {table} "
+                f"WHERE {where} ORDER BY bm25({table}) LIMIT %s OFFSET %s",
+                [MARK_START, MARK_END, *params, page.stop - page.start, page.start],
+            )
+            rows = cursor.fetchall()
+        objects = self.spec['model'].objects.using(self.connection.alias).select_related(
+            *self.spec['related']
+        ).in_bulk([row[0] for row in rows])
+        # bm25 : plus petit = plus pertinent ; rang affiché positif
+        return [SearchHit(self.kind, objects[pk], -score, snippet) for pk, score, snippet in rows if pk in objects]
+
+
+class _PostgresResults:
+    def __init__(self, kind, query, queryset):
+        from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+
+        spec = KINDS[kind]
+        self.kind = kind
+        # Même expression que l'index GIN de la migration 0004 : l'index sert au filtre
+        vector = SearchVector(spec['field'], config=SEARCH_CONFIG)
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        self.queryset = queryset.annotate(document=vector).filter(document=search_query).annotate(
+            rank=SearchRank(vector, search_query),
+            snippet=SearchHeadline(
+                spec['field'], search_query, config=SEARCH_CONFIG,
+                start_sel=MARK_START, stop_sel=MARK_END, max_words=35, min_words=15,
+            ),
+        ).select_related(*spec['related']).order_by('-rank', '-pk')
+
+    def count(self):
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        return [SearchHit(self.kind, obj, obj.rank, obj.snippet) for obj in self.queryset[page]]
+
+
+def search(query, kind='answers', programme_id=None, form_id=None, date_from=None, date_to=None):
+    """Résultats classés par pertinence, à découper avec Paginator"""
+    spec = KINDS[kind]
+    lookups = _lookups(kind, programme_id, form_id, date_from, date_to)
+    queryset = spec['model'].objects.all()
+    # Base de lecture du routeur (réplique sous reads_from_replica), index compris
+    if connections[queryset.db].vendor == 'postgresql':
+        if kind == 'answers':
+            queryset = queryset.filter(question__type='TEXT')
+        return _PostgresResults(kind, query, queryset.filter(**lookups))
+    return _FtsResults(kind, query, lookups)
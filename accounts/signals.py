@@ -1,8 +1,17 @@
-from django.db.models.signals import post_save
+from django.db.models import Model, Q, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from .models import Binome
 from .models import JalonBinome
+from .models import FeedbackResponse
+from .models import User, Programme, Jalon, FeedbackForm, FeedbackQuestion, FeedbackAnswer
 from .utils import send_notification_email
+from .events import publish_counters
+from .counters import apply_presence, apply_removal
+from .versions import bump as bump_versions
+from .auth import forget_user
+from . import search
+from . import text_stats
 
 @receiver(post_save, sender=Binome)
 def send_invitation_emails(sender, instance, created, **kwargs):
@@ -41,3 +50,195 @@ def notify_jalon_status(sender, instance, **kwargs):
             feedback_subject = f"Feedback à remplir : {form.titre} ({jalon_titre})"
             feedback_message = f"Merci de remplir le formulaire de feedback '{form.titre}' pour le jalon '{jalon_titre}'."
             send_notification_email(feedback_subject, feedback_message, [mentor_email, mentore_email])
+
+
+# Variations de compteurs diffusées aux dashboards ouverts (flux SSE) ; celles des jalons
+# partent de counters.apply_transition, à chaque changement de statut
+@receiver(post_save, sender=FeedbackResponse)
+def publish_feedback_counters(sender, instance, created, **kwargs):
+    if created:
+        publish_counters(feedback_responses=1)
+
+
+# Compteurs dénormalisés de Binome/Programme : les transitions de statut passent par
+# JalonBinome.marquer_realise()/valider(), la création est suivie ici et la suppression
+# une fois par cascade (forget_deleted_rows)
+@receiver(post_save, sender=JalonBinome)
+def count_jalon_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        apply_presence(instance, 1)
+
+
+# Utilisateur mis en cache par CachedModelBackend (rôle, activation, mot de passe...)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+# Versions des données : invalident les fragments {% cache %} et les ETag concernés
+VERSIONED_MODELS = {
+    User: ('users',),
+    Programme: ('programmes', 'binomes'),
+    Jalon: ('programmes',),
+    Binome: ('programmes', 'binomes', 'activity'),
+    JalonBinome: ('programmes', 'activity'),
+    FeedbackForm: ('feedback',),
+    FeedbackQuestion: ('feedback',),
+    FeedbackResponse: ('activity', 'feedback'),
+    FeedbackAnswer: ('feedback',),
+}
+
+
+def bump_data_versions(sender, **kwargs):
+    bump_versions(*VERSIONED_MODELS[sender])
+
+
+# Supprimés en cascade sans signal par ligne (voir forget_deleted_rows en fin de module)
+CASCADE_DELETED = (FeedbackAnswer, JalonBinome)
+
+for _model in VERSIONED_MODELS:
+    post_save.connect(bump_data_versions, sender=_model, dispatch_uid=f'data_version_save_{_model.__name__}')
+    if _model not in CASCADE_DELETED:
+        post_delete.connect(bump_data_versions, sender=_model, dispatch_uid=f'data_version_delete_{_model.__name__}')
+
+
+# Index plein texte SQLite (FTS5) ; sous PostgreSQL l'index GIN suit la table sans aide
+@receiver(post_save, sender=FeedbackAnswer)
+def index_feedback_answer(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_answer(instance)
+
+
+@receiver(post_save, sender=JalonBinome)
+def index_jalon_comment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_comment(instance)
+
+
+# Fréquences des mots des réponses ouvertes (accounts/text_stats.py)
+@receiver(pre_save, sender=FeedbackAnswer)
+def remember_previous_answer(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_answer = sender.objects.filter(pk=instance.pk).values_list('answer', flat=True).first()
+
+
+@receiver(post_save, sender=FeedbackAnswer)
+def count_answer_terms(sender, instance, created, raw=False, **kwargs):
+    if raw or instance.question.type != 'TEXT':
+        return
+    previous = getattr(instance, '_previous_answer', None)
+    if previous == instance.answer:
+        return
+    with text_stats.batch():
+        if previous:
+            text_stats.record(instance.question_id, previous, -1)
+        text_stats.record(instance.question_id, instance.answer)
+
+
+@receiver(pre_save, sender=FeedbackQuestion)
+def remember_previous_type(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_type = sender.objects.filter(pk=instance.pk).values_list('type', flat=True).first()
+
+
+def _text_type_changed(instance, created, raw):
+    previous = getattr(instance, '_previous_type', None)
+    return not created and not raw and previous and previous != instance.type and 'TEXT' in (previous, instance.type)
+
+
+@receiver(post_save, sender=FeedbackQuestion)
+def recount_question_terms(sender, instance, created, raw=False, **kwargs):
+    # Passage vers ou depuis TEXT : fréquences recalculées (ou vidées) pour cette question
+    if _text_type_changed(instance, created, raw):
+        text_stats.rebuild(question_ids=[instance.pk])
+
+
+@receiver(post_save, sender=FeedbackQuestion)
+def reindex_question_answers(sender, instance, created, raw=False, **kwargs):
+    # Idem pour l'index plein texte : réponses retirées, ou indexées si la question devient TEXT
+    if _text_type_changed(instance, created, raw):
+        search.reindex_question(instance)
+
+
+# Suppressions en cascade : faute de récepteur de suppression sur FeedbackAnswer et JalonBinome,
+# Django efface ces lignes par lots (« fast delete ») sans les charger une à une. Ce qui en dépend
+# (index plein texte, fréquences des mots, compteurs de jalons, versions) est ajusté une seule
+# fois par suppression, depuis son origine (l'instance ou le QuerySet dont delete() a été
+# appelé), avant que les lignes disparaissent. Une suppression directe de ces lignes contourne
+# ces ajustements, comme un chargement en masse : rebuild_term_frequencies, reconcile_counters
+# et search.rebuild() les recalculent.
+
+# Modèle d'origine -> chemins vers ses lignes supprimées en cascade
+ANSWER_PATHS = {
+    FeedbackResponse: ('response',),
+    FeedbackQuestion: ('question',),
+    FeedbackForm: ('question__form',),
+    Jalon: ('question__form__jalon',),
+    Programme: ('question__form__programme',),
+    User: ('response__user', 'question__form__created_by', 'question__form__programme__gestionnaire'),
+}
+JALON_PATHS = {
+    Binome: ('binome',),
+    Jalon: ('jalon',),
+    Programme: ('binome__programme',),
+    User: ('binome__mentor', 'binome__mentore', 'binome__programme__gestionnaire'),
+}
+DELETION_ORIGINS = set(ANSWER_PATHS) | set(JALON_PATHS)
+
+
+def _cascade(paths, pks):
+    """Q des lignes rattachées à l'origine par l'un des chemins"""
+    condition = Q()
+    for path in paths:
+        condition |= Q(**{f'{path}__in': pks})
+    return condition
+
+
+def _origin(instance, origin):
+    """(racine, modèle, clés) de la suppression : son origine si elle est connue, sinon l'instance"""
+    if isinstance(origin, Model) and type(origin) in DELETION_ORIGINS:
+        return origin, type(origin), [origin.pk]
+    if isinstance(origin, QuerySet) and origin.model in DELETION_ORIGINS:
+        return origin, origin.model, origin.values('pk')
+    return instance, type(instance), [instance.pk]
+
+
+def forget_deleted_rows(sender, instance, using, origin=None, **kwargs):
+    # Appelé pour chaque instance de la cascade : le travail n'est fait qu'au premier appel
+    root, model, pks = _origin(instance, origin)
+    if getattr(root, '_cascade_forgotten', False):
+        return
+    root._cascade_forgotten = True
+
+    paths = ANSWER_PATHS.get(model)
+    if paths:
+        answers = FeedbackAnswer.objects.using(using)
+        search.unindex_rows('answers', answers.filter(_cascade(paths, pks)))
+        # Les fréquences d'une question supprimée partent avec elle : seules les questions conservées sont décomptées
+        kept = [path for path in paths if not path.startswith('question')]
+        if kept:
+            dropped = [path for path in paths if path.startswith('question')]
+            text_stats.forget(answers.filter(_cascade(kept, pks)).exclude(_cascade(dropped, pks)))
+        bump_versions(*VERSIONED_MODELS[FeedbackAnswer])
+
+    paths = JALON_PATHS.get(model)
+    if paths:
+        jalons_binome = JalonBinome.objects.using(using).filter(_cascade(paths, pks))
+        search.unindex_rows('comments', jalons_binome)
+        # Un programme supprimé emporte ses binômes : plus aucun compteur à ajuster
+        if model is not Programme:
+            apply_removal(jalons_binome)
+        bump_versions(*VERSIONED_MODELS[JalonBinome])
+
+
+def deletion_done(sender, instance, origin=None, **kwargs):
+    # Une même origine peut être supprimée de nouveau (QuerySet réutilisé, instance réenregistrée)
+    for root in (origin, instance):
+        if root is not None:
+            root.__dict__.pop('_cascade_forgotten', None)
+
+
+for _model in DELETION_ORIGINS:
+    pre_delete.connect(forget_deleted_rows, sender=_model, dispatch_uid=f'forget_cascade_{_model.__name__}')
+    post_delete.connect(deletion_done, sender=_model, dispatch_uid=f'deletion_done_{_model.__name__}')
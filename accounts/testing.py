@@ -0,0 +1,38 @@
+"""
+Aides pour les tests : budgets de requêtes SQL par vue.
+
+Les budgets sont définis dans ``settings.QUERY_BUDGETS`` (nom de vue -> nombre
+maximal de requêtes) et mesurés par ``QueryInstrumentationMiddleware``.
+
+    class DashboardTests(QueryBudgetMixin, TestCase):
+        def test_dashboard_rh(self):
+            self.client.force_login(self.rh)
+            self.assertWithinQueryBudget('dashboard')
+"""
+from django.conf import settings
+from django.urls import reverse
+
+
+class QueryBudgetMixin:
+    def assertWithinQueryBudget(self, view_name, *args, method='get', data=None, budget=None, **kwargs):
+        """Appelle la vue et échoue si elle dépasse son budget ou contient un motif N+1"""
+        if budget is None:
+            budget = settings.QUERY_BUDGETS[view_name]
+        url = reverse(view_name, args=args, kwargs=kwargs)
+        response = getattr(self.client, method)(url, data or {})
+
+        stats = getattr(response, 'query_stats', None)
+        if stats is None:
+            self.fail("QueryInstrumentationMiddleware n'est pas actif dans MIDDLEWARE")
+
+        detail = '\n'.join(f'  {n} x {sql}' for sql, n in stats.signatures.most_common(10))
+        self.assertLessEqual(
+            stats.count, budget,
+            f"{view_name} : {stats.count} requêtes pour un budget de {budget}\n{detail}",
+        )
+        duplicates = stats.duplicates()
+        self.assertFalse(
+            duplicates,
+            f"{view_name} : requêtes répétées (N+1)\n" + '\n'.join(f'  {n} x {sql}' for sql, n in duplicates.items()),
+        )
+        return response
@@ -0,0 +1,69 @@
+"""
+Jeu de données commun aux tests : un RH, un ADF, deux mentors, trois mentorés,
+un programme de trois jalons et trois binômes.
+
+Les caches passent en mémoire (versions de données, sessions, fragments) et
+sont vidés avant chaque test.
+"""
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts import versions
+from accounts.models import Binome, Jalon, JalonBinome, Programme, User
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-sessions'},
+}
+
+
+@override_settings(
+    CACHES=TEST_CACHES, PERF_SERVER_TIMING=False,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    # Pas de manifeste collectstatic en test
+    STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class MentoringTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        cls.rh = User.objects.create_user('rh', password='x', role='RH')
+        cls.adf = User.objects.create_user('adf', password='x', role='ADF')
+        cls.mentors = [User.objects.create_user(f'mentor{i}', password='x', role='MENTOR') for i in range(2)]
+        cls.mentees = [User.objects.create_user(f'mentee{i}', password='x', role='MENTEE') for i in range(3)]
+        cls.programme = Programme.objects.create(
+            nom='Programme test', description='Programme de test', gestionnaire=cls.rh,
+            date_debut=today - timedelta(days=60), date_fin=today + timedelta(days=60),
+        )
+        # Premier jalon échu, les deux autres à venir
+        cls.jalons = [
+            Jalon.objects.create(
+                programme=cls.programme, titre=f'Jalon {k + 1}', description='',
+                date_echeance=today + timedelta(days=30 * k - 10),
+            )
+            for k in range(3)
+        ]
+        cls.binomes = [
+            Binome.objects.create(programme=cls.programme, mentor=cls.mentors[i % 2], mentore=mentee)
+            for i, mentee in enumerate(cls.mentees)
+        ]
+        for binome in cls.binomes:
+            for jalon in cls.jalons:
+                JalonBinome.objects.create(binome=binome, jalon=jalon)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        # Groupes en attente des écritures de setUpTestData, dont les rappels on_commit ne s'exécutent jamais
+        versions._pending.groups.clear()
+
+    def refresh(self, *objects):
+        for obj in objects:
+            obj.refresh_from_db()
+        return objects[0] if len(objects) == 1 else objects
@@ -0,0 +1,87 @@
+from django.test import tag
+from django.urls import reverse
+
+from accounts.models import Binome, FeedbackAnswer, FeedbackForm, FeedbackQuestion, FeedbackResponse, User
+from accounts.testing import QueryBudgetMixin
+
+from .base import MentoringTestCase
+
+
+@tag('query_budget')
+class AdminChangelistTests(QueryBudgetMixin, MentoringTestCase):
+    """Changelists des modèles volumineux : nombre de requêtes fixe, quel que soit le nombre de lignes"""
+
+    # Comptage (exact hors PostgreSQL), page, filtres et annotations : aucune requête par ligne
+    # (session et utilisateur viennent du cache)
+    BUDGETS = {
+        'programme': 3,
+        'jalon': 4,
+        'binome': 3,
+        'jalonbinome': 2,
+        'feedbackform': 5,
+        'feedbackquestion': 3,
+        'feedbackresponse': 3,
+        'feedbackanswer': 2,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.adf.is_staff = cls.adf.is_superuser = True
+        cls.adf.save()
+        form = FeedbackForm.objects.create(programme=cls.programme, jalon=cls.jalons[0], titre='Bilan', created_by=cls.rh)
+        questions = [
+            FeedbackQuestion.objects.create(form=form, texte=f'Question {k}', type='TEXT', ordre=k) for k in range(2)
+        ]
+        for user in (*cls.mentors, *cls.mentees):
+            response = FeedbackResponse.objects.create(form=form, user=user)
+            for question in questions:
+                FeedbackAnswer.objects.create(response=response, question=question, answer=f'Avis de {user.username}')
+
+    def setUp(self):
+        super().setUp()
+        self.login()
+
+    def login(self):
+        self.client.force_login(self.adf)
+        # Session et utilisateur mis en cache par une première page : seules les requêtes de la liste restent
+        self.client.get(reverse('admin:index'))
+
+    def assertChangelistBudget(self, model):
+        response = self.assertWithinQueryBudget(f'admin:accounts_{model}_changelist', budget=self.BUDGETS[model])
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.context['cl'].result_count, 0)
+        return response.query_stats.count
+
+    def test_programme(self):
+        self.assertChangelistBudget('programme')
+
+    def test_jalon(self):
+        self.assertChangelistBudget('jalon')
+
+    def test_binome(self):
+        self.assertChangelistBudget('binome')
+
+    def test_jalonbinome(self):
+        self.assertChangelistBudget('jalonbinome')
+
+    def test_feedbackform(self):
+        self.assertChangelistBudget('feedbackform')
+
+    def test_feedbackquestion(self):
+        self.assertChangelistBudget('feedbackquestion')
+
+    def test_feedbackresponse(self):
+        self.assertChangelistBudget('feedbackresponse')
+
+    def test_feedbackanswer(self):
+        self.assertChangelistBudget('feedbackanswer')
+
+    def test_budget_does_not_grow_with_rows(self):
+        before = {model: self.assertChangelistBudget(model) for model in self.BUDGETS}
+        # Dix binômes de plus (et leurs jalons), chacun avec son mentoré
+        for i in range(10):
+            mentee = User.objects.create_user(f'extra{i}', password='x', role='MENTEE')
+            Binome.objects.create(programme=self.programme, mentor=self.mentors[i % 2], mentore=mentee)
+        self.login()
+        self.assertEqual({model: self.assertChangelistBudget(model) for model in self.BUDGETS}, before)
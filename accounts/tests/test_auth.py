@@ -0,0 +1,34 @@
+from django.test import RequestFactory
+
+from accounts.auth import get_scope
+from accounts.models import Binome, JalonBinome, User
+
+from .base import MentoringTestCase
+
+
+class ScopeCacheTests(MentoringTestCase):
+    def scope(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return get_scope(request)
+
+    def test_scope(self):
+        scope = self.scope(self.mentors[0])
+        self.assertEqual(scope.role, 'MENTOR')
+        self.assertEqual(scope.binome_ids, [self.binomes[0].pk, self.binomes[2].pk])
+        self.assertEqual(scope.programme_ids, [self.programme.pk])
+        self.assertEqual(self.scope(self.rh).programme_ids, [self.programme.pk])
+
+    def test_jalon_transitions_keep_cached_scope(self):
+        self.scope(self.mentees[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            JalonBinome.objects.get(binome=self.binomes[0], jalon=self.jalons[0]).marquer_realise()
+        with self.assertNumQueries(0):
+            self.scope(self.mentees[0])
+
+    def test_new_binome_invalidates_scope(self):
+        self.scope(self.mentors[1])
+        mentee = User.objects.create_user('nouvelle', role='MENTEE')
+        with self.captureOnCommitCallbacks(execute=True):
+            binome = Binome.objects.create(programme=self.programme, mentor=self.mentors[1], mentore=mentee)
+        self.assertEqual(self.scope(self.mentors[1]).binome_ids, [self.binomes[1].pk, binome.pk])
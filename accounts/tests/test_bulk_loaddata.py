@@ -0,0 +1,51 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from accounts.management.commands import bulk_loaddata
+from accounts.management.commands.bulk_loaddata import iter_records
+
+RECORDS = [
+    {'model': 'accounts.user', 'pk': 1, 'fields': {'username': 'é"\\u00e9', 'is_active': True, 'last_login': None}},
+    {'model': 'accounts.jalonbinome', 'pk': 2, 'fields': {'score': -12.5e3, 'ok': False, 'commentaire': 'x' * 40}},
+]
+
+
+class CountingStream(StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+class IterRecordsTests(SimpleTestCase):
+    def read_all(self, text, chunk_size):
+        with mock.patch.object(bulk_loaddata, 'CHUNK_SIZE', chunk_size):
+            return list(iter_records(StringIO(text)))
+
+    def test_objects_cut_at_any_position(self):
+        ndjson = '\n'.join(json.dumps(record, ensure_ascii=False) for record in RECORDS)
+        array = json.dumps(RECORDS, indent=1)
+        for text in (ndjson, array, json.dumps(RECORDS)):
+            for chunk_size in range(1, 40):
+                self.assertEqual(self.read_all(text, chunk_size), RECORDS, (text[:20], chunk_size))
+
+    def test_invalid_json_fails_without_reading_the_rest(self):
+        text = '{"model": "accounts.user", "pk": 1, oops}\n' + '{"pk": 2}\n' * 1000
+        stream = CountingStream(text)
+        with mock.patch.object(bulk_loaddata, 'CHUNK_SIZE', 64):
+            with self.assertRaisesMessage(CommandError, 'JSON invalide'):
+                list(iter_records(stream))
+        self.assertEqual(stream.reads, 1)
+
+    def test_truncated_dump(self):
+        with self.assertRaisesMessage(CommandError, 'JSON invalide'):
+            self.read_all('{"pk": 1}\n{"pk": 2, "fields": {"a": tr', 8)
+        with self.assertRaisesMessage(CommandError, "']' final manquant"):
+            self.read_all('[{"pk": 1},', 4)
@@ -0,0 +1,94 @@
+import gzip
+
+from django.test import override_settings
+
+from accounts import compression
+from accounts.compression import available_codecs, compress, compress_stream, minify_html, negotiate
+from accounts.models import User
+
+from .base import MentoringTestCase
+
+
+class NegotiationTests(MentoringTestCase):
+    def test_gzip_preferred_over_identity(self):
+        self.assertEqual(negotiate('gzip, deflate'), 'gzip')
+
+    def test_refused_codec(self):
+        self.assertIsNone(negotiate('gzip;q=0, identity'))
+
+    def test_minify_keeps_pre(self):
+        html = b'<div>\n    <p>a</p>\n</div>\n<pre>\n    code\n</pre>'
+        minified = minify_html(html)
+        self.assertNotIn(b'    <p>', minified)
+        self.assertIn(b'\n    code\n', minified)
+
+
+def decompress(data, codec):
+    return compression.brotli.decompress(data) if codec == 'br' else gzip.decompress(data)
+
+
+class RandomPaddingTests(MentoringTestCase):
+    BODY = b'<input name="csrfmiddlewaretoken" value="secret"><p>recherche</p>' * 40
+
+    def test_same_body_compresses_differently(self):
+        for codec in available_codecs():
+            with self.subTest(codec=codec):
+                outputs = {compress(self.BODY, codec) for _ in range(10)}
+                self.assertGreater(len({len(output) for output in outputs}), 1)
+                for output in outputs:
+                    self.assertEqual(decompress(output, codec), self.BODY)
+
+    def test_streams_are_padded(self):
+        chunks = [self.BODY[:1000], self.BODY[1000:]]
+        for codec in available_codecs():
+            with self.subTest(codec=codec):
+                outputs = {b''.join(compress_stream(iter(chunks), codec)) for _ in range(10)}
+                self.assertGreater(len({len(output) for output in outputs}), 1)
+                for output in outputs:
+                    self.assertEqual(decompress(output, codec), self.BODY)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200)
+class CompressionMiddlewareTests(MentoringTestCase):
+    def test_html_page_gzipped(self):
+        self.client.force_login(self.rh)
+        response = self.client.get('/programmes/', headers={'accept-encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn(b'Programme test', gzip.decompress(response.content))
+
+    def test_identity_untouched(self):
+        self.client.force_login(self.rh)
+        response = self.client.get('/programmes/', headers={'accept-encoding': 'identity'})
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class StreamedExportTests(MentoringTestCase):
+    EXPORT = {'export_type': 'csv', 'data_types': ['users', 'binomes', 'jalons']}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Export de plusieurs morceaux de 64 Ko
+        User.objects.bulk_create(
+            User(username=f'export_{i}', email=f'export_{i}@example.com', role='MENTEE') for i in range(3000)
+        )
+
+    def test_wsgi_stream_gzip(self):
+        self.client.force_login(self.rh)
+        response = self.client.post('/export/', self.EXPORT, headers={'accept-encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8-sig')
+        self.assertIn('export_2999', body)
+        self.assertIn('=== JALONS ===', body)
+
+    async def test_asgi_stream_gzip(self):
+        # Régression : chaque morceau est lu par un appel sync_to_async distinct (contexte copié)
+        await self.async_client.aforce_login(self.rh)
+        response = await self.async_client.post('/export/', self.EXPORT, headers={'accept-encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join([chunk async for chunk in response.streaming_content]))
+        body = body.decode('utf-8-sig')
+        self.assertGreater(len(body), 128 * 1024)
+        self.assertIn('export_2999', body)
+        self.assertIn('=== JALONS ===', body)
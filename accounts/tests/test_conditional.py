@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from accounts.models import User
+from accounts.routers import REPLICA_ALIAS, reads_from_replica
+from accounts.versions import conditional_on
+
+from .base import MentoringTestCase
+
+
+class ConditionalViewTests(MentoringTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.rh)
+
+    def test_not_modified_without_queries(self):
+        url = reverse('global_stats')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        with self.assertNumQueries(0):
+            response = self.client.get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_etag(self):
+        url = reverse('global_stats')
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user('nouveau', role='MENTEE')
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_is_per_session(self):
+        url = reverse('global_stats')
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(self.adf)
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+
+class ConditionalReadsPrimaryTests(MentoringTestCase):
+    def test_conditional_view_never_reads_replica(self):
+        used = []
+
+        def view(request):
+            used.append(router.db_for_read(User))
+            return HttpResponse('ok')
+
+        request = RequestFactory().get('/')
+        with mock.patch('accounts.routers.replica_configured', return_value=True):
+            reads_from_replica(view)(request)
+            reads_from_replica(conditional_on('users')(view))(request)
+        self.assertEqual(used, [REPLICA_ALIAS, 'default'])
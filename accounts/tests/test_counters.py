@@ -0,0 +1,125 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.counters import apply_transition, reconcile
+from accounts.models import Binome, Jalon, JalonBinome, User
+
+from .base import MentoringTestCase
+
+
+class CountersTests(MentoringTestCase):
+    def jalon_binome(self, binome=0, jalon=0):
+        return JalonBinome.objects.select_related('binome', 'jalon').get(
+            binome=self.binomes[binome], jalon=self.jalons[jalon]
+        )
+
+    def counters(self, obj):
+        obj.refresh_from_db()
+        return (obj.jalons_total, obj.jalons_todo, obj.jalons_wait, obj.jalons_done, obj.jalons_overdue)
+
+    def assertReconciled(self):
+        self.assertEqual(reconcile(fix=False), {'Binome': [], 'Programme': []})
+
+    def test_created(self):
+        self.assertEqual(self.counters(self.binomes[0]), (3, 3, 0, 0, 1))
+        self.assertEqual(self.counters(self.programme), (9, 9, 0, 0, 3))
+
+    def test_transitions(self):
+        jalon_binome = self.jalon_binome()
+        jalon_binome.marquer_realise('Fait')
+        self.assertEqual(self.counters(self.binomes[0]), (3, 2, 1, 0, 0))
+        jalon_binome.valider()
+        self.assertEqual(self.counters(self.binomes[0]), (3, 2, 0, 1, 0))
+        self.assertEqual(self.counters(self.programme), (9, 8, 0, 1, 2))
+        self.assertReconciled()
+
+    def test_overdue_restored_when_reverted_to_todo(self):
+        jalon_binome = self.jalon_binome()
+        jalon_binome.marquer_realise()
+        # Retour en arrière (admin) d'un jalon échu : il est de nouveau en retard
+        jalon_binome.statut = 'TODO'
+        jalon_binome.save()
+        apply_transition([jalon_binome], 'WAIT', 'TODO')
+        self.assertEqual(self.counters(self.binomes[0]), (3, 3, 0, 0, 1))
+        self.assertReconciled()
+
+    def test_reverting_a_future_jalon_is_not_overdue(self):
+        jalon_binome = self.jalon_binome(jalon=1)
+        jalon_binome.marquer_realise()
+        jalon_binome.statut = 'TODO'
+        jalon_binome.save()
+        apply_transition([jalon_binome], 'WAIT', 'TODO')
+        self.assertEqual(self.counters(self.binomes[0]), (3, 3, 0, 0, 1))
+
+    def test_jalon_deleted(self):
+        self.jalon_binome(binome=1).marquer_realise()
+        Jalon.objects.get(pk=self.jalons[0].pk).delete()
+        self.assertEqual(self.counters(self.binomes[1]), (2, 2, 0, 0, 0))
+        self.assertEqual(self.counters(self.programme), (6, 6, 0, 0, 0))
+        self.assertReconciled()
+
+    def test_binome_deleted(self):
+        self.binomes[0].delete()
+        self.assertEqual(self.counters(self.programme), (6, 6, 0, 0, 2))
+        self.assertReconciled()
+
+    def test_mentor_deleted(self):
+        User.objects.filter(pk=self.mentors[0].pk).delete()
+        self.assertEqual(Binome.objects.count(), 1)
+        self.assertEqual(self.counters(self.programme), (3, 3, 0, 0, 1))
+        self.assertReconciled()
+
+    def test_delete_queries_do_not_grow_with_binomes(self):
+        def delete_queries(jalon):
+            with CaptureQueriesContext(connection) as queries:
+                jalon.delete()
+            return len(queries)
+
+        few = delete_queries(self.jalons[2])
+        for i in range(20):
+            mentee = User.objects.create_user(f'extra{i}', role='MENTEE')
+            binome = Binome.objects.create(programme=self.programme, mentor=self.mentors[0], mentore=mentee)
+            JalonBinome.objects.create(binome=binome, jalon=self.jalons[1])
+        many = delete_queries(self.jalons[1])
+        self.assertEqual(many, few)
+        self.assertReconciled()
+
+    def test_reconcile_fixes_drift(self):
+        Binome.objects.filter(pk=self.binomes[0].pk).update(jalons_done=5, jalons_overdue=0)
+        ecarts = reconcile()
+        self.assertEqual([ligne['pk'] for ligne in ecarts['Binome']], [self.binomes[0].pk])
+        self.assertEqual(self.counters(self.binomes[0]), (3, 3, 0, 0, 1))
+        self.assertReconciled()
+
+    def test_mentee_dashboard_counts_overdue_when_read(self):
+        # Compteur stocké périmé (échéance passée depuis la dernière réconciliation)
+        Binome.objects.filter(pk=self.binomes[0].pk).update(jalons_overdue=0)
+        self.client.force_login(self.mentees[0])
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.context['jalons_en_retard'], 1)
+
+
+class PublishedCountersTests(MentoringTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('accounts.counters.publish_counters')
+        self.publish = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.jalon_binome = JalonBinome.objects.get(binome=self.binomes[0], jalon=self.jalons[0])
+
+    def test_transitions_are_published(self):
+        self.jalon_binome.marquer_realise()
+        self.jalon_binome.valider()
+        self.assertEqual(self.publish.call_args_list, [
+            mock.call(realisations=1, validations=0, jalons_en_attente=1),
+            mock.call(realisations=0, validations=1, jalons_en_attente=-1),
+        ])
+
+    def test_other_saves_are_not_published(self):
+        self.jalon_binome.marquer_realise()
+        self.publish.reset_mock()
+        self.jalon_binome.commentaire = 'Précision'
+        self.jalon_binome.save()
+        self.publish.assert_not_called()
@@ -0,0 +1,61 @@
+import json
+import re
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import JalonBinome, User
+
+from .base import MentoringTestCase
+
+
+class AdfDashboardTests(MentoringTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.adf)
+
+    def user_aggregates(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        executed = [query['sql'] for query in queries if 'FROM "accounts_user"' in query['sql'] and 'COUNT' in query['sql']]
+        return response.context['user_distribution'], len(executed)
+
+    def test_user_distribution_cached_until_users_change(self):
+        distribution, aggregates = self.user_aggregates()
+        self.assertEqual(distribution, {'mentors': 2, 'mentees': 3, 'rh': 1, 'admins': 1})
+        self.assertEqual(aggregates, 1)
+        self.assertEqual(self.user_aggregates()[1], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user('mentor2', role='MENTOR')
+        distribution, aggregates = self.user_aggregates()
+        self.assertEqual(distribution['mentors'], 3)
+        self.assertEqual(aggregates, 1)
+
+
+class GlobalStatsTests(MentoringTestCase):
+    def jalons_valides(self):
+        response = self.client.get(reverse('global_stats'))
+        self.assertEqual(response.status_code, 200)
+        return int(re.search(r'Jalons validés</span><span[^>]*>(\d+)<', response.content.decode()).group(1))
+
+    def test_bulk_validation_updates_recent_activity(self):
+        jalon_binome = JalonBinome.objects.get(binome=self.binomes[0], jalon=self.jalons[0])
+        mentor = Client()
+        # Réalisation et connexions (last_login) appliquées avant le premier affichage
+        with self.captureOnCommitCallbacks(execute=True):
+            jalon_binome.marquer_realise('Fait')
+            mentor.force_login(self.mentors[0])
+            self.client.force_login(self.rh)
+        self.assertEqual(self.jalons_valides(), 0)
+
+        # Validation en masse : update() sans post_save, versions changées par les compteurs
+        with self.captureOnCommitCallbacks(execute=True):
+            response = mentor.post(
+                reverse('api_jalons_valide_bulk'), data=json.dumps({'ids': [jalon_binome.pk]}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(self.jalons_valides(), 1)
@@ -0,0 +1,29 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from accounts.models import FeedbackForm, FeedbackQuestion
+
+from .base import MentoringTestCase
+
+
+class DumpNdjsonTests(MentoringTestCase):
+    def dump(self, *args):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.jsonl')
+            call_command('dump_ndjson', path, '--compress', 'none', *args, stderr=StringIO())
+            with open(path, encoding='utf-8') as f:
+                return [json.loads(line) for line in f]
+
+    def test_question_added_to_old_form_is_in_incremental_dump(self):
+        form = FeedbackForm.objects.create(programme=self.programme, titre='Ancien', created_by=self.rh)
+        FeedbackForm.objects.filter(pk=form.pk).update(date_creation=timezone.now() - timedelta(days=30))
+        question = FeedbackQuestion.objects.create(form=form, texte='Ajoutée', type='TEXT')
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        records = self.dump('--models', 'accounts.FeedbackForm', 'accounts.FeedbackQuestion', '--since', since)
+        self.assertEqual([(r['model'], r['pk']) for r in records], [('accounts.feedbackquestion', question.pk)])
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from datetime import datetime, time, timedelta
+from importlib.util import find_spec
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from accounts.models import JalonBinome
+
+from .base import MentoringTestCase
+
+
+@skipUnless(find_spec('pyarrow'), "pyarrow n'est pas installé")
+@override_settings(TIME_ZONE='Asia/Tokyo')
+class ExportAnalyticsTests(MentoringTestCase):
+    def export(self):
+        import pyarrow.parquet
+
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('export_analytics', directory, '--tables', 'jalons', stdout=StringIO())
+            rows = pyarrow.parquet.read_table(os.path.join(directory, 'fact_jalons.parquet')).to_pylist()
+        return {(row['binome_id'], row['jalon_id']): row for row in rows}
+
+    def realise(self, binome, jalon, statut, day, hour):
+        # Heure locale (Tokyo, UTC+9) : 00:30 locale tombe la veille en UTC
+        moment = timezone.make_aware(datetime.combine(day, time(hour, 30)))
+        JalonBinome.objects.filter(binome=binome, jalon=jalon).update(
+            statut=statut, date_realisation=moment, date_validation=moment if statut == 'DONE' else None,
+        )
+
+    def test_delay_uses_local_days_and_counts_late_completions(self):
+        echu, a_venir = self.jalons[0], self.jalons[1]
+        deadline = echu.date_echeance
+        self.realise(self.binomes[0], echu, 'DONE', deadline + timedelta(days=1), 0)
+        self.realise(self.binomes[1], echu, 'DONE', deadline, 23)
+        self.realise(self.binomes[2], a_venir, 'WAIT', a_venir.date_echeance + timedelta(days=2), 0)
+
+        rows = self.export()
+
+        late_done = rows[self.binomes[0].pk, echu.pk]
+        self.assertEqual((late_done['retard_jours'], late_done['en_retard']), (1, True))
+        on_time = rows[self.binomes[1].pk, echu.pk]
+        self.assertEqual((on_time['retard_jours'], on_time['en_retard']), (0, False))
+        late_wait = rows[self.binomes[2].pk, a_venir.pk]
+        self.assertEqual((late_wait['retard_jours'], late_wait['en_retard']), (2, True))
+        # Échéance dépassée sans réalisation
+        self.assertTrue(rows[self.binomes[2].pk, echu.pk]['en_retard'])
+        self.assertFalse(rows[self.binomes[0].pk, a_venir.pk]['en_retard'])
@@ -0,0 +1,79 @@
+import json
+
+from django.core import mail
+from django.urls import reverse
+
+from accounts.models import JalonBinome
+
+from .base import MentoringTestCase
+
+
+class ValidationEnMasseTests(MentoringTestCase):
+    def setUp(self):
+        super().setUp()
+        # mentor0 suit les binômes 0 et 2, mentor1 le binôme 1
+        for user in (*self.mentors, *self.mentees):
+            user.email = f'{user.username}@example.com'
+            user.save(update_fields=['email'])
+        self.attente = {
+            (b, j): self.realiser(b, j) for b, j in [(0, 0), (0, 1), (2, 0), (1, 0)]
+        }
+        # Notifications de réalisation envoyées aux mentors ci-dessus
+        mail.outbox.clear()
+        self.client.force_login(self.mentors[0])
+
+    def realiser(self, binome, jalon):
+        jalon_binome = JalonBinome.objects.get(binome=self.binomes[binome], jalon=self.jalons[jalon])
+        jalon_binome.marquer_realise('Fait')
+        return jalon_binome.pk
+
+    def statuts(self):
+        return {
+            key: JalonBinome.objects.get(pk=pk).statut for key, pk in self.attente.items()
+        }
+
+    def post_api(self, payload):
+        return self.client.post(
+            reverse('api_jalons_valide_bulk'), data=json.dumps(payload), content_type='application/json',
+        )
+
+    def test_api_ids_validates_only_the_mentors_pending_jalons(self):
+        ids = list(self.attente.values())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_api({'ids': ids})
+        self.assertEqual(response.json(), {'success': True, 'count': 3})
+        self.assertEqual(self.statuts(), {(0, 0): 'DONE', (0, 1): 'DONE', (2, 0): 'DONE', (1, 0): 'WAIT'})
+        # Un e-mail par mentoré, quel que soit le nombre de jalons validés
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['mentee0@example.com', 'mentee2@example.com'])
+        binome = self.refresh(self.binomes[0])
+        self.assertEqual((binome.jalons_wait, binome.jalons_done), (0, 2))
+
+    def test_api_binome_validates_a_single_binome(self):
+        response = self.post_api({'binome': self.binomes[2].pk})
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(self.statuts(), {(0, 0): 'WAIT', (0, 1): 'WAIT', (2, 0): 'DONE', (1, 0): 'WAIT'})
+
+    def test_api_other_mentors_binome_is_untouched(self):
+        response = self.post_api({'binome': self.binomes[1].pk})
+        self.assertEqual(response.json()['count'], 0)
+        self.assertEqual(self.statuts()[1, 0], 'WAIT')
+
+    def test_api_rejects_invalid_payloads(self):
+        for payload in ({}, {'ids': 'abc'}, {'ids': ['x']}, {'binome': '3'}):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post_api(payload).status_code, 400)
+        response = self.client.post(reverse('api_jalons_valide_bulk'), data='{', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_jalons_valide_bulk')).status_code, 405)
+        self.assertEqual(set(self.statuts().values()), {'WAIT'})
+
+    def test_form_validates_selected_ids(self):
+        response = self.client.post(reverse('jalons_valide_bulk'), {'ids': [self.attente[0, 1]]})
+        self.assertRedirects(response, reverse('jalons_timeline'), fetch_redirect_response=False)
+        self.assertEqual(self.statuts(), {(0, 0): 'WAIT', (0, 1): 'DONE', (2, 0): 'WAIT', (1, 0): 'WAIT'})
+
+    def test_form_without_selection_changes_nothing(self):
+        for data in ({}, {'binome': 'abc'}):
+            with self.subTest(data=data):
+                self.client.post(reverse('jalons_valide_bulk'), data)
+        self.assertEqual(set(self.statuts().values()), {'WAIT'})
@@ -0,0 +1,68 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from accounts.matching import deferred_acceptance
+from accounts.models import Binome, Jalon, JalonBinome, Programme
+
+from .base import MentoringTestCase
+
+
+class DeferredAcceptanceTests(SimpleTestCase):
+    def test_capacities_and_stability(self):
+        scores = np.array([[2, 1], [1, 2], [3, 0]], dtype=np.float32)
+        # Le mentor 0 préfère le mentoré 2 ; le mentoré 0, rejeté, perd ensuite face au mentoré 1
+        self.assertEqual(deferred_acceptance(scores, [1, 1]).tolist(), [-1, 1, 0])
+        self.assertEqual(deferred_acceptance(scores, [2, 1]).tolist(), [0, 1, 0])
+
+    def test_excluded_pairs_are_never_proposed(self):
+        scores = np.array([[-np.inf, 1], [-np.inf, -np.inf]], dtype=np.float32)
+        self.assertEqual(deferred_acceptance(scores, [1, 1]).tolist(), [1, -1])
+
+
+class MatchBinomesCommandTests(MentoringTestCase):
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        self.cohorte = Programme.objects.create(
+            nom='Cohorte 2', description='', gestionnaire=self.rh,
+            date_debut=today, date_fin=today + timedelta(days=90),
+        )
+        self.jalon = Jalon.objects.create(
+            programme=self.cohorte, titre='Lancement', description='', date_echeance=today + timedelta(days=30),
+        )
+
+    def csv_file(self, directory, name, lines):
+        path = os.path.join(directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def test_preferences_and_exclusions_share_column_order(self):
+        mentee0, mentor0, mentor1 = self.mentees[0], self.mentors[0], self.mentors[1]
+        with tempfile.TemporaryDirectory() as directory:
+            preferences = self.csv_file(directory, 'preferences.csv', ['# mentore,mentor,score', 'mentee0,mentor1,5'])
+            exclude = self.csv_file(directory, 'exclude.csv', ['# mentore,mentor', 'mentee0,mentor1'])
+            call_command(
+                'match_binomes', self.cohorte.pk, '--max-mentees', '3', '--seed', '1',
+                '--preferences', preferences, '--exclude', exclude, stdout=StringIO(),
+            )
+
+        pairs = set(Binome.objects.filter(programme=self.cohorte).values_list('mentore_id', 'mentor_id'))
+        # La paire préférée mais exclue n'est pas formée : mentee0 va chez l'autre mentor
+        self.assertIn((mentee0.pk, mentor0.pk), pairs)
+        self.assertNotIn((mentee0.pk, mentor1.pk), pairs)
+        self.assertEqual(len(pairs), len(self.mentees))
+        self.assertEqual(JalonBinome.objects.filter(jalon=self.jalon).count(), len(pairs))
+
+    def test_dry_run_saves_nothing(self):
+        out = StringIO()
+        call_command('match_binomes', self.cohorte.pk, '--dry-run', stdout=out)
+        self.assertIn('(--dry-run)', out.getvalue())
+        self.assertFalse(Binome.objects.filter(programme=self.cohorte).exists())
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from accounts.models import Binome, FeedbackForm, FeedbackResponse, JalonBinome, Programme, User
+from accounts.pending_feedback import answered, pending_forms
+
+from .base import MentoringTestCase
+
+
+class PendingFeedbackTests(MentoringTestCase):
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        autre = Programme.objects.create(
+            nom='Autre programme', description='', gestionnaire=self.rh,
+            date_debut=today, date_fin=today + timedelta(days=90),
+        )
+        self.autre_mentore = User.objects.create_user('mentee_autre', password='x', role='MENTEE')
+        self.autre_binome = Binome.objects.create(programme=autre, mentor=self.mentors[1], mentore=self.autre_mentore)
+        self.general = self.form('Général')
+        self.jalon = self.form('Jalon 1', jalon=self.jalons[0])
+        self.inactif = self.form('Inactif', is_active=False)
+        self.hors_programme = FeedbackForm.objects.create(programme=autre, titre='Autre', created_by=self.rh)
+
+    def form(self, titre, **kwargs):
+        return FeedbackForm.objects.create(programme=self.programme, titre=titre, created_by=self.rh, **kwargs)
+
+    def pending(self, user, *binomes):
+        return set(pending_forms(user.pk, [binome.pk for binome in binomes]).values_list('titre', flat=True))
+
+    def valider(self, binome, jalon):
+        JalonBinome.objects.filter(binome=binome, jalon=jalon).update(statut='DONE')
+
+    def test_programme_forms_only(self):
+        self.assertEqual(self.pending(self.mentees[0], self.binomes[0]), {'Général'})
+        self.assertEqual(self.pending(self.autre_mentore, self.autre_binome), {'Autre'})
+
+    def test_jalon_form_once_validated_for_the_users_binome(self):
+        self.valider(self.binomes[1], self.jalons[0])
+        self.assertEqual(self.pending(self.mentees[0], self.binomes[0]), {'Général'})
+        self.valider(self.binomes[0], self.jalons[0])
+        self.assertEqual(self.pending(self.mentees[0], self.binomes[0]), {'Général', 'Jalon 1'})
+
+    def test_mentor_sees_forms_of_all_binomes(self):
+        self.valider(self.binomes[2], self.jalons[0])
+        self.assertEqual(
+            self.pending(self.mentors[0], self.binomes[0], self.binomes[2]), {'Général', 'Jalon 1'},
+        )
+
+    def test_answered_forms_leave_the_list(self):
+        FeedbackResponse.objects.create(form=self.general, user=self.mentees[0])
+        FeedbackResponse.objects.create(form=self.general, user=self.mentees[1])
+        self.assertEqual(self.pending(self.mentees[0], self.binomes[0]), set())
+        self.assertEqual(self.pending(self.mentees[2], self.binomes[2]), {'Général'})
+        forms = FeedbackForm.objects.annotate(deja=answered(self.mentees[0].pk)).filter(deja=True)
+        self.assertEqual(list(forms), [self.general])
+
+    def test_no_binome(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.pending(self.rh), set())
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.pending(self.mentors[0], self.binomes[0], self.binomes[2])
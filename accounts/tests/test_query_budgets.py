@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.test import tag
+
+from accounts.testing import QueryBudgetMixin
+from accounts.models import FeedbackForm
+
+from .base import MentoringTestCase
+
+
+@tag('query_budget')
+class QueryBudgetTests(QueryBudgetMixin, MentoringTestCase):
+    """Chaque vue de settings.QUERY_BUDGETS reste dans son budget, sans motif N+1"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.superuser = cls.adf
+        cls.superuser.is_superuser = True
+        cls.superuser.save()
+        FeedbackForm.objects.create(programme=cls.programme, titre='Bilan', created_by=cls.rh)
+
+    def assertBudget(self, user, view_name, *args):
+        self.client.force_login(user)
+        response = self.assertWithinQueryBudget(view_name, *args)
+        self.assertEqual(response.status_code, 200, f"{view_name} ({user.role})")
+        return response
+
+    def test_every_budgeted_view_is_covered(self):
+        covered = {'dashboard', 'global_stats', 'programmes_list', 'admin_users_data',
+                   'admin_system_alerts', 'jalons_timeline'}
+        self.assertEqual(set(settings.QUERY_BUDGETS), covered)
+
+    def test_dashboard_adf(self):
+        self.assertBudget(self.adf, 'dashboard')
+
+    def test_dashboard_rh(self):
+        self.assertBudget(self.rh, 'dashboard')
+
+    def test_dashboard_mentor(self):
+        self.assertBudget(self.mentors[0], 'dashboard')
+
+    def test_dashboard_mentee(self):
+        self.assertBudget(self.mentees[0], 'dashboard')
+
+    def test_global_stats(self):
+        self.assertBudget(self.rh, 'global_stats')
+
+    def test_programmes_list(self):
+        self.assertBudget(self.rh, 'programmes_list')
+
+    def test_admin_users_data(self):
+        self.assertBudget(self.adf, 'admin_users_data')
+
+    def test_admin_system_alerts(self):
+        self.assertBudget(self.adf, 'admin_system_alerts')
+
+    def test_jalons_timeline_mentor(self):
+        self.assertBudget(self.mentors[0], 'jalons_timeline')
+
+    def test_jalons_timeline_mentee(self):
+        self.assertBudget(self.mentees[0], 'jalons_timeline')
+
+    def test_budget_does_not_grow_with_data(self):
+        # Dix binômes de plus pour le mentor : même nombre de requêtes (pas de N+1)
+        from accounts.models import Binome, User
+        self.client.force_login(self.mentors[0])
+        before = self.assertWithinQueryBudget('dashboard').query_stats.count
+        for i in range(10):
+            mentee = User.objects.create_user(f'extra{i}', password='x', role='MENTEE')
+            Binome.objects.create(programme=self.programme, mentor=self.mentors[0], mentore=mentee)
+        self.client.force_login(self.mentors[0])
+        after = self.assertWithinQueryBudget('dashboard').query_stats.count
+        self.assertLessEqual(after, before)
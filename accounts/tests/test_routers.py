@@ -0,0 +1,108 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from accounts.middleware import ReplicaStickinessMiddleware
+from accounts.models import User
+from accounts.routers import REPLICA_ALIAS, ReplicaRouter, reads_from_replica, routing_state, use_replica
+
+from .base import MentoringTestCase
+
+
+def with_replica():
+    # Alias déclaré comme avec REPLICA_DATABASE_URL ; aucune requête n'y est envoyée ici
+    return mock.patch.dict(settings.DATABASES, {REPLICA_ALIAS: settings.DATABASES['default']})
+
+
+class ReplicaRouterTests(MentoringTestCase):
+    def test_reads_go_to_replica_only_inside_use_replica(self):
+        with with_replica():
+            self.assertEqual(router.db_for_read(User), 'default')
+            with use_replica():
+                self.assertEqual(router.db_for_read(User), REPLICA_ALIAS)
+                with use_replica(False):
+                    self.assertEqual(router.db_for_read(User), 'default')
+                self.assertEqual(router.db_for_read(User), REPLICA_ALIAS)
+
+    def test_no_replica_configured(self):
+        with use_replica():
+            self.assertEqual(router.db_for_read(User), 'default')
+
+    def test_reads_follow_writes_to_primary(self):
+        with with_replica(), use_replica():
+            self.assertEqual(router.db_for_write(User), 'default')
+            self.assertEqual(router.db_for_read(User), 'default')
+
+    def test_pinned_client_reads_primary(self):
+        with with_replica(), routing_state(pinned=True), use_replica():
+            self.assertEqual(router.db_for_read(User), 'default')
+
+    def test_write_in_worker_thread_is_seen_by_async_view(self):
+        # Les threads de sync_to_async partagent l'état de la requête : l'écriture y est visible ensuite
+        @reads_from_replica
+        async def view():
+            before = await sync_to_async(router.db_for_read)(User)
+            await sync_to_async(router.db_for_write)(User)
+            return before, router.db_for_read(User)
+
+        with with_replica():
+            self.assertEqual(async_to_sync(view)(), (REPLICA_ALIAS, 'default'))
+
+    def test_replica_never_migrated(self):
+        self.assertFalse(ReplicaRouter().allow_migrate(REPLICA_ALIAS, 'accounts'))
+        self.assertTrue(ReplicaRouter().allow_migrate('default', 'accounts'))
+
+
+@override_settings(REPLICA_STICKY_SECONDS=5)
+class ReplicaStickinessMiddlewareTests(MentoringTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        self.read_from = []
+
+    def view(self, write=False):
+        @reads_from_replica
+        def view(request):
+            if write:
+                router.db_for_write(User)
+            self.read_from.append(router.db_for_read(User))
+            return HttpResponse('ok')
+        return view
+
+    def test_write_sets_cookie(self):
+        with with_replica():
+            response = ReplicaStickinessMiddleware(self.view(write=True))(self.factory.post('/'))
+        cookie = response.cookies[ReplicaStickinessMiddleware.cookie_name]
+        self.assertEqual(cookie['max-age'], 5)
+        self.assertTrue(cookie['httponly'])
+        self.assertEqual(self.read_from, ['default'])
+
+    def test_read_only_request_sets_no_cookie(self):
+        with with_replica():
+            response = ReplicaStickinessMiddleware(self.view())(self.factory.get('/'))
+        self.assertNotIn(ReplicaStickinessMiddleware.cookie_name, response.cookies)
+        self.assertEqual(self.read_from, [REPLICA_ALIAS])
+
+    def test_cookie_pins_reads_to_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[ReplicaStickinessMiddleware.cookie_name] = '1'
+        with with_replica():
+            ReplicaStickinessMiddleware(self.view())(request)
+        self.assertEqual(self.read_from, ['default'])
+
+    def test_no_cookie_without_replica(self):
+        response = ReplicaStickinessMiddleware(self.view(write=True))(self.factory.post('/'))
+        self.assertNotIn(ReplicaStickinessMiddleware.cookie_name, response.cookies)
+
+    def test_async_write_sets_cookie(self):
+        async def get_response(request):
+            await sync_to_async(router.db_for_write)(User)
+            return HttpResponse('ok')
+
+        with with_replica():
+            response = async_to_sync(ReplicaStickinessMiddleware(get_response))(self.factory.post('/'))
+        self.assertIn(ReplicaStickinessMiddleware.cookie_name, response.cookies)
@@ -0,0 +1,130 @@
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts import search
+from accounts.models import FeedbackAnswer, FeedbackForm, FeedbackQuestion, FeedbackResponse, JalonBinome, User
+
+from .base import MentoringTestCase
+
+
+class SearchTests(MentoringTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.form = FeedbackForm.objects.create(programme=cls.programme, titre='Bilan', created_by=cls.rh)
+        cls.other_form = FeedbackForm.objects.create(programme=cls.programme, titre='Clôture', created_by=cls.rh)
+        cls.question = FeedbackQuestion.objects.create(form=cls.form, texte='Commentaire', type='TEXT')
+        cls.choice = FeedbackQuestion.objects.create(form=cls.form, texte='Format', type='CHOICE', ordre=2)
+        other_question = FeedbackQuestion.objects.create(form=cls.other_form, texte='Bilan final', type='TEXT')
+        for user, text in zip(cls.mentees, ["Présentation orale réussie", "Autonomie acquise", "Présenter en public"]):
+            response = FeedbackResponse.objects.create(form=cls.form, user=user)
+            FeedbackAnswer.objects.create(response=response, question=cls.question, answer=text)
+            FeedbackAnswer.objects.create(response=response, question=cls.choice, answer='Présentation')
+        response = FeedbackResponse.objects.create(form=cls.other_form, user=cls.mentees[0])
+        FeedbackAnswer.objects.create(response=response, question=other_question, answer="Présentation finale")
+        cls.jalon_binome = JalonBinome.objects.get(binome=cls.binomes[0], jalon=cls.jalons[0])
+        cls.jalon_binome.marquer_realise(commentaire="Présentation faite devant l'équipe")
+
+    def texts(self, results, kind='answers'):
+        field = search.KINDS[kind]['field']
+        return sorted(getattr(hit.object, field) for hit in results[0:results.count()])
+
+    def test_accents_and_prefix(self):
+        self.assertEqual(self.texts(search.search('presentation')), [
+            "Présentation finale", "Présentation orale réussie",
+        ])
+        self.assertEqual(len(self.texts(search.search('présent*'))), 3)
+
+    def test_choice_answers_not_indexed(self):
+        self.assertNotIn('Présentation', self.texts(search.search('présentation')))
+
+    def test_form_filter(self):
+        self.assertEqual(self.texts(search.search('présentation', form_id=self.other_form.pk)), ["Présentation finale"])
+
+    def test_comments(self):
+        self.assertEqual(self.texts(search.search('équipe', kind='comments'), 'comments'), [
+            "Présentation faite devant l'équipe",
+        ])
+
+    def test_query_syntax_is_escaped(self):
+        for query in ['"', 'NEAR(', 'a OR', '*', 'présentation" OR "x']:
+            search.search(query).count()
+
+    def test_snippet_is_escaped(self):
+        answer = FeedbackAnswer.objects.filter(question=self.question).first()
+        answer.answer = "<script>alert(1)</script> présentation"
+        answer.save()
+        hit = search.search('présentation', form_id=self.form.pk)[0:10][0]
+        self.assertNotIn('<script>', hit.snippet)
+        self.assertIn('<mark>', hit.snippet)
+
+    def test_question_leaving_text_is_unindexed(self):
+        self.question.type = 'CHOICE'
+        self.question.save()
+        self.assertEqual(self.texts(search.search('présentation')), ["Présentation finale"])
+        self.assertEqual(search.search('autonomie').count(), 0)
+
+    def test_question_becoming_text_is_indexed(self):
+        self.choice.type = 'TEXT'
+        self.choice.save()
+        self.assertEqual(self.texts(search.search('présentation', form_id=self.form.pk)), [
+            'Présentation', 'Présentation', 'Présentation', "Présentation orale réussie",
+        ])
+
+    def test_pagination(self):
+        page = Paginator(search.search('présent*'), 2).get_page(2)
+        self.assertEqual(page.paginator.count, 3)
+        self.assertEqual(len(page.object_list), 1)
+
+    def test_view(self):
+        self.client.force_login(self.rh)
+        response = self.client.get(reverse('search'), {'q': 'autonomie'})
+        self.assertContains(response, '<mark>Autonomie</mark>')
+        self.client.force_login(self.mentees[0])
+        self.assertNotEqual(self.client.get(reverse('search'), {'q': 'autonomie'}).status_code, 200)
+
+
+class CascadeDeleteTests(MentoringTestCase):
+    """Réponses et JalonBinome supprimés par lots : nombre de requêtes indépendant du nombre de lignes"""
+
+    def make_form(self, responses):
+        form = FeedbackForm.objects.create(programme=self.programme, titre='Volumineux', created_by=self.rh)
+        questions = [FeedbackQuestion.objects.create(form=form, texte=f'Q{k}', type='TEXT', ordre=k) for k in range(2)]
+        users = User.objects.bulk_create([User(username=f'u{form.pk}-{i}', role='MENTEE') for i in range(responses)])
+        for user in users:
+            response = FeedbackResponse.objects.create(form=form, user=user)
+            for question in questions:
+                FeedbackAnswer.objects.create(response=response, question=question, answer=f'Réponse détaillée {user.pk}')
+        return form
+
+    def delete_queries(self, obj):
+        with CaptureQueriesContext(connection) as queries:
+            obj.delete()
+        return len(queries)
+
+    def fts_count(self, kind='answers'):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {search.KINDS[kind]['fts_table']}")
+            return cursor.fetchone()[0]
+
+    def test_form_delete_is_set_based(self):
+        small, large = self.make_form(5), self.make_form(100)
+        small_queries = self.delete_queries(small)
+        large_queries = self.delete_queries(large)
+        self.assertEqual(large_queries, small_queries)
+        self.assertLess(large_queries, 25)
+        self.assertEqual(self.fts_count(), 0)
+
+    def test_response_delete_unindexes_its_answers(self):
+        form = self.make_form(3)
+        form.responses.first().delete()
+        self.assertEqual(self.fts_count(), 4)
+
+    def test_binome_delete_unindexes_comments(self):
+        jalon_binome = JalonBinome.objects.get(binome=self.binomes[0], jalon=self.jalons[0])
+        jalon_binome.marquer_realise(commentaire='Compte rendu')
+        self.assertEqual(self.fts_count('comments'), 1)
+        self.binomes[0].delete()
+        self.assertEqual(self.fts_count('comments'), 0)
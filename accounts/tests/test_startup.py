@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, tag
+
+# Processus neuf : sys.modules n'y contient que ce que le démarrage et la première requête ont importé
+CHILD = """
+import json, sys
+import django
+django.setup()
+from django.test import Client
+from django.test.utils import setup_test_environment
+setup_test_environment()
+from django.urls import get_resolver
+get_resolver().url_patterns
+loaded = {'urls': sorted(name for name in sys.modules if name.startswith('accounts.views.') or name == 'xlsxwriter')}
+response = Client().get('/')
+loaded['status'] = response.status_code
+loaded['home'] = sorted(name for name in sys.modules if name.startswith('accounts.views.') or name == 'xlsxwriter')
+print(json.dumps(loaded))
+"""
+
+
+@tag('slow')
+class LazyViewsStartupTests(SimpleTestCase):
+    def run_child(self):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+        process = subprocess.run(
+            [sys.executable, '-c', CHILD], capture_output=True, text=True, cwd=settings.BASE_DIR, env=env
+        )
+        self.assertEqual(process.returncode, 0, process.stderr[-2000:])
+        return json.loads(process.stdout.strip().splitlines()[-1])
+
+    def test_view_modules_imported_on_first_use(self):
+        loaded = self.run_child()
+        # L'URLconf ne référence que des LazyView : aucun module de vues, pas de xlsxwriter
+        self.assertEqual(loaded['urls'], [])
+        self.assertLess(loaded['status'], 400)
+        # La page d'accueil ne charge que le module public (et ses dépendances communes)
+        self.assertIn('accounts.views.public', loaded['home'])
+        for module in ('accounts.views.exports', 'accounts.views.admin_api', 'accounts.views.rh',
+                       'accounts.views.feedback', 'accounts.views.search', 'xlsxwriter'):
+            self.assertNotIn(module, loaded['home'])
+
+    def test_benchmark_startup_max_ms(self):
+        out = StringIO()
+        call_command('benchmark_startup', runs=1, top=3, max_ms=60000, stdout=out)
+        self.assertIn('vues à la demande', out.getvalue())
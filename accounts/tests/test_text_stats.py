@@ -0,0 +1,98 @@
+from accounts import text_stats
+from accounts.models import FeedbackAnswer, FeedbackForm, FeedbackQuestion, FeedbackResponse, TermFrequency, User
+
+from .base import MentoringTestCase
+
+TEXTS = [
+    "Très bonne écoute du mentor, conseils concrets.",
+    "Écoute attentive ; conseils concrets sur la prise de parole.",
+    "Manque de temps, mais bonne écoute.",
+]
+
+
+class TermsTests(MentoringTestCase):
+    def test_stop_words_and_short_words_ignored(self):
+        self.assertEqual(text_stats.terms("Il a une très bonne écoute"), {'bonne', 'écoute', 'bonne écoute'})
+
+    def test_bigrams_stop_at_punctuation(self):
+        found = text_stats.terms("Conseils concrets. Prise de parole")
+        self.assertIn('conseils concrets', found)
+        self.assertNotIn('concrets prise', found)
+        self.assertIn('prise parole', found)
+
+
+class TermFrequencyTests(MentoringTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.form = FeedbackForm.objects.create(programme=cls.programme, titre='Bilan', created_by=cls.rh)
+        cls.text = FeedbackQuestion.objects.create(form=cls.form, texte='Commentaire', type='TEXT')
+        cls.scale = FeedbackQuestion.objects.create(form=cls.form, texte='Note', type='SCALE', ordre=2)
+        cls.responses = []
+        for user, text in zip(cls.mentees, TEXTS):
+            response = FeedbackResponse.objects.create(form=cls.form, user=user)
+            with text_stats.batch():
+                FeedbackAnswer.objects.create(response=response, question=cls.text, answer=text)
+                FeedbackAnswer.objects.create(response=response, question=cls.scale, answer='4')
+            cls.responses.append(response)
+
+    def frequencies(self):
+        return dict(
+            ((question_id, term), answers)
+            for question_id, term, answers in TermFrequency.objects.values_list('question_id', 'term', 'answers')
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.frequencies()
+        text_stats.rebuild()
+        self.assertEqual(incremental, self.frequencies())
+        return incremental
+
+    def test_counts_answers_not_occurrences(self):
+        frequencies = self.assertMatchesRebuild()
+        self.assertEqual(frequencies[(self.text.pk, 'écoute')], 3)
+        self.assertEqual(frequencies[(self.text.pk, 'conseils concrets')], 2)
+        self.assertFalse(TermFrequency.objects.filter(question=self.scale).exists())
+
+    def test_edited_answer(self):
+        answer = FeedbackAnswer.objects.get(response=self.responses[2], question=self.text)
+        answer.answer = "Disponibilité exemplaire"
+        answer.save()
+        frequencies = self.assertMatchesRebuild()
+        self.assertEqual(frequencies[(self.text.pk, 'écoute')], 2)
+        self.assertNotIn((self.text.pk, 'manque'), frequencies)
+
+    def test_deleted_response(self):
+        self.responses[0].delete()
+        frequencies = self.assertMatchesRebuild()
+        self.assertEqual(frequencies[(self.text.pk, 'écoute')], 2)
+        self.assertNotIn((self.text.pk, 'mentor'), frequencies)
+
+    def test_deleted_responses_queryset(self):
+        FeedbackResponse.objects.filter(pk__in=[r.pk for r in self.responses[:2]]).delete()
+        frequencies = self.assertMatchesRebuild()
+        self.assertNotIn((self.text.pk, 'conseils concrets'), frequencies)
+
+    def test_deleted_user(self):
+        User.objects.filter(pk=self.mentees[1].pk).delete()
+        self.assertMatchesRebuild()
+
+    def test_deleted_question_and_form(self):
+        self.text.delete()
+        self.assertEqual(self.frequencies(), {})
+        self.form.delete()
+        self.assertFalse(FeedbackAnswer.objects.exists())
+
+    def test_question_type_change(self):
+        self.text.type = 'CHOICE'
+        self.text.save()
+        self.assertEqual(self.frequencies(), {})
+        self.text.type = 'TEXT'
+        self.text.save()
+        self.assertEqual(self.frequencies()[(self.text.pk, 'écoute')], 3)
+
+    def test_summary(self):
+        summary = text_stats.summary(self.text)
+        self.assertEqual(summary['terms'][0].term, 'écoute')
+        self.assertEqual([term.term for term in summary['bigrams']], ['bonne écoute', 'conseils concrets'])
+        self.assertEqual(summary['samples'][0], TEXTS[2])
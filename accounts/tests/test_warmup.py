@@ -0,0 +1,33 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from config.warmup import warm_database
+
+
+def fake_connection(pool=False):
+    connection = mock.Mock()
+    connection.settings_dict = {'OPTIONS': {'pool': {'min_size': 2}} if pool else {}}
+    return connection
+
+
+class WarmDatabaseTests(SimpleTestCase):
+    def warm(self, connection, **kwargs):
+        with mock.patch('config.warmup.connections') as connections:
+            connections.all.return_value = [connection]
+            warm_database(**kwargs)
+        return connection
+
+    def test_threaded_worker_without_pool_opens_nothing(self):
+        connection = self.warm(fake_connection())
+        connection.ensure_connection.assert_not_called()
+
+    def test_sync_worker_keeps_its_connection(self):
+        connection = self.warm(fake_connection(), same_thread=True)
+        connection.ensure_connection.assert_called_once()
+        connection.close.assert_not_called()
+
+    def test_pool_connection_returned(self):
+        connection = self.warm(fake_connection(pool=True))
+        connection.ensure_connection.assert_called_once()
+        connection.close.assert_called_once()
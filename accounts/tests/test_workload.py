@@ -0,0 +1,88 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Binome, JalonBinome, Programme, User
+from accounts.workload import get_workload, suggest_mentors
+
+from .base import MentoringTestCase
+
+
+class WorkloadTests(MentoringTestCase):
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        # Programme terminé : ses binômes ne comptent plus dans la charge
+        termine = Programme.objects.create(
+            nom='Terminé', description='', gestionnaire=self.rh,
+            date_debut=today - timedelta(days=200), date_fin=today - timedelta(days=10),
+        )
+        Binome.objects.create(programme=termine, mentor=self.mentors[1], mentore=self.mentees[0])
+        self.libre = User.objects.create_user('mentor_libre', password='x', role='MENTOR')
+        User.objects.create_user('mentor_inactif', password='x', role='MENTOR', is_active=False)
+
+    def by_mentor(self, rows=None):
+        return {row['username']: row for row in (rows if rows is not None else get_workload(refresh=True))}
+
+    def valider(self, binome, jalon, realise_il_y_a, delai_jours):
+        realisation = timezone.now() - timedelta(days=realise_il_y_a)
+        JalonBinome.objects.filter(binome=self.binomes[binome], jalon=self.jalons[jalon]).update(
+            statut='DONE', date_realisation=realisation, date_validation=realisation + timedelta(days=delai_jours),
+        )
+
+    def test_grouped_counts(self):
+        JalonBinome.objects.get(binome=self.binomes[2], jalon=self.jalons[1]).marquer_realise('Fait')
+        rows = self.by_mentor()
+        self.assertEqual(set(rows), {'mentor0', 'mentor1', 'mentor_libre'})
+        counts = {
+            name: (row['binomes_actifs'], row['validations_en_attente'], row['jalons_en_retard'])
+            for name, row in rows.items()
+        }
+        # Un jalon échu par binôme actif (fixtures) ; le binôme du programme terminé est ignoré
+        self.assertEqual(counts, {'mentor0': (2, 1, 2), 'mentor1': (1, 0, 1), 'mentor_libre': (0, 0, 0)})
+
+    def test_median_delay_within_window(self):
+        self.valider(0, 0, 10, 1)
+        self.valider(0, 2, 10, 4)
+        self.valider(2, 0, 10, 2)
+        # Validation hors de la fenêtre WORKLOAD_DELAY_WINDOW_DAYS
+        self.valider(2, 2, 400, 100)
+        rows = self.by_mentor()
+        self.assertEqual(rows['mentor0']['delai_median_jours'], 2.0)
+        self.assertIsNone(rows['mentor1']['delai_median_jours'])
+
+    def test_suggest_mentors(self):
+        def names(rows):
+            return [row['username'] for row in rows]
+
+        self.assertEqual(names(suggest_mentors()), ['mentor_libre', 'mentor1', 'mentor0'])
+        self.assertEqual(names(suggest_mentors(max_mentees=2)), ['mentor_libre', 'mentor1'])
+        self.assertEqual(names(suggest_mentors(max_mentees=2, exclude={self.libre.pk})), ['mentor1'])
+        self.assertEqual(names(suggest_mentors(limit=1)), ['mentor_libre'])
+
+    def test_json_endpoint(self):
+        self.client.force_login(self.rh)
+        response = self.client.get(reverse('api_mentor_workload'), {'suggest': 2, 'max': 2, 'tri': 'retard'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([row['username'] for row in data['mentors']], ['mentor0', 'mentor1', 'mentor_libre'])
+        self.assertEqual(data['suggestions'], [self.libre.pk, self.mentors[1].pk])
+
+    def test_json_endpoint_is_restricted(self):
+        self.client.force_login(self.mentors[0])
+        self.assertNotEqual(self.client.get(reverse('api_mentor_workload')).status_code, 200)
+
+    def test_cache_invalidated_after_matching(self):
+        today = timezone.localdate()
+        cohorte = Programme.objects.create(
+            nom='Cohorte 2', description='', gestionnaire=self.rh,
+            date_debut=today, date_fin=today + timedelta(days=90),
+        )
+        self.assertEqual(sum(row['binomes_actifs'] for row in get_workload()), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('match_binomes', cohorte.pk, '--max-mentees', '3', stdout=StringIO())
+        # Lecture sans refresh : le cache a été vidé après le commit des nouveaux binômes
+        self.assertEqual(sum(row['binomes_actifs'] for row in get_workload()), 3 + len(self.mentees))
@@ -0,0 +1,189 @@
+"""
+Fréquences des mots et bigrammes des réponses ouvertes (questions TEXT).
+
+``TermFrequency`` garde, par question, le nombre de réponses contenant chaque
+mot ou bigramme (mots vides français exclus). Les signaux (accounts/signals.py)
+l'ajustent à chaque réponse créée ou modifiée ; dans un bloc ``batch()`` les
+ajustements sont regroupés et appliqués en une fois. Les réponses supprimées en
+cascade sont décomptées d'un coup par ``forget()`` avant la suppression. Les
+chargements en masse, qui contournent les signaux, appellent ``rebuild()``.
+
+``summary()`` lit les termes les plus fréquents dans cette petite table au lieu
+de relire tous les textes : la page de résultats d'un formulaire reste rapide
+quel que soit le nombre de réponses.
+"""
+import re
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .models import FeedbackAnswer, TermFrequency
+
+STOP_WORDS = frozenset("""
+a à afin ai aie aient aies ait alors as au aucun aucune aupres auquel aura aurai auraient aurais aurait
+auras aurez auriez aurions aurons auront aussi autre autres aux avaient avais avait avant avec avez aviez
+avions avoir avons ayant ayez ayons bah beaucoup bien bon car ce ceci cela celle celles celui cependant
+certain certaine certaines certains ces cet cette ceux chaque chez ci comme comment dans de des desquelles
+desquels dessous dessus deux doit donc dont du duquel durant elle elles en encore entre es est et etaient
+etais etait etant ete etes etiez etions etre eu eue eues eûmes eurent eus eusse eussent eusses eussiez
+eussions eut eût eûtes eux étaient étais était étant été étée étées étés êtes étiez étions être fait faire
+fais faisait font fûmes furent fus fusse fussent fusses fussiez fussions fut fût fûtes hors ici il ils je
+jusqu jusque la là laquelle le lequel les lesquelles lesquels leur leurs lors lorsque lui ma mais me même
+mêmes mes moi moins mon ne ni non nos notre nous on ont ou où par parce pas peu peut plus plutôt pour
+pourquoi quand que quel quelle quelles quels qui quoi sa sans se selon sera serai seraient serais serait
+seras serez seriez serions serons seront ses si sien sienne soi soient sois soit sommes son sont sous
+soyez soyons suis sur ta te tes toi ton tous tout toute toutes très tu un une unes uns vers via voici
+voilà vos votre vous vu ça
+""".split())
+
+MAX_TERM_LENGTH = 40
+BATCH_SIZE = 1000
+
+_WORD = re.compile(r'[^\W\d_]+')
+# Un bigramme ne franchit pas la fin d'une phrase ou d'un élément de liste
+_SEGMENT = re.compile(r'[.!?;:,()\n\r\t•-]+')
+
+_pending = ContextVar('text_stats_pending', default=None)
+
+
+def tokens(text):
+    """Mots significatifs, en minuscules, par segment de phrase"""
+    for segment in _SEGMENT.split(text.lower()):
+        words = [
+            word for word in _WORD.findall(segment)
+            if len(word) > 2 and len(word) <= MAX_TERM_LENGTH and word not in STOP_WORDS
+        ]
+        if words:
+            yield words
+
+
+def terms(text):
+    """Mots et bigrammes distincts d'une réponse (un bigramme contient une espace)"""
+    found = set()
+    for words in tokens(text):
+        found.update(words)
+        found.update(f'{first} {second}' for first, second in zip(words, words[1:]))
+    return found
+
+
+def count_terms(rows):
+    """{question_id: Counter(terme -> réponses)} pour des paires (question_id, texte)"""
+    deltas = defaultdict(Counter)
+    for question_id, text in rows:
+        deltas[question_id].update(terms(text))
+    return deltas
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def apply_deltas(deltas):
+    """Applique {question_id: Counter(terme -> delta)} : lignes manquantes créées, puis un UPDATE par valeur de delta"""
+    TermFrequency.objects.bulk_create(
+        (
+            TermFrequency(question_id=question_id, term=term, bigram=' ' in term)
+            for question_id, counter in deltas.items()
+            for term, delta in counter.items() if delta > 0
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    emptied = set()
+    for question_id, counter in deltas.items():
+        by_delta = defaultdict(list)
+        for term, delta in counter.items():
+            if delta:
+                by_delta[delta].append(term)
+        for delta, chunk_terms in by_delta.items():
+            # Un compteur ayant dérivé ne passe jamais sous zéro : rebuild() le corrigera
+            expression = F('answers') + delta if delta > 0 else Greatest(F('answers') + delta, Value(0))
+            for chunk in _batched(chunk_terms, BATCH_SIZE):
+                TermFrequency.objects.filter(question_id=question_id, term__in=chunk).update(answers=expression)
+            if delta < 0:
+                emptied.add(question_id)
+    if emptied:
+        TermFrequency.objects.filter(question_id__in=emptied, answers=0).delete()
+
+
+def _apply_or_defer(deltas):
+    pending = _pending.get()
+    if pending is None:
+        apply_deltas(deltas)
+    else:
+        for question_id, counter in deltas.items():
+            pending[question_id].update(counter)
+
+
+def record(question_id, text, sign=1):
+    """Compte (sign=1) ou décompte (sign=-1) une réponse ; différé jusqu'à la fin d'un bloc batch()"""
+    found = terms(text)
+    if found:
+        _apply_or_defer({question_id: Counter({term: sign for term in found})})
+
+
+def forget(answers):
+    """Décompte les réponses d'un QuerySet qui vont être supprimées : une lecture, puis apply_deltas"""
+    rows = answers.filter(question__type='TEXT').exclude(answer='').values_list('question_id', 'answer')
+    counts = count_terms(rows.iterator(chunk_size=5000))
+    if counts:
+        _apply_or_defer({
+            question_id: Counter({term: -count for term, count in counter.items()})
+            for question_id, counter in counts.items()
+        })
+
+
+@contextmanager
+def batch():
+    """Regroupe les ajustements des réponses enregistrées dans le bloc, appliqués à la sortie"""
+    if _pending.get() is not None:
+        yield
+        return
+    token = _pending.set(defaultdict(Counter))
+    try:
+        yield
+        deltas = _pending.get()
+    finally:
+        _pending.reset(token)
+    apply_deltas(deltas)
+
+
+def rebuild(question_ids=None):
+    """Recalcule les fréquences depuis les réponses (toutes les questions, ou celles données)"""
+    answers = FeedbackAnswer.objects.filter(question__type='TEXT')
+    frequencies = TermFrequency.objects.all()
+    if question_ids is not None:
+        answers = answers.filter(question_id__in=question_ids)
+        frequencies = frequencies.filter(question_id__in=question_ids)
+    deltas = count_terms(answers.values_list('question_id', 'answer').iterator(chunk_size=5000))
+    with transaction.atomic():
+        frequencies.delete()
+        TermFrequency.objects.bulk_create(
+            (
+                TermFrequency(question_id=question_id, term=term, bigram=' ' in term, answers=count)
+                for question_id, counter in deltas.items()
+                for term, count in counter.items()
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+
+def summary(question, limit=15, samples=5):
+    """Mots et bigrammes les plus fréquents d'une question TEXT, et quelques réponses récentes"""
+    frequencies = TermFrequency.objects.filter(question=question).order_by('-answers', 'term')
+    return {
+        'terms': list(frequencies.filter(bigram=False)[:limit]),
+        # Un bigramme isolé n'est pas un thème
+        'bigrams': list(frequencies.filter(bigram=True, answers__gt=1)[:limit]),
+        'samples': list(
+            FeedbackAnswer.objects.filter(question=question).exclude(answer='')
+            .order_by('-id').values_list('answer', flat=True)[:samples]
+        ),
+    }
@@ -1,8 +1,9 @@
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.core.mail import send_mail, send_mass_mail, EmailMultiAlternatives
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 import logging
+from .models import User
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +79,48 @@ class EmailNotificationService:
             recipient_list=[mentore.email]
         )
     
+    @staticmethod
+    def notify_jalons_valides(mentor, mentore, jalons_binome):
+        """Notifie le mentoré, en un seul email, de tous les jalons validés en masse"""
+        feedback_forms = []
+        for jb in jalons_binome:
+            feedback_forms.extend(jb.jalon.feedback_forms.all())
+        
+        context = {
+            'mentor': mentor,
+            'mentore': mentore,
+            'jalons_binome': jalons_binome,
+            'feedback_forms': feedback_forms,
+            'site_url': settings.SITE_URL if hasattr(settings, 'SITE_URL') else 'http://127.0.0.1:8000'
+        }
+        
+        return EmailNotificationService.send_html_email(
+            subject=f"{len(jalons_binome)} jalon(s) validé(s) par {mentor.username}",
+            template_name='jalons_valides',
+            context=context,
+            recipient_list=[mentore.email, mentor.email]
+        )
+    
+    @staticmethod
+    def send_invitations(programme, pairs):
+        """Invitations d'un lot de binômes (matching) : une seule connexion SMTP pour tout le lot"""
+        users = User.objects.in_bulk({user_id for pair in pairs for user_id in pair})
+        subject = f"Invitation au programme de mentoring : {programme.nom}"
+        messages = []
+        for mentor_id, mentee_id in pairs:
+            mentor, mentore = users[mentor_id], users[mentee_id]
+            messages.append((subject, f"Bonjour {mentor.username},\n\nVous avez été assigné comme mentor dans le programme '{programme.nom}'.",
+                             settings.DEFAULT_FROM_EMAIL, [mentor.email]))
+            messages.append((subject, f"Bonjour {mentore.username},\n\nVous avez été assigné comme mentoré dans le programme '{programme.nom}'.",
+                             settings.DEFAULT_FROM_EMAIL, [mentore.email]))
+        try:
+            sent = send_mass_mail(messages, fail_silently=False)
+            logger.info(f"{sent} invitation(s) envoyée(s) pour le programme {programme.nom}")
+            return sent
+        except Exception as e:
+            logger.error(f"Erreur envoi des invitations du programme {programme.nom}: {str(e)}")
+            return 0
+    
     @staticmethod
     def notify_nouveau_feedback(feedback_form, recipient_list):
         """Notifie les utilisateurs d'un nouveau formulaire de feedback"""
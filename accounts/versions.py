@@ -0,0 +1,124 @@
+"""
+Versions des données affichées par les dashboards.
+
+Chaque groupe (``programmes``, ``binomes``, ``users``, ``activity``,
+``feedback``) a un numéro de version
+en cache, changé après commit par les signaux des modèles et par les mises à
+jour en masse qui les contournent (compteurs, chargements). Les fragments
+``{% cache %}`` des gabarits incluent ce numéro dans leur clé : un changement de
+données les invalide, sinon ils sont resservis sans être recalculés.
+
+Les mêmes versions donnent l'ETag et le Last-Modified des pages et API de
+statistiques (``conditional_on``) : une requête conditionnelle dont rien n'a
+changé reçoit un 304 sans qu'aucune requête SQL ne soit exécutée.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .routers import reads_from_primary
+
+# binomes : composition des binômes et programmes seulement (périmètre des utilisateurs, accounts/auth.py),
+# sans les changements de statut des jalons qui changent programmes à chaque transition
+GROUPS = ('programmes', 'binomes', 'users', 'activity', 'feedback')
+
+
+class _Pending(threading.local):
+    def __init__(self):
+        self.groups = set()
+
+
+_pending = _Pending()
+
+
+def _key(group):
+    return f'data_version:{group}'
+
+
+def get_versions():
+    versions = cache.get_many([_key(group) for group in GROUPS])
+    missing = [group for group in GROUPS if _key(group) not in versions]
+    if missing:
+        # Version perdue (cache vidé ou purgé) : repartir d'une valeur neuve, jamais d'une clé déjà servie
+        version = time.time_ns()
+        for group in missing:
+            cache.add(_key(group), version, None)
+        versions = cache.get_many([_key(group) for group in GROUPS])
+    return {group: versions.get(_key(group), 0) for group in GROUPS}
+
+
+def bump(*groups):
+    """Nouvelle version des groupes (tous par défaut) une fois la transaction validée"""
+    _pending.groups.update(groups or GROUPS)
+    transaction.on_commit(_flush)
+
+
+def _flush():
+    # Une transaction qui écrit des milliers de lignes enregistre autant de rappels : seul le premier écrit
+    groups, _pending.groups = _pending.groups, set()
+    if groups:
+        # Horodatage plutôt qu'incrément : une seule écriture, et jamais de retour à une ancienne valeur
+        version = time.time_ns()
+        cache.set_many({_key(group): version for group in groups}, None)
+
+
+class DataVersions:
+    """Accès paresseux depuis les gabarits : {{ data_versions.programmes }} ne lit le cache qu'à l'usage"""
+
+    def __init__(self):
+        self._versions = None
+
+    def __getitem__(self, group):
+        if self._versions is None:
+            self._versions = get_versions()
+        return self._versions[group]
+
+
+def _etag_func(groups, daily):
+    def etag(request, *args, **kwargs):
+        versions = get_versions()
+        parts = [
+            request.get_full_path(),
+            # Pages propres à chaque utilisateur (menu, jeton CSRF, messages en attente)
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME, ''),
+            request.COOKIES.get('messages', ''),
+            *(str(versions[group]) for group in groups),
+        ]
+        if daily:
+            parts.append(timezone.localdate().isoformat())
+        return hashlib.blake2b('|'.join(parts).encode(), digest_size=16).hexdigest()
+    return etag
+
+
+def _last_modified_func(groups, daily):
+    def last_modified(request, *args, **kwargs):
+        versions = get_versions()
+        modified = datetime.fromtimestamp(max(versions[group] for group in groups) / 1e9, dt_timezone.utc)
+        if daily:
+            # Retards et fenêtres de 30 jours changent à minuit même sans écriture
+            start_of_day = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+            modified = max(modified, start_of_day)
+        return modified
+    return last_modified
+
+
+def conditional_on(*groups, daily=False):
+    """
+    GET conditionnel (ETag/Last-Modified) d'une vue sync ou async dont le contenu
+    ne dépend que des groupes de données indiqués (et de la date si daily).
+    La réponse reste privée et doit être revalidée à chaque affichage. Le
+    contenu est lu sur le primaire, à jour des versions qui forment l'ETag.
+    """
+    def decorator(view):
+        view = reads_from_primary(view)
+        view = condition(etag_func=_etag_func(groups, daily), last_modified_func=_last_modified_func(groups, daily))(view)
+        return cache_control(private=True, no_cache=True)(view)
+    return decorator
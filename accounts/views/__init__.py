@@ -0,0 +1,102 @@
+"""
+Vues de l'application, un module par domaine :
+
+- public : accueil, inscription, connexion
+- dashboards : dashboards par rôle et flux SSE
+- jalons : réalisation, validation, chronologie, binômes
+- feedback : formulaires de feedback et résultats
+- exports : exports CSV et Excel
+- admin_api : API du dashboard super admin
+- rh : programmes, gestion des RH, statistiques, charge des mentors
+- text_search : recherche plein texte (réponses ouvertes, commentaires de jalons)
+
+``views.<nom>`` (utilisé par config/urls.py) renvoie une ``LazyView`` : le
+module de la vue n'est importé qu'à sa première requête, si bien qu'un worker
+ne charge que ce qu'il sert (et xlsxwriter seulement au premier export Excel).
+``python manage.py benchmark_startup`` mesure le gain au démarrage.
+"""
+from importlib import import_module
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import ImproperlyConfigured
+
+# Vue -> module (un module ne porte jamais le nom d'une vue : son import masquerait la LazyView)
+VIEW_MODULES = {
+    'home': 'public',
+    'signup': 'public',
+    'custom_login': 'public',
+    'custom_logout': 'public',
+    'dashboard': 'dashboards',
+    'dashboard_stream': 'dashboards',
+    'jalon_realise': 'jalons',
+    'jalon_valide': 'jalons',
+    'jalons_valide_bulk': 'jalons',
+    'api_jalons_valide_bulk': 'jalons',
+    'jalons_timeline': 'jalons',
+    'mentores_list': 'jalons',
+    'binomes_list': 'jalons',
+    'create_feedback_form': 'feedback',
+    'edit_feedback_form': 'feedback',
+    'fill_feedback_form': 'feedback',
+    'feedback_results': 'feedback',
+    'feedback_form': 'feedback',
+    'export_data': 'exports',
+    'admin_export_data': 'exports',
+    'admin_send_reminders': 'admin_api',
+    'admin_system_alerts': 'admin_api',
+    'admin_db_connections': 'admin_api',
+    'admin_users_data': 'admin_api',
+    'admin_toggle_user': 'admin_api',
+    'programmes_list': 'rh',
+    'manage_rh': 'rh',
+    'global_stats': 'rh',
+    'mentor_workload': 'rh',
+    'api_mentor_workload': 'rh',
+    'search': 'text_search',
+}
+
+# Le gestionnaire de requêtes doit savoir avant l'import si la vue est une coroutine
+ASYNC_VIEWS = {
+    'dashboard', 'dashboard_stream', 'admin_system_alerts', 'admin_users_data',
+    'programmes_list', 'global_stats', 'mentor_workload', 'api_mentor_workload',
+}
+
+
+class LazyView:
+    def __init__(self, name):
+        self.__name__ = self.__qualname__ = name
+        self.__module__ = f'{__name__}.{VIEW_MODULES[name]}'
+        self._view = None
+        if name in ASYNC_VIEWS:
+            markcoroutinefunction(self)
+
+    @property
+    def view(self):
+        if self._view is None:
+            view = getattr(import_module(self.__module__), self.__name__)
+            if iscoroutinefunction(view) != (self.__name__ in ASYNC_VIEWS):
+                raise ImproperlyConfigured(
+                    f"{self.__module__}.{self.__name__} : ASYNC_VIEWS ne correspond pas à la vue"
+                )
+            self._view = view
+        return self._view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+
+_lazy_views = {}
+
+
+def __getattr__(name):
+    if name not in VIEW_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in _lazy_views:
+        _lazy_views[name] = LazyView(name)
+    return _lazy_views[name]
+
+
+def load_all():
+    """Importe tous les modules de vues (préchauffage, mesures)"""
+    for module in sorted(set(VIEW_MODULES.values())):
+        import_module(f'{__name__}.{module}')
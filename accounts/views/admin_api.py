@@ -0,0 +1,79 @@
+"""API et actions du dashboard super admin"""
+from django.shortcuts import get_object_or_404
+from django.contrib.auth.decorators import login_required
+from asgiref.sync import sync_to_async
+from accounts.models import User
+from accounts.utils import EmailNotificationService
+from accounts.alerts import get_snapshot as get_alert_snapshot, record_reminder_run
+from accounts.versions import conditional_on
+from accounts.db_connections import connection_stats
+from django.http import JsonResponse
+import os
+from .common import role_required
+
+@login_required
+@role_required(['ADF'])
+def admin_send_reminders(request):
+    """Send reminder notifications manually"""
+    if request.method == 'POST':
+        try:
+            count = EmailNotificationService.send_jalon_reminder_notifications()
+            record_reminder_run()
+            return JsonResponse({'success': True, 'count': count})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+    
+    return JsonResponse({'success': False, 'error': 'Method not allowed'})
+
+@login_required
+@role_required(['ADF'])
+async def admin_system_alerts(request):
+    """Get system alerts for dashboard (served from the cached snapshot)"""
+    return JsonResponse(await sync_to_async(get_alert_snapshot)())
+
+@login_required
+@role_required(['ADF'])
+def admin_db_connections(request):
+    """Réglages de connexion et métriques du pool de ce worker"""
+    return JsonResponse({'pid': os.getpid(), 'databases': connection_stats()})
+
+@login_required
+@role_required(['ADF'])
+@conditional_on('users')
+async def admin_users_data(request):
+    """Get users data for dashboard table"""
+    users_data = [{
+        'id': user.id,
+        'username': user.username,
+        'full_name': user.get_full_name(),
+        'email': user.email,
+        'role': user.role,
+        'role_display': user.get_role_display(),
+        'last_login': user.last_login.isoformat() if user.last_login else None,
+        'is_active': user.is_active,
+        'date_joined': user.date_joined.isoformat()
+    } async for user in User.objects.order_by('-date_joined').only(
+        'id', 'username', 'first_name', 'last_name', 'email', 'role', 'last_login', 'is_active', 'date_joined'
+    )]
+    
+    return JsonResponse({'users': users_data})
+
+@login_required
+@role_required(['ADF'])
+def admin_toggle_user(request, user_id):
+    """Toggle user active status"""
+    if request.method == 'POST':
+        try:
+            user = get_object_or_404(User, id=user_id)
+            user.is_active = not user.is_active
+            user.save()
+            
+            return JsonResponse({
+                'success': True, 
+                'is_active': user.is_active,
+                'message': f'Utilisateur {"activé" if user.is_active else "désactivé"}'
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+    
+    return JsonResponse({'success': False, 'error': 'Method not allowed'})
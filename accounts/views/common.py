@@ -0,0 +1,75 @@
+"""Décorateurs et agrégats partagés par les modules de vues"""
+from django.shortcuts import render, redirect
+from django.contrib import messages
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from accounts.models import Programme
+
+
+def _role_denied(request, user, allowed_roles):
+    if not user.is_authenticated:
+        return redirect('login')
+    # Always allow Django superusers
+    if user.is_superuser:
+        return None
+    if user.role not in allowed_roles:
+        messages.error(request, "Accès non autorisé.")
+        return redirect('dashboard')
+    return None
+
+def role_required(allowed_roles):
+    """Decorator to restrict access based on user roles (sync and async views)"""
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                denied = _role_denied(request, await request.auser(), allowed_roles)
+                if denied:
+                    return denied
+                return await view_func(request, *args, **kwargs)
+            return _wrapped_view
+        
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            denied = _role_denied(request, request.user, allowed_roles)
+            if denied:
+                return denied
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+_arender = sync_to_async(render)
+
+def _programmes_with_stats():
+    """Programmes annotés du nombre de binômes ; les compteurs de jalons sont des colonnes du programme"""
+    return Programme.objects.annotate(binomes_count=Count('binomes'))
+
+def _programme_stats():
+    """Tableau par programme, évalué au rendu : rien n'est lu quand son fragment {% cache %} est servi"""
+    return [{
+        'programme': programme,
+        'binomes_count': programme.binomes_count,
+        'jalons_total': programme.jalons_total,
+        'jalons_completed': programme.jalons_done,
+        'completion_rate': programme.progression,
+    } for programme in _programmes_with_stats().order_by('-date_debut')]
+
+def _jalons_totaux():
+    """Totaux de jalons de la plateforme : somme des compteurs par programme, sans parcourir JalonBinome"""
+    return Programme.objects.aaggregate(
+        total=Coalesce(Sum('jalons_total'), 0),
+        todo=Coalesce(Sum('jalons_todo'), 0),
+        en_attente=Coalesce(Sum('jalons_wait'), 0),
+        completes=Coalesce(Sum('jalons_done'), 0),
+        overdue=Coalesce(Sum('jalons_overdue'), 0),
+    )
+
+def _completion_rate(completed, total):
+    if total > 0:
+        return round((completed / total) * 100, 1)
+    return 0
@@ -0,0 +1,298 @@
+"""Dashboards par rôle (ADF, RH, mentor, mentoré) et flux SSE de leurs compteurs"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.utils import timezone
+from django.db.models import Count, Q, Max, Sum
+from django.db.models.functions import Coalesce
+import asyncio
+from datetime import timedelta
+from accounts.models import User, Programme, Binome, JalonBinome
+from accounts.events import counter_stream
+from accounts.auth import aget_scope
+from accounts.pending_feedback import pending_forms
+from accounts.counters import est_en_retard
+from accounts.versions import get_versions
+from django.http import HttpResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from .common import _alist, _arender, _programme_stats, _jalons_totaux, _completion_rate
+
+async def _user_counts():
+    """Utilisateurs par rôle, en cache tant que la version de données users ne change pas"""
+    key = f"adf_user_counts:{(await sync_to_async(get_versions)())['users']}"
+    counts = await cache.aget(key)
+    if counts is None:
+        counts = await User.objects.aaggregate(
+            total=Count('id'),
+            mentors=Count('id', filter=Q(role='MENTOR')),
+            mentees=Count('id', filter=Q(role='MENTEE')),
+            rh=Count('id', filter=Q(role='RH')),
+            admins=Count('id', filter=Q(role='ADF')),
+        )
+        await cache.aset(key, counts, settings.TEMPLATE_FRAGMENT_CACHE_SECONDS)
+    return counts
+
+async def _dashboard_adf():
+    today = timezone.now().date()
+    last_month = timezone.now() - timedelta(days=30)
+    
+    user_counts, programme_counts, total_binomes, recent_jalons = await asyncio.gather(
+        _user_counts(),
+        Programme.objects.aaggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(date_fin__gte=today)),
+        ),
+        Binome.objects.acount(),
+        # Recent activity (last 30 days)
+        JalonBinome.objects.filter(date_realisation__gte=last_month).acount(),
+    )
+    
+    return 'dashboard_superadmin.html', {
+        'total_users': user_counts['total'],
+        'total_programmes': programme_counts['total'],
+        'total_binomes': total_binomes,
+        'total_rh': user_counts['rh'],
+        'active_programmes': programme_counts['active'],
+        'user_distribution': {
+            'mentors': user_counts['mentors'],
+            'mentees': user_counts['mentees'],
+            'rh': user_counts['rh'],
+            'admins': user_counts['admins'],
+        },
+        'recent_jalons': recent_jalons,
+    }
+
+async def _dashboard_rh():
+    last_month = timezone.now() - timedelta(days=30)
+    
+    (jalons_stats, total_programmes, total_binomes,
+     inactive_binomes, recent_completions) = await asyncio.gather(
+        # Detailed jalons statistics
+        _jalons_totaux(),
+        Programme.objects.acount(),
+        Binome.objects.acount(),
+        Binome.objects.exclude(
+            id__in=JalonBinome.objects.filter(
+                date_realisation__gte=last_month
+            ).values('binome_id')
+        ).acount(),
+        _alist(JalonBinome.objects.filter(
+            statut='DONE',
+            date_validation__isnull=False
+        ).select_related('jalon').order_by('-date_validation')[:5]),
+    )
+    
+    overdue_jalons = jalons_stats['overdue']
+    
+    # Alerts generation
+    alertes = []
+    if overdue_jalons > 0:
+        alertes.append({
+            'type': 'warning',
+            'titre': f'{overdue_jalons} jalon(s) en retard',
+            'message': 'Des jalons ont dépassé leur date d\'échéance (décompte rafraîchi chaque nuit).'
+        })
+    
+    pending_validations = jalons_stats['en_attente']
+    if pending_validations > 5:
+        alertes.append({
+            'type': 'info',
+            'titre': f'{pending_validations} jalons en attente',
+            'message': 'Plusieurs jalons attendent une validation de mentor.'
+        })
+    
+    if inactive_binomes > 0:
+        alertes.append({
+            'type': 'warning',
+            'titre': f'{inactive_binomes} binôme(s) inactif(s)',
+            'message': 'Certains binômes n\'ont pas d\'activité récente.'
+        })
+    
+    # Recent activities
+    activites_recentes = [{
+        'titre': f'Jalon validé: {jalon.jalon.titre}',
+        'date': jalon.date_validation,
+        'type': 'success',
+        'icon': 'check-circle'
+    } for jalon in recent_completions]
+    
+    return 'dashboard_rh.html', {
+        'total_programmes': total_programmes,
+        'total_binomes': total_binomes,
+        'jalons_en_attente': jalons_stats['en_attente'],
+        'taux_completion': _completion_rate(jalons_stats['completes'], jalons_stats['total']),
+        # Programme effectiveness (fragment en cache, calculé seulement s'il est périmé)
+        'programme_stats': _programme_stats,
+        'alertes': alertes,
+        'activites_recentes': activites_recentes,
+        'overdue_jalons': overdue_jalons,
+    }
+
+async def _dashboard_mentor(user, scope):
+    now = timezone.now()
+    # Binômes du mentor connus par son périmètre : pas de jointure sur binome pour filtrer
+    jalons_mentor = JalonBinome.objects.filter(binome_id__in=scope.binome_ids)
+    
+    (jalons_stats, mes_binomes, jalons_attention, validation_dates, jalons_en_attente,
+     feedbacks_en_attente) = await asyncio.gather(
+        Binome.objects.filter(pk__in=scope.binome_ids).aaggregate(
+            a_valider=Coalesce(Sum('jalons_wait'), 0),
+            valides=Coalesce(Sum('jalons_done'), 0),
+            total=Coalesce(Sum('jalons_total'), 0),
+        ),
+        # Mentee performance tracking
+        _alist(Binome.objects.filter(pk__in=scope.binome_ids).select_related('mentore', 'programme').annotate(
+            last_activity=Max('jalons_binome__date_realisation'),
+        )),
+        # Jalons requiring attention (overdue or waiting too long)
+        _alist(jalons_mentor.filter(
+            Q(statut='WAIT', date_realisation__lt=now - timedelta(days=3)) |
+            Q(statut='TODO', jalon__date_echeance__lt=now.date())
+        ).select_related('jalon', 'binome__mentore')[:5]),
+        _alist(jalons_mentor.filter(
+            statut='DONE',
+            date_realisation__isnull=False,
+            date_validation__isnull=False
+        ).values_list('date_realisation', 'date_validation')),
+        _alist(jalons_mentor.filter(statut='WAIT').select_related('jalon', 'binome__mentore')[:5]),
+        pending_forms(user.pk, scope.binome_ids).acount(),
+    )
+    
+    mentee_progress = [{
+        'binome': binome,
+        'progress_rate': binome.progression,
+        'completed_jalons': binome.jalons_done,
+        'total_jalons': binome.jalons_total,
+        'last_activity': binome.last_activity,
+    } for binome in mes_binomes]
+    
+    # Average response time for validations
+    avg_response_time = None
+    if validation_dates:
+        response_times = [(validation - realisation).days for realisation, validation in validation_dates]
+        avg_response_time = round(sum(response_times) / len(response_times), 1)
+    
+    return 'dashboard.html', {
+        'total_mentores': len(mes_binomes),
+        'jalons_a_valider': jalons_stats['a_valider'],
+        'jalons_valides': jalons_stats['valides'],
+        'feedbacks_en_attente': feedbacks_en_attente,
+        'mentee_progress': mentee_progress,
+        'jalons_attention': jalons_attention,
+        'avg_response_time': avg_response_time,
+        'jalons_en_attente': jalons_en_attente,
+    }
+
+async def _dashboard_mentee(user, scope):
+    binome = None
+    if scope.binome_ids:
+        binome = await Binome.objects.select_related('programme', 'mentor').filter(pk=scope.binome_ids[0]).afirst()
+    if binome is None:
+        return 'dashboard.html', {
+            'binome': None,
+            'jalons_completes': 0,
+            'jalons_en_attente': 0,
+            'jalons_a_faire': 0,
+            'taux_progression': 0,
+            'total_jalons': 0,
+            'prochains_jalons': [],
+            'jalons_en_retard': 0,
+            'recent_achievements': [],
+            'avg_completion_time': None,
+            'current_streak': 0,
+            'next_milestone': None,
+            'feedbacks_en_attente': 0,
+        }
+    
+    today = timezone.now().date()
+    jalons_mentee = JalonBinome.objects.filter(binome=binome)
+    
+    # Detailed progress statistics : compteurs dénormalisés du binôme
+    (prochains_jalons, recent_achievements, realisation_dates, statuts, feedbacks_en_attente) = await asyncio.gather(
+        # Timeline analysis
+        _alist(jalons_mentee.filter(statut='TODO').select_related('jalon').order_by('jalon__date_echeance')[:3]),
+        # Recent achievements
+        _alist(jalons_mentee.filter(
+            statut='DONE',
+            date_validation__isnull=False
+        ).select_related('jalon').order_by('-date_validation')[:3]),
+        _alist(jalons_mentee.filter(
+            statut='DONE', date_realisation__isnull=False
+        ).values_list('date_realisation', flat=True)),
+        _alist(jalons_mentee.order_by('jalon__date_echeance').values_list('statut', 'jalon__date_echeance')),
+        pending_forms(user.pk, scope.binome_ids).acount(),
+    )
+    
+    # Progress calculation
+    total = binome.jalons_total
+    taux_progression = binome.progression
+    
+    # Time to completion analysis: days from binome creation to jalon completion
+    avg_completion_time = None
+    if realisation_dates and binome.date_creation:
+        completion_times = [(date_realisation - binome.date_creation).days for date_realisation in realisation_dates]
+        avg_completion_time = round(sum(completion_times) / len(completion_times), 1)
+    
+    # Streak calculation (consecutive completed jalons)
+    current_streak = 0
+    for statut, _ in statuts:
+        if statut != 'DONE':
+            break
+        current_streak += 1
+    
+    # Next milestone
+    next_milestone = None
+    if prochains_jalons:
+        next_milestone = prochains_jalons[0]
+        next_milestone.days_until = max(0, (next_milestone.jalon.date_echeance - today).days)
+    
+    return 'dashboard.html', {
+        'binome': binome,
+        'jalons_completes': binome.jalons_done,
+        'jalons_en_attente': binome.jalons_wait,
+        'jalons_a_faire': binome.jalons_todo,
+        'total_jalons': total,
+        'taux_progression': taux_progression,
+        'prochains_jalons': prochains_jalons,
+        # Compté à la lecture : binome.jalons_overdue n'est rafraîchi que par les transitions et la réconciliation nocturne
+        'jalons_en_retard': sum(est_en_retard(statut, date_echeance, today) for statut, date_echeance in statuts),
+        'recent_achievements': recent_achievements,
+        'avg_completion_time': avg_completion_time,
+        'current_streak': current_streak,
+        'next_milestone': next_milestone,
+        'feedbacks_en_attente': feedbacks_en_attente,
+    }
+
+@login_required
+async def dashboard(request):
+    user = await request.auser()
+    
+    if user.role == 'ADF' or user.is_superuser:
+        template, context = await _dashboard_adf()
+    elif user.role == 'RH':
+        template, context = await _dashboard_rh()
+    elif user.role == 'MENTOR':
+        template, context = await _dashboard_mentor(user, await aget_scope(request))
+    elif user.role == 'MENTEE':
+        template, context = await _dashboard_mentee(user, await aget_scope(request))
+    else:
+        template, context = 'home.html', {}
+    
+    return await _arender(request, template, context)
+
+async def dashboard_stream(request):
+    """Flux SSE des variations de compteurs pour les dashboards ADF et RH (ASGI uniquement)"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    if not (user.is_superuser or user.role in ('ADF', 'RH')):
+        return HttpResponse(status=403)
+    if not isinstance(request, ASGIRequest):
+        # En WSGI le flux serait bufferisé indéfiniment : 204 indique au navigateur de ne pas se reconnecter
+        return HttpResponse(status=204)
+    
+    response = StreamingHttpResponse(counter_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
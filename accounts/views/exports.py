@@ -0,0 +1,425 @@
+"""Exports CSV (en streaming) et Excel ; xlsxwriter n'est importé qu'au premier export Excel"""
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.db import router
+from django.db.models import Count
+from datetime import datetime
+from accounts.models import User, Programme, Binome, JalonBinome, FeedbackResponse, FeedbackAnswer
+from accounts.routers import reads_from_replica
+from django.http import HttpResponse, StreamingHttpResponse
+import csv
+from io import BytesIO, StringIO
+from .common import role_required, _programmes_with_stats
+
+@login_required
+@role_required(['ADF', 'RH'])
+@reads_from_replica
+def export_data(request):
+    """Interface d'export de données avec options"""
+    if request.method == 'GET':
+        # Afficher l'interface d'export
+        context = {
+            'total_users': User.objects.count(),
+            'total_programmes': Programme.objects.count(),
+            'total_binomes': Binome.objects.count(),
+            'total_jalons': JalonBinome.objects.count(),
+            'total_feedbacks': FeedbackResponse.objects.count(),
+        }
+        return render(request, 'admin/export_data.html', context)
+    
+    elif request.method == 'POST':
+        # Traiter la demande d'export
+        export_type = request.POST.get('export_type', 'csv')
+        data_types = request.POST.getlist('data_types')
+        date_from = request.POST.get('date_from')
+        date_to = request.POST.get('date_to')
+        
+        if export_type == 'csv':
+            return export_csv(request, data_types, date_from, date_to)
+        elif export_type == 'excel':
+            return export_excel(request, data_types, date_from, date_to)
+        else:
+            messages.error(request, "Format d'export non supporté")
+            return redirect('export_data')
+
+def export_csv(request, data_types, date_from=None, date_to=None):
+    """Export des données en format CSV, envoyé en streaming au fil des lignes"""
+    # Le flux est lu après le retour de la vue, hors du routage de la requête (et sous ASGI
+    # un morceau par thread) : la base est choisie ici, réplica ou principale si le client est épinglé
+    alias = router.db_for_read(User)
+    response = StreamingHttpResponse(
+        _csv_stream(_csv_rows(data_types, date_from, date_to, using=alias)),
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="mentorship_export_{datetime.now().strftime("%Y%m%d_%H%M")}.csv"'
+    return response
+
+def _csv_stream(rows, chunk_size=64 * 1024):
+    # Morceaux d'environ 64 Ko plutôt qu'une ligne par envoi
+    buffer = StringIO()
+    # Ajouter BOM pour Excel
+    buffer.write('\ufeff')
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _csv_rows(data_types, date_from=None, date_to=None, using='default'):
+    # Filtres de date
+    date_filter = {}
+    if date_from:
+        date_filter['date_joined__gte'] = date_from
+    if date_to:
+        date_filter['date_joined__lte'] = date_to
+    
+    # Export des utilisateurs
+    if 'users' in data_types:
+        yield ['=== UTILISATEURS ===']
+        yield [
+            'ID', 'Nom d\'utilisateur', 'Prénom', 'Nom', 'Email', 'Rôle', 
+            'Date d\'inscription', 'Dernière connexion', 'Actif', 'Programmes'
+        ]
+        
+        users = User.objects.using(using).filter(**date_filter).order_by('date_joined')
+        for user in users:
+            # Compter les programmes pour chaque utilisateur
+            if user.role == 'RH':
+                programmes_count = Programme.objects.using(using).filter(gestionnaire=user).count()
+            elif user.role == 'MENTOR':
+                programmes_count = Binome.objects.using(using).filter(mentor=user).values('programme').distinct().count()
+            elif user.role == 'MENTEE':
+                programmes_count = Binome.objects.using(using).filter(mentore=user).values('programme').distinct().count()
+            else:
+                programmes_count = 0
+            
+            yield [
+                user.id,
+                user.username,
+                user.first_name,
+                user.last_name,
+                user.email,
+                user.get_role_display(),
+                user.date_joined.strftime('%d/%m/%Y %H:%M'),
+                user.last_login.strftime('%d/%m/%Y %H:%M') if user.last_login else 'Jamais',
+                'Oui' if user.is_active else 'Non',
+                programmes_count
+            ]
+        yield []
+    
+    # Export des programmes
+    if 'programmes' in data_types:
+        yield ['=== PROGRAMMES ===']
+        yield [
+            'ID', 'Nom', 'Description', 'Date début', 'Date fin', 'Gestionnaire', 
+            'Nb binômes', 'Nb jalons', 'Taux completion', 'Statut'
+        ]
+        
+        for programme in _programmes_with_stats().using(using).select_related('gestionnaire').order_by('date_debut'):
+            completion_rate = programme.progression
+            
+            # Déterminer le statut
+            today = datetime.now().date()
+            if programme.date_fin < today:
+                statut = 'Terminé'
+            elif programme.date_debut <= today <= programme.date_fin:
+                statut = 'En cours'
+            else:
+                statut = 'À venir'
+            
+            yield [
+                programme.id,
+                programme.nom,
+                programme.description,
+                programme.date_debut.strftime('%d/%m/%Y'),
+                programme.date_fin.strftime('%d/%m/%Y'),
+                programme.gestionnaire.username,
+                programme.binomes_count,
+                programme.jalons_total,
+                f"{completion_rate}%",
+                statut
+            ]
+        yield []
+    
+    # Export des binômes
+    if 'binomes' in data_types:
+        yield ['=== BINÔMES ===']
+        yield [
+            'ID', 'Programme', 'Mentor', 'Mentoré', 'Date création', 
+            'Jalons total', 'Jalons complétés', 'Jalons en attente', 'Progression %'
+        ]
+        
+        for binome in Binome.objects.using(using).select_related('programme', 'mentor', 'mentore'):
+            total_jalons = binome.jalons_total
+            completed_jalons = binome.jalons_done
+            pending_jalons = binome.jalons_wait
+            
+            progression = binome.progression
+            
+            yield [
+                binome.id,
+                binome.programme.nom,
+                binome.mentor.username,
+                binome.mentore.username,
+                binome.date_creation.strftime('%d/%m/%Y') if hasattr(binome, 'date_creation') else 'N/A',
+                total_jalons,
+                completed_jalons,
+                pending_jalons,
+                f"{progression}%"
+            ]
+        yield []
+    
+    # Export des jalons
+    if 'jalons' in data_types:
+        yield ['=== JALONS ===']
+        yield [
+            'ID', 'Programme', 'Titre', 'Description', 'Binôme', 'Mentor', 'Mentoré',
+            'Statut', 'Date échéance', 'Date réalisation', 'Date validation', 
+            'Temps réalisation (jours)', 'Temps validation (jours)', 'Commentaire'
+        ]
+        
+        jalons_filter = {}
+        if date_from:
+            jalons_filter['jalon__date_echeance__gte'] = date_from
+        if date_to:
+            jalons_filter['jalon__date_echeance__lte'] = date_to
+        
+        for jalon_binome in JalonBinome.objects.using(using).filter(**jalons_filter).select_related(
+            'jalon', 'binome', 'binome__mentor', 'binome__mentore'
+        ).order_by('jalon__date_echeance'):
+            
+            # Calculer les temps
+            temps_realisation = ''
+            temps_validation = ''
+            
+            if jalon_binome.date_realisation:
+                delta_real = jalon_binome.date_realisation.date() - jalon_binome.jalon.date_echeance
+                temps_realisation = delta_real.days
+            
+            if jalon_binome.date_validation and jalon_binome.date_realisation:
+                delta_valid = jalon_binome.date_validation - jalon_binome.date_realisation
+                temps_validation = delta_valid.days
+            
+            yield [
+                jalon_binome.id,
+                jalon_binome.jalon.programme.nom,
+                jalon_binome.jalon.titre,
+                jalon_binome.jalon.description,
+                f"{jalon_binome.binome.mentor.username} / {jalon_binome.binome.mentore.username}",
+                jalon_binome.binome.mentor.username,
+                jalon_binome.binome.mentore.username,
+                jalon_binome.get_statut_display(),
+                jalon_binome.jalon.date_echeance.strftime('%d/%m/%Y'),
+                jalon_binome.date_realisation.strftime('%d/%m/%Y %H:%M') if jalon_binome.date_realisation else '',
+                jalon_binome.date_validation.strftime('%d/%m/%Y %H:%M') if jalon_binome.date_validation else '',
+                temps_realisation,
+                temps_validation,
+                jalon_binome.commentaire
+            ]
+        yield []
+    
+    # Export des feedbacks
+    if 'feedbacks' in data_types:
+        yield ['=== FEEDBACKS ===']
+        yield [
+            'ID', 'Formulaire', 'Programme', 'Utilisateur', 'Rôle utilisateur',
+            'Date réponse', 'Nb questions', 'Questions/Réponses'
+        ]
+        
+        for feedback_response in FeedbackResponse.objects.using(using).select_related(
+            'form', 'user', 'form__programme'
+        ).order_by('-date_reponse'):
+            
+            answers = FeedbackAnswer.objects.using(using).filter(response=feedback_response).select_related('question')
+            qa_pairs = []
+            for answer in answers:
+                qa_pairs.append(f"Q: {answer.question.texte} | R: {answer.answer}")
+            
+            yield [
+                feedback_response.id,
+                feedback_response.form.titre,
+                feedback_response.form.programme.nom,
+                feedback_response.user.username,
+                feedback_response.user.get_role_display(),
+                feedback_response.date_reponse.strftime('%d/%m/%Y %H:%M'),
+                answers.count(),
+                ' || '.join(qa_pairs)
+            ]
+
+@reads_from_replica
+def export_excel(request, data_types, date_from=None, date_to=None):
+    """Export des données en format Excel avec plusieurs feuilles"""
+    try:
+        import xlsxwriter
+    except ImportError:
+        messages.error(request, "Le module xlsxwriter n'est pas installé. Utilisez l'export CSV ou installez xlsxwriter avec: pip install xlsxwriter")
+        return redirect('export_data')
+    
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'in_memory': True, 'remove_timezone': True})
+    
+    # Styles
+    header_format = workbook.add_format({
+        'bold': True,
+        'bg_color': '#4472C4',
+        'font_color': 'white',
+        'border': 1
+    })
+    
+    data_format = workbook.add_format({
+        'border': 1,
+        'text_wrap': True
+    })
+    
+    date_format = workbook.add_format({
+        'border': 1,
+        'num_format': 'dd/mm/yyyy'
+    })
+    
+    # Filtres de date
+    date_filter = {}
+    if date_from:
+        date_filter['date_joined__gte'] = date_from
+    if date_to:
+        date_filter['date_joined__lte'] = date_to
+    
+    # Feuille Utilisateurs
+    if 'users' in data_types:
+        worksheet = workbook.add_worksheet('Utilisateurs')
+        headers = [
+            'ID', 'Nom d\'utilisateur', 'Prénom', 'Nom', 'Email', 'Rôle',
+            'Date inscription', 'Dernière connexion', 'Actif', 'Programmes'
+        ]
+        
+        for col, header in enumerate(headers):
+            worksheet.write(0, col, header, header_format)
+        
+        users = User.objects.filter(**date_filter).order_by('date_joined')
+        for row, user in enumerate(users, 1):
+            # Compter les programmes
+            if user.role == 'RH':
+                programmes_count = Programme.objects.filter(gestionnaire=user).count()
+            elif user.role == 'MENTOR':
+                programmes_count = Binome.objects.filter(mentor=user).values('programme').distinct().count()
+            elif user.role == 'MENTEE':
+                programmes_count = Binome.objects.filter(mentore=user).values('programme').distinct().count()
+            else:
+                programmes_count = 0
+            
+            worksheet.write(row, 0, user.id, data_format)
+            worksheet.write(row, 1, user.username, data_format)
+            worksheet.write(row, 2, user.first_name, data_format)
+            worksheet.write(row, 3, user.last_name, data_format)
+            worksheet.write(row, 4, user.email, data_format)
+            worksheet.write(row, 5, user.get_role_display(), data_format)
+            worksheet.write(row, 6, user.date_joined, date_format)
+            worksheet.write(row, 7, user.last_login if user.last_login else 'Jamais', data_format)
+            worksheet.write(row, 8, 'Oui' if user.is_active else 'Non', data_format)
+            worksheet.write(row, 9, programmes_count, data_format)
+        
+        # Ajuster la largeur des colonnes
+        worksheet.set_column('A:A', 5)
+        worksheet.set_column('B:B', 15)
+        worksheet.set_column('C:D', 12)
+        worksheet.set_column('E:E', 25)
+        worksheet.set_column('F:F', 12)
+        worksheet.set_column('G:H', 18)
+        worksheet.set_column('I:J', 10)
+    
+    # Feuille Programmes
+    if 'programmes' in data_types:
+        worksheet = workbook.add_worksheet('Programmes')
+        headers = [
+            'ID', 'Nom', 'Description', 'Date début', 'Date fin', 'Gestionnaire',
+            'Nb binômes', 'Nb jalons', 'Taux completion', 'Statut'
+        ]
+        
+        for col, header in enumerate(headers):
+            worksheet.write(0, col, header, header_format)
+        
+        for row, programme in enumerate(_programmes_with_stats().select_related('gestionnaire').order_by('date_debut'), 1):
+            completion_rate = programme.progression
+            
+            # Déterminer le statut
+            today = datetime.now().date()
+            if programme.date_fin < today:
+                statut = 'Terminé'
+            elif programme.date_debut <= today <= programme.date_fin:
+                statut = 'En cours'
+            else:
+                statut = 'À venir'
+            
+            worksheet.write(row, 0, programme.id, data_format)
+            worksheet.write(row, 1, programme.nom, data_format)
+            worksheet.write(row, 2, programme.description, data_format)
+            worksheet.write(row, 3, programme.date_debut, date_format)
+            worksheet.write(row, 4, programme.date_fin, date_format)
+            worksheet.write(row, 5, programme.gestionnaire.username, data_format)
+            worksheet.write(row, 6, programme.binomes_count, data_format)
+            worksheet.write(row, 7, programme.jalons_total, data_format)
+            worksheet.write(row, 8, f"{completion_rate}%", data_format)
+            worksheet.write(row, 9, statut, data_format)
+        
+        worksheet.set_column('A:A', 5)
+        worksheet.set_column('B:B', 20)
+        worksheet.set_column('C:C', 30)
+        worksheet.set_column('D:F', 15)
+        worksheet.set_column('G:J', 12)
+    
+    # Feuille Statistiques
+    stats_worksheet = workbook.add_worksheet('Statistiques')
+    
+    # Statistiques générales
+    stats_data = [
+        ['Métrique', 'Valeur'],
+        ['Total utilisateurs', User.objects.count()],
+        ['Total programmes', Programme.objects.count()],
+        ['Total binômes', Binome.objects.count()],
+        ['Total jalons', JalonBinome.objects.count()],
+        ['Jalons complétés', JalonBinome.objects.filter(statut='DONE').count()],
+        ['Jalons en attente', JalonBinome.objects.filter(statut='WAIT').count()],
+        ['Jalons à faire', JalonBinome.objects.filter(statut='TODO').count()],
+        ['Total feedbacks', FeedbackResponse.objects.count()],
+    ]
+    
+    for row, (metric, value) in enumerate(stats_data):
+        if row == 0:
+            stats_worksheet.write(row, 0, metric, header_format)
+            stats_worksheet.write(row, 1, value, header_format)
+        else:
+            stats_worksheet.write(row, 0, metric, data_format)
+            stats_worksheet.write(row, 1, value, data_format)
+    
+    # Répartition par rôle
+    stats_worksheet.write(len(stats_data) + 1, 0, 'Répartition par rôle', header_format)
+    role_stats = User.objects.values('role').annotate(count=Count('id'))
+    
+    for i, stat in enumerate(role_stats):
+        row = len(stats_data) + 2 + i
+        role_display = dict(User.ROLE_CHOICES).get(stat['role'], stat['role'])
+        stats_worksheet.write(row, 0, role_display, data_format)
+        stats_worksheet.write(row, 1, stat['count'], data_format)
+    
+    stats_worksheet.set_column('A:A', 25)
+    stats_worksheet.set_column('B:B', 15)
+    
+    workbook.close()
+    output.seek(0)
+    
+    response = HttpResponse(
+        output.read(),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename="mentorship_export_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx"'
+    
+    return response
+
+@login_required
+@role_required(['ADF'])
+def admin_export_data(request):
+    """Export rapide pour le dashboard admin"""
+    return export_csv(request, ['users', 'programmes', 'binomes', 'jalons'])
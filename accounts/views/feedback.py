@@ -0,0 +1,193 @@
+"""Formulaires de feedback : création, édition, saisie et résultats"""
+import logging
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from accounts.forms import FeedbackFormForm, FeedbackQuestionForm
+from accounts.models import FeedbackForm, FeedbackQuestion, FeedbackResponse, FeedbackAnswer
+from accounts.utils import EmailNotificationService
+from accounts.versions import conditional_on
+from accounts import text_stats
+from accounts.auth import get_scope
+from accounts.pending_feedback import answered, pending_forms
+
+logger = logging.getLogger(__name__)
+
+@login_required
+def create_feedback_form(request):
+    """Créer un nouveau formulaire de feedback (RH uniquement)"""
+    if request.user.role != 'RH':
+        messages.error(request, "Accès non autorisé.")
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        form = FeedbackFormForm(request.POST)
+        if form.is_valid():
+            feedback_form = form.save(commit=False)
+            feedback_form.created_by = request.user
+            feedback_form.save()
+            messages.success(request, "Formulaire créé avec succès.")
+            return redirect('edit_feedback_form', form_id=feedback_form.id)
+    else:
+        form = FeedbackFormForm()
+    
+    return render(request, 'feedback/create_form.html', {'form': form})
+
+@login_required
+def edit_feedback_form(request, form_id):
+    """Éditer un formulaire de feedback et ses questions"""
+    if request.user.role != 'RH':
+        messages.error(request, "Accès non autorisé.")
+        return redirect('dashboard')
+    
+    feedback_form = get_object_or_404(FeedbackForm, id=form_id)
+    questions = FeedbackQuestion.objects.filter(form=feedback_form).order_by('ordre')
+    
+    if request.method == 'POST':
+        if 'add_question' in request.POST:
+            question_form = FeedbackQuestionForm(request.POST)
+            if question_form.is_valid():
+                question = question_form.save(commit=False)
+                question.form = feedback_form
+                question.ordre = questions.count() + 1
+                question.save()
+                messages.success(request, "Question ajoutée avec succès.")
+                return redirect('edit_feedback_form', form_id=form_id)
+        elif 'delete_question' in request.POST:
+            question_id = request.POST.get('question_id')
+            question = get_object_or_404(FeedbackQuestion, id=question_id, form=feedback_form)
+            question.delete()
+            messages.success(request, "Question supprimée avec succès.")
+            return redirect('edit_feedback_form', form_id=form_id)
+    
+    question_form = FeedbackQuestionForm()
+    
+    context = {
+        'feedback_form': feedback_form,
+        'questions': questions,
+        'question_form': question_form,
+    }
+    return render(request, 'feedback/edit_form.html', context)
+
+@login_required
+def fill_feedback_form(request, form_id):
+    """Remplir un formulaire de feedback"""
+    feedback_form = get_object_or_404(FeedbackForm, id=form_id)
+    questions = FeedbackQuestion.objects.filter(form=feedback_form).order_by('id')
+    
+    # Vérifier si l'utilisateur a déjà répondu
+    existing_response = FeedbackResponse.objects.filter(
+        form=feedback_form, user=request.user
+    ).first()
+    
+    if existing_response and not feedback_form.allow_multiple_responses:
+        messages.info(request, "Vous avez déjà répondu à ce formulaire.")
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        # Créer une nouvelle réponse
+        response = FeedbackResponse.objects.create(
+            form=feedback_form,
+            user=request.user
+        )
+        
+        # Sauvegarder les réponses aux questions (fréquences des mots mises à jour en une fois)
+        with text_stats.batch():
+            for question in questions:
+                answer_value = request.POST.get(f'question_{question.id}')
+                if answer_value:
+                    FeedbackAnswer.objects.create(
+                        response=response,
+                        question=question,
+                        answer=answer_value
+                    )
+        
+        messages.success(request, "Votre réponse a été enregistrée avec succès.")
+        
+        # Envoyer notification email au RH
+        try:
+            email_service = EmailNotificationService()
+            email_service.send_feedback_notification(feedback_form, request.user)
+        except Exception as e:
+            logger.error(f"Erreur envoi email feedback: {e}")
+        
+        return redirect('dashboard')
+    
+    context = {
+        'feedback_form': feedback_form,
+        'questions': questions,
+    }
+    return render(request, 'feedback/fill_form.html', context)
+
+@login_required
+@conditional_on('feedback')
+def feedback_results(request, form_id):
+    """Voir les résultats d'un formulaire de feedback (RH uniquement)"""
+    if request.user.role != 'RH':
+        messages.error(request, "Accès non autorisé.")
+        return redirect('dashboard')
+    
+    feedback_form = get_object_or_404(FeedbackForm, id=form_id)
+    responses = FeedbackResponse.objects.filter(form=feedback_form).select_related('user')
+    questions = FeedbackQuestion.objects.filter(form=feedback_form).order_by('ordre')
+    
+    # Calculer les statistiques
+    stats = {}
+    for question in questions:
+        answers = FeedbackAnswer.objects.filter(question=question)
+        if question.type == 'SCALE':
+            # Calculer moyenne pour les questions d'échelle
+            values = [int(answer.answer) for answer in answers if answer.answer.isdigit()]
+            if values:
+                stats[question.id] = {
+                    'type': 'scale',
+                    'average': sum(values) / len(values),
+                    'count': len(values),
+                    'distribution': {i: values.count(i) for i in range(1, 6)}
+                }
+        elif question.type == 'CHOICE':
+            # Compter les choix
+            choices = [answer.answer for answer in answers]
+            stats[question.id] = {
+                'type': 'choice',
+                'distribution': {choice: choices.count(choice) for choice in set(choices)},
+                'count': len(choices)
+            }
+        else:
+            # Questions texte : termes fréquents précalculés, quelques réponses en exemple
+            stats[question.id] = {
+                'type': 'text',
+                'count': answers.count(),
+                **text_stats.summary(question),
+            }
+        question.stats = stats.get(question.id)
+    
+    context = {
+        'feedback_form': feedback_form,
+        'responses': responses,
+        'questions': questions,
+        'stats': stats,
+    }
+    return render(request, 'feedback/results.html', context)
+
+@login_required
+def feedback_form(request):
+    """Vue générale pour les formulaires de feedback"""
+    if request.user.role not in ['RH', 'MENTOR', 'MENTEE']:
+        messages.error(request, "Accès non autorisé.")
+        return redirect('dashboard')
+    
+    # Pour les RH : voir tous les formulaires
+    if request.user.role == 'RH':
+        forms = FeedbackForm.objects.select_related('programme', 'jalon').order_by('-date_creation')
+        return render(request, 'feedback/manage_forms.html', {'forms': forms})
+    
+    # Pour les mentors/mentorés : formulaires actifs de leurs programmes non encore remplis
+    scope = get_scope(request)
+    context = {
+        'pending_forms': pending_forms(request.user.pk, scope.binome_ids)
+            .select_related('programme', 'jalon').order_by('-date_creation'),
+        'completed_forms': FeedbackForm.objects.filter(answered(request.user.pk))
+            .select_related('programme', 'jalon').order_by('-date_creation'),
+    }
+    return render(request, 'feedback/user_forms.html', context)
@@ -0,0 +1,204 @@
+"""Jalons : réalisation, validation (unitaire et en masse), chronologie et listes de binômes"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.utils import timezone
+from django.db import transaction
+from accounts.models import Programme, Binome, JalonBinome
+from accounts.utils import EmailNotificationService
+from accounts.counters import apply_transition
+from accounts.auth import get_scope
+from django.conf import settings
+from django.http import JsonResponse
+import json
+from .common import role_required
+
+@login_required
+@role_required(['MENTEE'])
+def jalon_realise(request, jalonbinome_id):
+    """Mark milestone as completed by mentee"""
+    jb = get_object_or_404(JalonBinome, id=jalonbinome_id)
+    
+    if jb.binome_id not in get_scope(request).binome_ids or jb.statut != 'TODO':
+        messages.error(request, "Action non autorisée.")
+        return redirect('jalons_timeline')
+    
+    if request.method == 'POST':
+        jb.marquer_realise(request.POST.get('commentaire', ''))
+        
+        if getattr(settings, 'NOTIFICATION_SETTINGS', {}).get('SEND_JALON_NOTIFICATIONS', True):
+            EmailNotificationService.send_jalon_realise_notification(jb)
+        
+        messages.success(request, "Jalon marqué comme réalisé. En attente de validation du mentor.")
+    
+    return redirect('jalons_timeline')
+
+@login_required
+@role_required(['MENTOR'])
+def jalon_valide(request, jalonbinome_id):
+    """Validate milestone by mentor"""
+    jb = get_object_or_404(JalonBinome, id=jalonbinome_id)
+    
+    if jb.binome_id not in get_scope(request).binome_ids or jb.statut != 'WAIT':
+        messages.error(request, "Action non autorisée.")
+        return redirect('jalons_timeline')
+    
+    if request.method == 'POST':
+        jb.valider()
+        
+        if getattr(settings, 'NOTIFICATION_SETTINGS', {}).get('SEND_JALON_NOTIFICATIONS', True):
+            EmailNotificationService.send_jalon_valide_notification(jb)
+        
+        messages.success(request, "Jalon validé.")
+    
+    return redirect('jalons_timeline')
+
+def _valider_jalons(mentor, ids=None, binome_id=None):
+    """Valide en masse les jalons WAIT d'un mentor : un seul UPDATE, une notification par mentoré"""
+    pending = JalonBinome.objects.filter(binome__mentor=mentor, statut='WAIT')
+    if ids is not None:
+        pending = pending.filter(id__in=ids)
+    if binome_id is not None:
+        pending = pending.filter(binome_id=binome_id)
+    
+    with transaction.atomic():
+        jalons_binome = list(
+            pending.select_for_update(of=('self',))
+            .select_related('jalon', 'binome__mentore', 'binome__programme')
+            .prefetch_related('jalon__feedback_forms')
+        )
+        if not jalons_binome:
+            return 0
+        
+        # update() ne déclenche pas post_save : les notifications sont regroupées ci-dessous
+        now = timezone.now()
+        JalonBinome.objects.filter(id__in=[jb.id for jb in jalons_binome]).update(
+            statut='DONE', date_validation=now
+        )
+        apply_transition(jalons_binome, 'WAIT', 'DONE')
+        
+        if getattr(settings, 'NOTIFICATION_SETTINGS', {}).get('SEND_JALON_NOTIFICATIONS', True):
+            par_mentore = {}
+            for jb in jalons_binome:
+                jb.statut = 'DONE'
+                jb.date_validation = now
+                par_mentore.setdefault(jb.binome.mentore, []).append(jb)
+            for mentore, jalons in par_mentore.items():
+                transaction.on_commit(
+                    lambda mentore=mentore, jalons=jalons: EmailNotificationService.notify_jalons_valides(
+                        mentor, mentore, jalons
+                    )
+                )
+    
+    return len(jalons_binome)
+
+def _parse_ids(values):
+    try:
+        return [int(value) for value in values]
+    except (TypeError, ValueError):
+        return None
+
+@login_required
+@role_required(['MENTOR'])
+def jalons_valide_bulk(request):
+    """Validate several milestones at once (selected ids or all pending for a binome)"""
+    if request.method != 'POST':
+        return redirect('jalons_timeline')
+    
+    ids = _parse_ids(request.POST.getlist('ids')) if request.POST.getlist('ids') else None
+    binome_id = request.POST.get('binome')
+    if (ids is None and not binome_id) or (binome_id and not binome_id.isdigit()):
+        messages.error(request, "Aucun jalon sélectionné.")
+        return redirect('jalons_timeline')
+    
+    count = _valider_jalons(request.user, ids=ids, binome_id=int(binome_id) if binome_id else None)
+    if count:
+        messages.success(request, f"{count} jalon(s) validé(s).")
+    else:
+        messages.info(request, "Aucun jalon en attente de validation.")
+    return redirect('jalons_timeline')
+
+@login_required
+@role_required(['MENTOR'])
+def api_jalons_valide_bulk(request):
+    """JSON endpoint: {"ids": [...]} or {"binome": id}"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+    
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'JSON invalide'}, status=400)
+    
+    ids = payload.get('ids')
+    binome_id = payload.get('binome')
+    if ids is not None:
+        ids = _parse_ids(ids) if isinstance(ids, list) else None
+        if ids is None:
+            return JsonResponse({'success': False, 'error': "'ids' doit être une liste d'entiers"}, status=400)
+    if binome_id is not None and not isinstance(binome_id, int):
+        return JsonResponse({'success': False, 'error': "'binome' doit être un entier"}, status=400)
+    if ids is None and binome_id is None:
+        return JsonResponse({'success': False, 'error': "Fournir 'ids' ou 'binome'"}, status=400)
+    
+    count = _valider_jalons(request.user, ids=ids, binome_id=binome_id)
+    return JsonResponse({'success': True, 'count': count})
+
+@login_required
+def jalons_timeline(request):
+    scope = get_scope(request)
+    
+    if scope.role not in ('MENTOR', 'MENTEE'):
+        messages.error(request, "Accès non autorisé.")
+        return redirect('dashboard')
+    
+    binome = None
+    if scope.binome_ids:
+        binome = Binome.objects.select_related('mentor', 'mentore', 'programme').filter(pk=scope.binome_ids[0]).first()
+    if binome is None:
+        messages.info(request, "Aucun binôme assigné.")
+        return render(request, 'jalons_timeline.html', {'jalons_binome': [], 'binome': None})
+    
+    jalons_binome = JalonBinome.objects.filter(binome=binome).select_related('jalon').order_by('jalon__date_echeance')
+    
+    return render(request, 'jalons_timeline.html', {
+        'jalons_binome': jalons_binome, 
+        'binome': binome,
+        'jalons_a_valider': sum(1 for jb in jalons_binome if jb.statut == 'WAIT'),
+    })
+
+@login_required
+def mentores_list(request):
+    """List mentees for a mentor"""
+    binomes = Binome.objects.filter(mentor=request.user).select_related('mentore', 'programme')
+    return render(request, 'mentores_list.html', {'binomes': binomes})
+
+@login_required
+def binomes_list(request):
+    """List all binomes for RH and admin users"""
+    if request.user.role not in ['RH', 'ADF']:
+        messages.error(request, "Accès non autorisé")
+        return redirect('dashboard')
+    
+    binomes = Binome.objects.all().select_related('mentor', 'mentore', 'programme').order_by('-created_at')
+    
+    # Filtrage par programme si spécifié
+    programme_id = request.GET.get('programme')
+    if programme_id:
+        binomes = binomes.filter(programme_id=programme_id)
+    
+    # Filtrage par statut si spécifié
+    status = request.GET.get('status')
+    if status:
+        binomes = binomes.filter(status=status)
+    
+    programmes = Programme.objects.all()
+    
+    context = {
+        'binomes': binomes,
+        'programmes': programmes,
+        'selected_programme': programme_id,
+        'selected_status': status,
+    }
+    
+    return render(request, 'binomes_list.html', context)
@@ -0,0 +1,52 @@
+"""Pages publiques : accueil, inscription, connexion et déconnexion"""
+from django.shortcuts import render, redirect
+from django.contrib.auth import logout, authenticate, login
+from django.contrib import messages
+from accounts.forms import CustomUserCreationForm
+
+def custom_logout(request):
+    """Vue logout personnalisée qui redirige toujours vers home"""
+    logout(request)
+    messages.success(request, "Vous avez été déconnecté avec succès.")
+    return redirect('home')
+
+def home(request):
+    return render(request, 'home.html')
+
+def signup(request):
+    if request.method == 'POST':
+        form = CustomUserCreationForm(request.POST)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Compte créé avec succès. Connectez-vous !")
+            return redirect('login')
+    else:
+        form = CustomUserCreationForm()
+    return render(request, 'signup.html', {'form': form})
+
+def custom_login(request):
+    """Vue de login personnalisée avec redirection selon le rôle"""
+    if request.method == 'POST':
+        username = request.POST.get('username')
+        password = request.POST.get('password')
+        user = authenticate(request, username=username, password=password)
+        
+        if user is not None:
+            login(request, user)
+            messages.success(request, f"Bienvenue {user.get_full_name() or user.username} !")
+            
+            # Redirection selon le rôle
+            if user.role == 'ADF':
+                return redirect('dashboard')  # Dashboard Super Admin
+            elif user.role == 'RH':
+                return redirect('dashboard')  # Dashboard RH
+            elif user.role == 'MENTOR':
+                return redirect('dashboard')  # Dashboard Mentor
+            elif user.role == 'MENTEE':
+                return redirect('dashboard')  # Dashboard Mentoré
+            else:
+                return redirect('dashboard')
+        else:
+            messages.error(request, "Nom d'utilisateur ou mot de passe incorrect.")
+    
+    return render(request, 'login.html')
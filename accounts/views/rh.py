@@ -0,0 +1,179 @@
+"""Pages de pilotage RH/ADF : programmes, gestion des RH, statistiques globales, charge des mentors"""
+from django.shortcuts import render, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.utils import timezone
+from django.db.models import Count, Q
+from asgiref.sync import sync_to_async
+import asyncio
+from datetime import timedelta
+from accounts.models import User, Programme, Binome, JalonBinome, FeedbackResponse
+from accounts.workload import get_workload, load_key, suggest_mentors
+from accounts.versions import conditional_on
+from django.http import JsonResponse
+from .common import role_required, _alist, _arender, _programmes_with_stats, _programme_stats, _jalons_totaux, _completion_rate
+
+@login_required
+@role_required(['RH', 'ADF'])
+@conditional_on('programmes', 'users', daily=True)
+async def programmes_list(request):
+    """Liste des programmes pour RH et ADF"""
+    programmes = await _alist(_programmes_with_stats().select_related('gestionnaire').order_by('-date_debut'))
+    
+    # Ajouter des statistiques pour chaque programme
+    for programme in programmes:
+        programme.completion_rate = programme.progression
+    
+    context = {
+        'programmes': programmes,
+    }
+    return await _arender(request, 'programmes_list.html', context)
+
+WORKLOAD_SORTS = {
+    'charge': None,
+    'attente': 'validations_en_attente',
+    'retard': 'jalons_en_retard',
+    'delai': 'delai_median_jours',
+}
+
+def _workload_context(request):
+    rows = get_workload(refresh=request.GET.get('refresh') == '1')
+    tri = request.GET.get('tri', 'charge')
+    if WORKLOAD_SORTS.get(tri):
+        field = WORKLOAD_SORTS[tri]
+        rows = sorted(rows, key=lambda row: (row[field] is None, -(row[field] or 0)))
+    else:
+        rows = sorted(rows, key=load_key, reverse=True)
+    try:
+        max_mentees = int(request.GET.get('max', 3))
+        limit = int(request.GET.get('suggest', 5))
+    except ValueError:
+        max_mentees, limit = 3, 5
+    return {
+        'mentors': rows,
+        'suggestions': suggest_mentors(limit=limit, max_mentees=max_mentees),
+        'tri': tri,
+        'max_mentees': max_mentees,
+    }
+
+@login_required
+@role_required(['RH', 'ADF'])
+async def mentor_workload(request):
+    """Charge de chaque mentor et mentors suggérés pour les prochains binômes"""
+    context = await sync_to_async(_workload_context)(request)
+    return await _arender(request, 'mentor_workload.html', context)
+
+@login_required
+@role_required(['RH', 'ADF'])
+async def api_mentor_workload(request):
+    """Indice de charge des mentors (JSON) ; ?suggest=N&max=M pour les suggestions"""
+    context = await sync_to_async(_workload_context)(request)
+    return JsonResponse({
+        'mentors': context['mentors'],
+        'suggestions': [row['pk'] for row in context['suggestions']],
+    })
+
+@login_required
+@role_required(['RH', 'ADF'])
+def manage_rh(request):
+    """Gestion des utilisateurs RH"""
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        user_id = request.POST.get('user_id')
+        
+        if action == 'toggle_active' and user_id:
+            user = get_object_or_404(User, id=user_id)
+            user.is_active = not user.is_active
+            user.save()
+            messages.success(request, f"Utilisateur {user.username} {'activé' if user.is_active else 'désactivé'}")
+        
+        elif action == 'change_role' and user_id:
+            user = get_object_or_404(User, id=user_id)
+            new_role = request.POST.get('new_role')
+            if new_role in dict(User.ROLE_CHOICES):
+                user.role = new_role
+                user.save()
+                messages.success(request, f"Rôle de {user.username} changé vers {user.get_role_display()}")
+    
+    # Statistiques des utilisateurs
+    users = User.objects.all().order_by('-date_joined')
+    user_stats = {
+        'total': users.count(),
+        'active': users.filter(is_active=True).count(),
+        'mentors': users.filter(role='MENTOR').count(),
+        'mentees': users.filter(role='MENTEE').count(),
+        'rh': users.filter(role='RH').count(),
+        'adf': users.filter(role='ADF').count(),
+    }
+    
+    context = {
+        'users': users,
+        'user_stats': user_stats,
+        'role_choices': User.ROLE_CHOICES,
+    }
+    return render(request, 'manage_rh.html', context)
+
+@login_required
+@role_required(['RH', 'ADF'])
+@conditional_on('users', 'programmes', 'activity', daily=True)
+async def global_stats(request):
+    """Statistiques globales de la plateforme"""
+    today = timezone.now().date()
+    last_month = timezone.now() - timedelta(days=30)
+    
+    (user_stats, programme_counts, total_binomes, jalon_stats, completed_recently,
+     new_feedbacks) = await asyncio.gather(
+        User.objects.aaggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+            mentors=Count('id', filter=Q(role='MENTOR')),
+            mentees=Count('id', filter=Q(role='MENTEE')),
+            rh=Count('id', filter=Q(role='RH')),
+            new_users=Count('id', filter=Q(date_joined__gte=last_month)),
+        ),
+        Programme.objects.aaggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(date_debut__lte=today, date_fin__gte=today)),
+        ),
+        Binome.objects.acount(),
+        _jalons_totaux(),
+        JalonBinome.objects.filter(date_validation__gte=last_month).acount(),
+        FeedbackResponse.objects.filter(date_reponse__gte=last_month).acount(),
+    )
+    
+    new_users = user_stats.pop('new_users')
+    jalon_stats = {
+        'total': jalon_stats['total'],
+        'completed': jalon_stats['completes'],
+        'pending': jalon_stats['en_attente'],
+        'todo': jalon_stats['todo'],
+        'overdue': jalon_stats['overdue'],
+    }
+    
+    # Calcul du taux de completion global
+    jalon_stats['completion_rate'] = _completion_rate(jalon_stats['completed'], jalon_stats['total'])
+    
+    # Statistiques générales
+    stats = {
+        'users': user_stats,
+        'programmes': programme_counts,
+        'binomes': {
+            'total': total_binomes,
+        },
+        'jalons': jalon_stats,
+    }
+    
+    # Activité récente (30 derniers jours)
+    recent_activity = {
+        'new_users': new_users,
+        'completed_jalons': completed_recently,
+        'new_feedbacks': new_feedbacks,
+    }
+    
+    context = {
+        'stats': stats,
+        # Statistiques par programme (fragment en cache, calculé seulement s'il est périmé)
+        'programme_stats': _programme_stats,
+        'recent_activity': recent_activity,
+    }
+    return await _arender(request, 'global_stats.html', context)
@@ -0,0 +1,57 @@
+"""Recherche plein texte dans les réponses ouvertes et les commentaires de jalons (RH/ADF)"""
+from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.utils.dateparse import parse_date
+from accounts import search as fulltext
+from accounts.models import Programme, FeedbackForm
+from accounts.routers import reads_from_replica
+from .common import role_required
+
+SEARCH_PAGE_SIZE = 20
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _date_or_none(value):
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+@login_required
+@role_required(['RH', 'ADF'])
+@reads_from_replica
+def search(request):
+    """Réponses TEXT et commentaires de jalons classés par pertinence, filtrés par programme, formulaire et dates"""
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('type', 'answers')
+    if kind not in fulltext.KINDS:
+        kind = 'answers'
+    filters = {
+        'programme_id': _int_or_none(request.GET.get('programme')),
+        'form_id': _int_or_none(request.GET.get('form')),
+        'date_from': _date_or_none(request.GET.get('date_from')),
+        'date_to': _date_or_none(request.GET.get('date_to')),
+    }
+
+    page = None
+    if query:
+        results = fulltext.search(query, kind, **filters)
+        page = Paginator(results, SEARCH_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    params = request.GET.copy()
+    params.pop('page', None)
+    context = {
+        'query': query,
+        'kind': kind,
+        'filters': filters,
+        'page': page,
+        'querystring': params.urlencode(),
+        'programmes': Programme.objects.order_by('nom').only('id', 'nom'),
+        'forms': FeedbackForm.objects.order_by('titre').only('id', 'titre', 'programme_id'),
+    }
+    return render(request, 'search.html', context)
@@ -0,0 +1,85 @@
+"""
+Indice de charge des mentors.
+
+Une requête groupée sur les binômes (dont les compteurs de jalons sont
+dénormalisés) donne, pour chaque mentor, ses binômes actifs, ses validations en
+attente et ses jalons en retard. Le délai médian de validation n'est pas un
+agrégat SQL portable : il est calculé à partir des validations des
+``WORKLOAD_DELAY_WINDOW_DAYS`` derniers jours, lues en flux. Le tout est mis en
+cache ``MENTOR_WORKLOAD_CACHE_SECONDS`` secondes.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from statistics import median
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import JalonBinome, User
+
+CACHE_KEY = 'mentor_workload'
+
+
+def cache_seconds():
+    return getattr(settings, 'MENTOR_WORKLOAD_CACHE_SECONDS', 300)
+
+
+def compute_workload():
+    today = timezone.localdate()
+    actifs = Q(mentors__programme__date_fin__gte=today)
+    mentors = (
+        User.objects.filter(role='MENTOR', is_active=True)
+        .annotate(
+            binomes_actifs=Count('mentors', filter=actifs),
+            validations_en_attente=Coalesce(Sum('mentors__jalons_wait', filter=actifs), 0),
+            jalons_en_retard=Coalesce(Sum('mentors__jalons_overdue', filter=actifs), 0),
+        )
+        .order_by('pk')
+        .values('pk', 'username', 'first_name', 'last_name',
+                'binomes_actifs', 'validations_en_attente', 'jalons_en_retard')
+    )
+
+    window = timezone.now() - timedelta(days=getattr(settings, 'WORKLOAD_DELAY_WINDOW_DAYS', 90))
+    delais = defaultdict(list)
+    for mentor_id, realisation, validation in (
+        JalonBinome.objects.filter(statut='DONE', date_validation__gte=window, date_realisation__isnull=False)
+        .values_list('binome__mentor_id', 'date_realisation', 'date_validation')
+        .iterator(chunk_size=5000)
+    ):
+        delais[mentor_id].append((validation - realisation).total_seconds() / 86400)
+
+    rows = []
+    for mentor in mentors:
+        mentor_delais = delais.get(mentor['pk'])
+        mentor['delai_median_jours'] = round(median(mentor_delais), 1) if mentor_delais else None
+        rows.append(mentor)
+    return rows
+
+
+def get_workload(refresh=False):
+    rows = None if refresh else cache.get(CACHE_KEY)
+    if rows is None:
+        rows = compute_workload()
+        cache.set(CACHE_KEY, rows, cache_seconds())
+    return rows
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
+
+
+def load_key(row):
+    """Ordre de charge croissante : binômes actifs, puis validations en attente, puis retards"""
+    return (row['binomes_actifs'], row['validations_en_attente'], row['jalons_en_retard'], row['pk'])
+
+
+def suggest_mentors(limit=5, max_mentees=None, exclude=()):
+    """Mentors les moins chargés ayant encore de la place"""
+    rows = [
+        row for row in get_workload()
+        if row['pk'] not in exclude and (max_mentees is None or row['binomes_actifs'] < max_mentees)
+    ]
+    return sorted(rows, key=load_key)[:limit]
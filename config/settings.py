@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 import dj_database_url
 
@@ -18,14 +19,89 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv()
 
 # --- Base de données ---
+# Processus et threads gunicorn (voir gunicorn.conf.py) : dimensionnent le pool de chaque worker
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 2))
+GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 1))
+# Pool psycopg (PostgreSQL uniquement) ; sinon connexions persistantes DB_CONN_MAX_AGE secondes
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 600))
+
+def _pool_max_size():
+    # Budget global du serveur (max_connections moins une réserve) partagé entre les workers
+    if os.getenv('DB_POOL_MAX_SIZE'):
+        return int(os.getenv('DB_POOL_MAX_SIZE'))
+    if os.getenv('DB_MAX_CONNECTIONS'):
+        return max(1, int(os.getenv('DB_MAX_CONNECTIONS')) // WEB_CONCURRENCY)
+    # Un par thread, plus une marge pour le thread des vues asynchrones et les flux SSE
+    return GUNICORN_THREADS + 2
+
+def _connection_settings(database):
+    # Connexion vérifiée avant réutilisation (persistante) ou à la sortie du pool
+    database['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL and database['ENGINE'] == 'django.db.backends.postgresql':
+        max_size = _pool_max_size()
+        # Le pool remplace les connexions persistantes (Django refuse les deux ensemble)
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = {
+            # Peu de connexions ouvertes au démarrage : pas de rafale de connexions après un déploiement
+            'min_size': min(int(os.getenv('DB_POOL_MIN_SIZE', 1)), max_size),
+            'max_size': max_size,
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+            'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+        }
+    else:
+        database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    return database
+
 DATABASES = {
-    'default': dj_database_url.config(
+    'default': _connection_settings(dj_database_url.config(
         default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-        conn_max_age=600,
-    )
+    ))
 }
+# Réplica en lecture optionnel pour les statistiques et exports (voir accounts/routers.py)
+if os.getenv('REPLICA_DATABASE_URL'):
+    DATABASES['replica'] = _connection_settings(dj_database_url.parse(os.getenv('REPLICA_DATABASE_URL')))
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['accounts.routers.ReplicaRouter']
+# Durée pendant laquelle un client qui vient d'écrire lit sur la base principale (secondes)
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 10))
 DEBUG = os.getenv("DEBUG", "True") == "True"
 
+# --- Cache (partagé entre workers et commandes de gestion) ---
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+    }
+}
+
+# Sessions et utilisateur courant : cache dédié, la base ne sert qu'en secours (voir accounts/auth.py).
+# Défaut : fichiers partagés par les workers ; SESSION_CACHE_BACKEND=...locmem.LocMemCache pour un cache par worker
+CACHES['sessions'] = {
+    'BACKEND': os.getenv('SESSION_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+    # Défaut indépendant de CACHE_LOCATION, qui peut être une URL (Redis, Memcached)
+    'LOCATION': os.getenv('SESSION_CACHE_LOCATION', str(BASE_DIR / '.cache' / 'sessions')),
+    'OPTIONS': {'MAX_ENTRIES': int(os.getenv('SESSION_CACHE_MAX_ENTRIES', 20000))},
+}
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+AUTHENTICATION_BACKENDS = ['accounts.auth.CachedModelBackend']
+USER_CACHE_SECONDS = int(os.getenv('USER_CACHE_SECONDS', 300))
+
+# Alertes système : intervalle de rafraîchissement de l'instantané (secondes)
+SYSTEM_ALERTS_REFRESH_SECONDS = int(os.getenv('SYSTEM_ALERTS_REFRESH_SECONDS', 300))
+
+# Indice de charge des mentors : durée du cache et fenêtre du délai médian de validation
+MENTOR_WORKLOAD_CACHE_SECONDS = int(os.getenv('MENTOR_WORKLOAD_CACHE_SECONDS', 300))
+WORKLOAD_DELAY_WINDOW_DAYS = int(os.getenv('WORKLOAD_DELAY_WINDOW_DAYS', 90))
+
+# Durée de vie maximale des fragments {% cache %} et agrégats en cache des dashboards (invalidés avant par les versions de données)
+TEMPLATE_FRAGMENT_CACHE_SECONDS = int(os.getenv('TEMPLATE_FRAGMENT_CACHE_SECONDS', 600))
+
+# Admin : au-delà de ce nombre de lignes estimé (PostgreSQL), les grosses tables ne font plus de COUNT(*) exact
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv('ADMIN_EXACT_COUNT_LIMIT', 10000))
+
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-insecure-key-change-me")
 
 def _split_env(name):
@@ -52,13 +128,21 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Gabarits compilés une fois par processus, en production comme en DEBUG
+            # (l'autoreload de runserver vide ce cache quand un gabarit change)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.data_versions',
             ],
         },
     },
@@ -72,6 +156,9 @@ LOGIN_URL = '/login/'
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # <— ajouté
+    'accounts.middleware.CompressionMiddleware',
+    'accounts.middleware.QueryInstrumentationMiddleware',
+    'accounts.middleware.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,6 +167,45 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# --- Compression des réponses dynamiques (les fichiers statiques passent par WhiteNoise) ---
+# Taille minimale (octets) d'une réponse compressée ; brotli si le paquet est installé, sinon gzip
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+# Indentation et lignes vides retirées des pages HTML
+HTML_MINIFY = os.getenv('HTML_MINIFY', 'True') == 'True'
+
+# --- Instrumentation des performances ---
+# En-tête Server-Timing (désactivé par défaut en production)
+PERF_SERVER_TIMING = os.getenv('PERF_SERVER_TIMING', str(DEBUG)) == 'True'
+# Nombre de répétitions d'une même requête à partir duquel on signale un N+1
+PERF_DUPLICATE_THRESHOLD = 3
+# Nombre maximal de requêtes SQL par vue (session et utilisateur compris)
+QUERY_BUDGETS = {
+    'dashboard': 10,
+    'global_stats': 10,
+    'programmes_list': 5,
+    'admin_users_data': 5,
+    'admin_system_alerts': 5,
+    'jalons_timeline': 5,
+}
+
+# manage.py test : pas de ligne d'instrumentation (accounts.perf) par requête du client de test
+_TESTING = sys.argv[1:2] == ['test']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'accounts': {
+            'handlers': ['console'],
+            'level': os.getenv('ACCOUNTS_LOG_LEVEL', 'WARNING' if _TESTING else 'INFO'),
+        },
+    },
+}
+
 ROOT_URLCONF = 'config.urls'
 
 WSGI_APPLICATION = 'config.wsgi.application'
@@ -10,6 +10,8 @@ urlpatterns = [
     path('jalons/', views.jalons_timeline, name='jalons_timeline'),
     path('jalons/realise/<int:jalonbinome_id>/', views.jalon_realise, name='jalon_realise'),
     path('jalons/valide/<int:jalonbinome_id>/', views.jalon_valide, name='jalon_valide'),
+    path('jalons/valide/bulk/', views.jalons_valide_bulk, name='jalons_valide_bulk'),
+    path('api/jalons/valide/bulk/', views.api_jalons_valide_bulk, name='api_jalons_valide_bulk'),
     path('jalons/binomes/', views.binomes_list, name='binomes_list'),
     path('jalons/feedback/', views.feedback_form, name='feedback_form'),
     
@@ -32,11 +34,16 @@ urlpatterns = [
     
     path('manage-rh/', views.manage_rh, name='manage_rh'),
     path('stats/', views.global_stats, name='global_stats'),
+    path('mentors/charge/', views.mentor_workload, name='mentor_workload'),
+    path('api/mentors/charge/', views.api_mentor_workload, name='api_mentor_workload'),
+    path('recherche/', views.search, name='search'),
     
     path('export/', views.export_data, name='export_data'),
     path('superadmin/export/', views.admin_export_data, name='admin_export_data'),
     path('superadmin/send-reminders/', views.admin_send_reminders, name='admin_send_reminders'),
     path('superadmin/system-alerts/', views.admin_system_alerts, name='admin_system_alerts'),
+    path('superadmin/db-connections/', views.admin_db_connections, name='admin_db_connections'),
+    path('dashboard/stream/', views.dashboard_stream, name='dashboard_stream'),
     path('superadmin/users-data/', views.admin_users_data, name='admin_users_data'),
     path('admin/toggle-user/<int:user_id>/', views.admin_toggle_user, name='admin_toggle_user'),
 ]
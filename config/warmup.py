@@ -0,0 +1,58 @@
+"""
+Préchauffage d'un processus serveur avant sa première requête.
+
+Appelé par gunicorn.conf.py dans chaque worker : ouvre les connexions à la base
+quand une requête pourra les reprendre (rendues au pool si DB_POOL, gardées par
+le thread principal d'un worker sync), remplit les tables de résolution d'URL
+et compile les gabarits du projet dans le cache du chargeur. Renvoie la durée
+de chaque étape en millisecondes.
+"""
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+
+
+def warm_database(same_thread=False):
+    """same_thread : les requêtes seront servies par ce thread (worker sync)"""
+    for connection in connections.all():
+        if connection.settings_dict['OPTIONS'].get('pool'):
+            # Rendue au pool : la première requête l'empruntera, quel que soit son thread
+            connection.ensure_connection()
+            connection.close()
+        elif same_thread:
+            # Connexion persistante du thread qui servira les requêtes
+            connection.ensure_connection()
+        # Sinon (gthread, uvicorn) les connexions sont propres à chaque thread : une connexion ouverte
+        # ici resterait inutilisée jusqu'à la fin du worker
+
+
+def warm_urls():
+    get_resolver().url_patterns
+    reverse('dashboard')
+
+
+def warm_templates():
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        directory = Path(directory)
+        for path in sorted(directory.rglob('*.html')):
+            try:
+                get_template(path.relative_to(directory).as_posix())
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                continue
+
+
+def warm_up(database=True, same_thread=False):
+    timings = {}
+    steps = [('urls', warm_urls), ('templates', warm_templates)]
+    if database:
+        steps.insert(0, ('database', lambda: warm_database(same_thread)))
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
@@ -0,0 +1,90 @@
+"""
+Configuration gunicorn de production : gunicorn -c gunicorn.conf.py
+
+Variables d'environnement :
+- GUNICORN_WORKER_CLASS : uvicorn (ASGI, défaut), gthread ou sync (WSGI)
+- WEB_CONCURRENCY : nombre de workers (défaut déduit du nombre de CPU)
+- GUNICORN_THREADS : threads par worker gthread (défaut 4)
+- GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER : recyclage des workers
+- GUNICORN_PRELOAD : charger Django une fois dans le maître (défaut True)
+- GUNICORN_WARMUP : préchauffer chaque worker avant sa première requête (défaut True)
+
+Les nombres de workers et de threads retenus sont réinjectés dans
+l'environnement avant le chargement de Django : config/settings.py en déduit
+la taille du pool de connexions de chaque worker.
+"""
+import multiprocessing
+import os
+import time
+
+_started = time.perf_counter()
+
+WORKER_CLASSES = {
+    'uvicorn': 'uvicorn_worker.UvicornWorker',
+    'gthread': 'gthread',
+    'sync': 'sync',
+}
+
+_kind = os.getenv('GUNICORN_WORKER_CLASS', 'uvicorn')
+if _kind not in WORKER_CLASSES:
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS inconnu : {_kind} ({', '.join(WORKER_CLASSES)})")
+_cpus = multiprocessing.cpu_count()
+
+worker_class = WORKER_CLASSES[_kind]
+wsgi_app = 'config.asgi:application' if _kind == 'uvicorn' else 'config.wsgi:application'
+
+# Workers synchrones : bloqués pendant les E/S, on en lance davantage (2 × CPU + 1).
+# uvicorn aussi : seules les vues asynchrones et le flux SSE y sont concurrents, les vues
+# synchrones (la majorité) passent par sync_to_async(thread_sensitive=True), un seul thread
+# par worker, donc une à la fois. gthread gère la concurrence dans ses threads : un par CPU suffit.
+if _kind in ('sync', 'uvicorn'):
+    workers = int(os.getenv('WEB_CONCURRENCY', 2 * _cpus + 1))
+else:
+    workers = int(os.getenv('WEB_CONCURRENCY', max(2, _cpus)))
+threads = int(os.getenv('GUNICORN_THREADS', 4)) if _kind == 'gthread' else 1
+os.environ['WEB_CONCURRENCY'] = str(workers)
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+
+# Recyclage des workers pour borner la croissance mémoire ; le jitter évite qu'ils redémarrent tous ensemble
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    server.log.info(
+        "Maître prêt en %.2f s (%s, %d worker(s) × %d thread(s), preload=%s)",
+        time.perf_counter() - _started, worker_class, workers, threads, preload_app,
+    )
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Aucune connexion ouverte dans le maître ne doit être héritée par les workers
+        from django.db import connections
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    if os.getenv('GUNICORN_WARMUP', 'True') != 'True':
+        return
+    from config.warmup import warm_up
+    start = time.perf_counter()
+    try:
+        timings = warm_up(same_thread=_kind == 'sync')
+    except Exception:
+        # Un préchauffage raté ne doit pas empêcher le worker de servir
+        worker.log.exception("Préchauffage du worker %s échoué", worker.pid)
+        return
+    worker.log.info(
+        "Worker %s préchauffé en %.0f ms (%s)", worker.pid, (time.perf_counter() - start) * 1000,
+        ', '.join(f"{name} {ms} ms" for name, ms in timings.items()),
+    )
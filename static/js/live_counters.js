@@ -0,0 +1,21 @@
+// Mise à jour en direct des compteurs du dashboard via le flux SSE /dashboard/stream/.
+// Chaque élément portant data-live-counter="nom1 nom2" est incrémenté des deltas reçus.
+(function () {
+    if (!window.EventSource) {
+        return;
+    }
+    const source = new EventSource('/dashboard/stream/');
+    source.addEventListener('counters', function (event) {
+        const deltas = JSON.parse(event.data);
+        document.querySelectorAll('[data-live-counter]').forEach(function (element) {
+            let delta = 0;
+            element.dataset.liveCounter.split(' ').forEach(function (name) {
+                delta += deltas[name] || 0;
+            });
+            if (delta !== 0) {
+                const current = parseInt(element.textContent, 10) || 0;
+                element.textContent = Math.max(0, current + delta);
+            }
+        });
+    });
+})();